@@ -7,11 +7,43 @@ some general tools that are useful when doing PWA research with Python.
 
 
 __all__ = [
+    "binning",
     "data",
     "expertsystem",
+    "fit",
+    "fit_fractions",
+    "generation",
+    "integrals",
     "plotting",
+    "toys",
     "ui",
 ]
 
 
-from . import data, expertsystem, plotting, ui
+try:
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:  # Python < 3.8
+    from pkg_resources import DistributionNotFound as PackageNotFoundError
+    from pkg_resources import get_distribution
+
+    def version(distribution_name: str) -> str:  # noqa: D103
+        return get_distribution(distribution_name).version
+
+
+try:
+    __version__ = version(__name__)
+except PackageNotFoundError:  # not installed, for instance in a source tree
+    __version__ = "unknown"
+
+from . import (  # noqa: E402
+    binning,
+    data,
+    expertsystem,
+    fit,
+    fit_fractions,
+    generation,
+    integrals,
+    plotting,
+    toys,
+    ui,
+)
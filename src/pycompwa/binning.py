@@ -0,0 +1,226 @@
+"""Fit large data samples with a binned likelihood.
+
+The cost of the unbinned likelihood grows with the number of data events at
+every step of the fit. For very large samples, it is much cheaper to fit the
+numbers of events in bins of the kinematic variables. The binned estimator
+evaluates the intensity only at one representative point per bin, weighted
+with the fraction of the phase space sample in that bin (its acceptance).
+This approximates the integral of the intensity over the bin, so the bins
+should be small compared to the structures of the intensity.
+
+:class:`AdaptiveBinning` creates bins that contain approximately the same
+number of data events, so that the bins are fine where the intensity is
+large. :func:`create_binned_estimator` computes the bin contents and creates
+an estimator that can be minimized with :meth:`.MinuitIF.optimize`, just like
+the one of :func:`.create_unbinned_log_likelihood_function_tree_estimator`.
+
+.. code-block:: python
+
+    binning = AdaptiveBinning(
+        data_set, {"mSq_(1,2)": 50, "mSq_(0,1)": 50}
+    )
+    estimator, parameters = create_binned_estimator(
+        intensity, data_set, phsp_data_set, binning
+    )
+    result = pwa.MinuitIF().optimize(estimator, parameters)
+"""
+
+__all__ = [
+    "AdaptiveBinning",
+    "create_binned_estimator",
+]
+
+
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import numpy as np
+
+from pycompwa import ui
+
+
+class AdaptiveBinning:
+    """Bins with approximately equal data population.
+
+    The data are first split into bins of equal population in the first
+    variable. Each of these bins is then split into bins of equal population
+    in the second variable, and so on. The number of bins is the product of
+    the numbers of bins per variable.
+
+    Parameters:
+        data_set: The :class:`.DataSet` whose events are distributed over
+            the bins. The weights of the events are taken into account.
+        n_bins: An ordered dictionary of the names of the kinematic variables
+            and the number of bins in each variable, for instance
+            :code:`{"mSq_(1,2)": 50, "mSq_(0,1)": 50}`.
+
+    Raises:
+        ValueError: If a split leaves bins without events, for instance
+            because a variable takes only a few discrete values.
+    """
+
+    def __init__(self, data_set: ui.DataSet, n_bins: Dict[str, int]):
+        if not n_bins:
+            raise ValueError("At least one binning variable is required")
+        missing = [name for name in n_bins if name not in data_set.data]
+        if missing:
+            raise ValueError(f"Variables {missing} are not in the data set")
+        if any(int(number) < 1 for number in n_bins.values()):
+            raise ValueError("The number of bins must be positive")
+        self.__n_bins = OrderedDict(
+            (name, int(number)) for name, number in n_bins.items()
+        )
+        weights = np.asarray(data_set.weights, dtype=float)
+        self.__ranges = dict()
+        self.__edges = dict()
+        bins = np.zeros(len(weights), dtype=np.int64)
+        n_cells = 1
+        for name, number in self.__n_bins.items():
+            values = np.asarray(data_set.data[name], dtype=float)
+            self.__ranges[name] = (values.min(), values.max())
+            keys = self.__to_keys(name, bins, values)
+            order = np.argsort(keys)
+            sorted_keys = keys[order]
+            sorted_bins = bins[order]
+            sorted_weights = weights[order]
+            boundaries = np.searchsorted(
+                sorted_bins, np.arange(n_cells + 1), side="left"
+            )
+            edges = np.empty((n_cells, number - 1))
+            for cell in range(n_cells):
+                cell_slice = slice(boundaries[cell], boundaries[cell + 1])
+                edges[cell] = _compute_quantiles(
+                    sorted_keys[cell_slice], sorted_weights[cell_slice], number
+                )
+            self.__edges[name] = edges.ravel()
+            # splitting sorted keys is much faster than splitting unsorted keys
+            bins[order] = self.__split(name, sorted_bins, sorted_keys)
+            n_cells *= number
+            n_empty = np.count_nonzero(
+                np.bincount(bins, minlength=n_cells) == 0
+            )
+            if n_empty:
+                # tied values give duplicate edges and bins in between them
+                raise ValueError(
+                    f"{n_empty} of {n_cells} bins are empty after the split "
+                    f"in {name}, because too many of its values are equal. "
+                    "Use fewer bins in this variable."
+                )
+
+    @property
+    def n_bins(self) -> int:
+        """Total number of bins."""
+        return int(np.prod(list(self.__n_bins.values())))
+
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        """Names of the binning variables, in the order of the splits."""
+        return tuple(self.__n_bins)
+
+    def assign(self, data_set: ui.DataSet) -> np.ndarray:
+        """Get the bin index of each event of a :class:`.DataSet`.
+
+        Events outside of the range of the binned data set are assigned to
+        the closest bin.
+        """
+        bins = np.zeros(len(data_set.weights), dtype=np.int64)
+        for name in self.__n_bins:
+            values = np.asarray(data_set.data[name], dtype=float)
+            bins = self.__split(name, bins, self.__to_keys(name, bins, values))
+        return bins
+
+    def __to_keys(
+        self, name: str, bins: np.ndarray, values: np.ndarray
+    ) -> np.ndarray:
+        """Map values to bin + a fraction, which sorts by bin, then value."""
+        lower, upper = self.__ranges[name]
+        width = upper - lower if upper > lower else 1.0
+        fractions = np.clip((values - lower) / width, 0.0, 1.0)
+        return bins + 0.5 * fractions
+
+    def __split(
+        self, name: str, bins: np.ndarray, keys: np.ndarray
+    ) -> np.ndarray:
+        number = self.__n_bins[name]
+        position = np.searchsorted(self.__edges[name], keys, side="right")
+        return bins * number + (position - bins * (number - 1))
+
+
+def create_binned_estimator(
+    intensity: ui.FunctionTreeIntensity,
+    data_set: ui.DataSet,
+    phsp_data_set: ui.DataSet,
+    binning: AdaptiveBinning,
+) -> tuple:
+    """Create a binned log-likelihood estimator.
+
+    The representative point of each bin is the weighted mean of the
+    kinematic variables of the phase space events in that bin. The
+    acceptance of a bin is the fraction of the (weighted) phase space sample
+    in that bin, so an efficiency-corrected phase space sample accounts for
+    the detector acceptance.
+
+    Parameters:
+        intensity: The :class:`.FunctionTreeIntensity` that is fitted. It
+            shares its parameters with the estimator.
+        data_set: The :class:`.DataSet` that is fitted.
+        phsp_data_set: A phase space :class:`.DataSet`. It has to contain
+            enough events that each bin contains some of them.
+        binning: The :class:`AdaptiveBinning`, typically of ``data_set``.
+
+    Returns:
+        A tuple of a :class:`.BinnedLogLikelihoodEstimator` and its fit
+        parameters.
+
+    Raises:
+        ValueError: If some bins contain no phase space events.
+    """
+    n_bins = binning.n_bins
+    phsp_bins = binning.assign(phsp_data_set)
+    phsp_weights = np.asarray(phsp_data_set.weights, dtype=float)
+    bin_weights = np.bincount(phsp_bins, phsp_weights, minlength=n_bins)
+    empty_bins = np.flatnonzero(bin_weights <= 0.0)
+    if len(empty_bins):
+        raise ValueError(
+            f"{len(empty_bins)} of {n_bins} bins contain no phase space "
+            "events. Use fewer bins or a larger phase space sample."
+        )
+    bin_points = {
+        name: np.bincount(
+            phsp_bins, phsp_weights * np.asarray(column), minlength=n_bins
+        )
+        / bin_weights
+        for name, column in phsp_data_set.data.items()
+    }
+    bin_acceptances = bin_weights / bin_weights.sum()
+    bin_counts = np.bincount(
+        binning.assign(data_set),
+        np.asarray(data_set.weights, dtype=float),
+        minlength=n_bins,
+    )
+    return ui.create_binned_log_likelihood_estimator(
+        intensity, bin_points, bin_acceptances, bin_counts
+    )
+
+
+def _compute_quantiles(
+    values: np.ndarray, weights: np.ndarray, number: int
+) -> np.ndarray:
+    """Compute the inner edges of bins with equal weights.
+
+    The ``values`` have to be sorted.
+    """
+    if number == 1:
+        return np.empty(0)
+    if len(values) == 0:
+        raise ValueError(
+            "Cannot split an empty bin. Use fewer bins or more events."
+        )
+    cumulative = np.cumsum(weights)
+    targets = cumulative[-1] * np.arange(1, number) / number
+    indices = np.searchsorted(cumulative, targets, side="left")
+    indices = np.minimum(indices, len(values) - 1)
+    # the edge is the next larger value, so that the value that reaches the
+    # target stays in the lower bin together with the values equal to it
+    indices = np.searchsorted(values, values[indices], side="right")
+    return values[np.minimum(indices, len(values) - 1)]
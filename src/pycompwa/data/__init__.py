@@ -18,10 +18,10 @@ __all__ = [
 ]
 
 
+import numpy as np
 import pandas as pd
-from numpy import sqrt
 
-from . import _labels, convert, create, exception, io, naming
+from . import _kinematics, _labels, convert, create, exception, io, naming
 
 
 @pd.api.extensions.register_dataframe_accessor("pwa")
@@ -31,6 +31,9 @@ class PwaAccessor:
     Additional namespace to interpret DataFrame as PWA style dataframe, see
     `here
     <https://pandas.pydata.org/pandas-docs/stable/development/extending.html#registering-custom-accessors>`_.
+
+    Kinematic properties like :attr:`mass` are computed in one go from an
+    array of the four-momenta of all particles.
     """
 
     def __init__(self, pandas_object):
@@ -132,37 +135,262 @@ class PwaAccessor:
     @property
     def energy(self):
         """Get a dataframe containing only the energies."""
-        if isinstance(self._obj.columns, pd.MultiIndex):
-            return self._obj.xs(_labels.ENERGY, level=1, axis=1)
-        return self._obj[_labels.ENERGY]
+        particles, momenta = self._get_all_momenta()
+        return self._to_pandas(momenta[:, :, 3], particles, _labels.ENERGY)
 
     @property
     def p_xyz(self):
         """Get a dataframe containing only the 3-momenta."""
-        return self._obj.filter(regex=("p_[xyz]"))
-        # ! may conflict with _labels.MOMENTA
+        particles, momenta = self._get_all_momenta()
+        frame = pd.DataFrame(
+            momenta[:, :, :3].reshape(len(momenta), -1),
+            index=self._obj.index,
+            copy=False,
+        )
+        labels = _labels.MOMENTA[:3]
+        if isinstance(self._obj.columns, pd.MultiIndex):
+            frame.columns = pd.MultiIndex.from_product(
+                [particles, labels],
+                names=self._obj.columns.names,
+            )
+        else:
+            frame.columns = labels
+        return frame
 
     @property
     def rho2(self):
         """**Compute** quadratic sum of the 3-momenta."""
-        if isinstance(self._obj.columns, pd.MultiIndex):
-            return (self.p_xyz ** 2).sum(axis=1, level=0)
-        return (self.p_xyz ** 2).sum(axis=1)
+        particles, momenta = self._get_all_momenta()
+        return self._to_pandas(_kinematics.rho2(momenta), particles)
 
     @property
     def rho(self):
         """**Compute** absolute value of the 3-momenta."""
-        return sqrt(self.rho2)
+        particles, momenta = self._get_all_momenta()
+        return self._to_pandas(np.sqrt(_kinematics.rho2(momenta)), particles)
 
     @property
     def mass2(self):
         """**Compute** the square of the invariant masses."""
-        return self.energy ** 2 - self.rho2
+        particles, momenta = self._get_all_momenta()
+        return self._to_pandas(_kinematics.mass2(momenta), particles)
 
     @property
     def mass(self):
         """**Compute** the invariant masses."""
-        return sqrt(self.mass2)
+        particles, momenta = self._get_all_momenta()
+        return self._to_pandas(_kinematics.mass(momenta), particles)
+
+    def invariant_mass(self, particles: list) -> pd.Series:
+        """**Compute** the invariant mass of a system of particles.
+
+        Args:
+            particles: Names of the particles that form the system, for
+                instance :code:`["pi+", "pi-"]`.
+        """
+        momenta = self._get_momenta(particles).sum(axis=1)
+        return pd.Series(
+            _kinematics.mass(momenta),
+            index=self._obj.index,
+            name=_subsystem_label(particles),
+        )
+
+    def invariant_masses(self, subsystems: list = None) -> pd.DataFrame:
+        """**Compute** the invariant masses of several particle systems.
+
+        Args:
+            subsystems: List of particle systems, for instance
+                :code:`[["pi+", "pi-"], ["K+", "pi-"]]`. If not specified,
+                the invariant masses of **all pairs** of particles are computed
+                in one go.
+
+        Returns:
+            A `~pandas.DataFrame` with one column per particle system, labeled
+            like :code:`"m_(pi+,pi-)"`.
+        """
+        if subsystems is not None:
+            return pd.concat(
+                [self.invariant_mass(particles) for particles in subsystems],
+                axis=1,
+            )
+        particles = self._get_particles()
+        momenta = self._get_momenta(particles)
+        masses2 = _kinematics.pair_masses2(momenta)
+        first, second = np.triu_indices(len(particles), k=1)
+        return pd.DataFrame(
+            np.sqrt(masses2[:, first, second]),
+            index=self._obj.index,
+            columns=[
+                _subsystem_label([particles[i], particles[j]])
+                for i, j in zip(first, second)
+            ],
+        )
+
+    def boost_to(self, particles: list) -> pd.DataFrame:
+        """Boost all particles into the rest frame of a system of particles.
+
+        Args:
+            particles: Names of the particles of which the combined rest frame
+                is the target frame.
+
+        Returns:
+            A copy of the PWA frame with all four-momenta replaced by their
+            boosted counterparts. Other columns, such as weights, are kept.
+        """
+        rest_frame = self._get_momenta(particles).sum(axis=1)
+        all_particles = self._get_particles()
+        boosted = _kinematics.boost(
+            self._get_momenta(all_particles), rest_frame[:, None, :]
+        )
+        frame = self._obj.copy()
+        frame[
+            [
+                (particle, label)
+                for particle in all_particles
+                for label in _labels.MOMENTA
+            ]
+        ] = boosted.reshape(len(boosted), -1)
+        return frame
+
+    def helicity_angles(self, decay_chain: list) -> pd.DataFrame:
+        r"""**Compute** the helicity angles of a chain of two-body decays.
+
+        The angles of each two-body decay are computed in the helicity frame
+        of the decaying system. This frame is reached by boosting into the
+        rest frame of the parent system, rotating the direction of the
+        decaying system onto the z-axis and boosting along it. The angles of
+        the top-most decay are computed in the overall rest frame with the
+        original axes.
+
+        Args:
+            decay_chain: Nested list of two-body decays with particle names as
+                leaves. For instance, :code:`[["pi+", "pi-"], "gamma"]`
+                describes a decay into :math:`\gamma` and a :math:`\pi^+\pi^-`
+                system that subsequently decays into :math:`\pi^+` and
+                :math:`\pi^-`.
+
+        Returns:
+            A `~pandas.DataFrame` with columns :code:`theta_<label>` and
+            :code:`phi_<label>` for the first decay product of each two-body
+            decay. The labels follow the ComPWA naming scheme: the decay
+            products joined by :code:`"_"`, followed by :code:`"_vs_"` and the
+            recoiling system, e.g. :code:`"pi+_pi-_vs_gamma"`.
+        """
+        particles = _get_leaves(decay_chain)
+        momenta = self._get_momenta(particles)
+        top = momenta.sum(axis=1)
+        momenta = _kinematics.boost(momenta, top[:, None, :])
+        angles: dict = dict()
+        _add_helicity_angles(angles, momenta, decay_chain, recoil=None)
+        return pd.DataFrame(angles, index=self._obj.index)
+
+    def _get_all_momenta(self) -> tuple:
+        """Get the particles and their four-momenta.
+
+        The four-momenta have the shape ``(n_events, n_particles, 4)``. If the
+        frame has no multicolumns, it contains the four-momenta of a single
+        particle, which is labeled `None`.
+        """
+        if isinstance(self._obj.columns, pd.MultiIndex):
+            particles = self.particles
+        else:
+            particles = [None]
+        return particles, self._extract_momenta(particles)
+
+    def _get_particles(self) -> list:
+        if not isinstance(self._obj.columns, pd.MultiIndex):
+            raise exception.InvalidPwaFormat(
+                "Kinematics of particle systems require a frame with "
+                "multicolumns of particles and momenta"
+            )
+        return self.particles
+
+    def _get_momenta(self, particles: list) -> np.ndarray:
+        """Get the four-momenta of shape ``(n_events, len(particles), 4)``."""
+        available = self._get_particles()
+        unknown = [p for p in particles if p not in available]
+        if unknown:
+            raise exception.DataException(
+                f"Particles {unknown} are not in the frame, which contains "
+                f"{available}"
+            )
+        return self._extract_momenta(particles)
+
+    def _extract_momenta(self, particles: list) -> np.ndarray:
+        if particles == [None]:
+            columns = _labels.MOMENTA
+        else:
+            columns = [
+                (particle, label)
+                for particle in particles
+                for label in _labels.MOMENTA
+            ]
+        values = self._obj[columns].to_numpy(dtype=np.float64)
+        return values.reshape(len(values), -1, len(_labels.MOMENTA))
+
+    def _to_pandas(self, values: np.ndarray, particles: list, name=None):
+        if isinstance(self._obj.columns, pd.MultiIndex):
+            return pd.DataFrame(
+                values,
+                index=self._obj.index,
+                columns=pd.Index(particles, name=self._obj.columns.names[0]),
+                copy=False,
+            )
+        return pd.Series(
+            values[:, 0], index=self._obj.index, name=name, copy=False
+        )
+
+
+def _subsystem_label(particles: list) -> str:
+    return f"m_({','.join(map(str, particles))})"
+
+
+def _get_leaves(decay_chain) -> list:
+    if not isinstance(decay_chain, (list, tuple)):
+        return [decay_chain]
+    if len(decay_chain) != 2:
+        raise exception.DataException(
+            f"Decay chain {decay_chain} does not describe a two-body decay"
+        )
+    return _get_leaves(decay_chain[0]) + _get_leaves(decay_chain[1])
+
+
+def _add_helicity_angles(
+    angles: dict, momenta: np.ndarray, decay_chain: list, recoil
+) -> None:
+    """Compute the angles of a two-body decay and of its subsequent decays.
+
+    Args:
+        angles: Dictionary to which the angle arrays are added.
+        momenta: Four-momenta of the leaves of the ``decay_chain`` in the
+            helicity frame of the decaying system.
+        decay_chain: Two-body decay, see :meth:`PwaAccessor.helicity_angles`.
+        recoil: System recoiling against the decaying system, if any.
+    """
+    label = "_".join(_get_system_name(system) for system in decay_chain)
+    if recoil is not None:
+        label += f"_vs_{_get_system_name(recoil)}"
+    n_first = len(_get_leaves(decay_chain[0]))
+    theta, phi = _kinematics.polar_angles(momenta[:, :n_first].sum(axis=1))
+    angles[f"theta_{label}"] = theta
+    angles[f"phi_{label}"] = phi
+    for system, sibling, selection in [
+        (decay_chain[0], decay_chain[1], slice(None, n_first)),
+        (decay_chain[1], decay_chain[0], slice(n_first, None)),
+    ]:
+        if not isinstance(system, (list, tuple)):
+            continue
+        system_momenta = momenta[:, selection]
+        direction = system_momenta.sum(axis=1)[:, None, :]
+        system_momenta = _kinematics.rotate_to_z(system_momenta, direction)
+        system_momenta = _kinematics.boost(
+            system_momenta, system_momenta.sum(axis=1)[:, None, :]
+        )
+        _add_helicity_angles(angles, system_momenta, system, recoil=sibling)
+
+
+def _get_system_name(system) -> str:
+    return "".join(map(str, _get_leaves(system)))
 
 
 def append(pwa_frame: pd.DataFrame, other: pd.DataFrame) -> pd.DataFrame:
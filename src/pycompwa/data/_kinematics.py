@@ -0,0 +1,96 @@
+"""Vectorized relativistic kinematics for the :mod:`pycompwa.data` module.
+
+All functions operate on arrays of four-momenta that have the components
+``(p_x, p_y, p_z, E)`` along their last axis (see :mod:`._labels`), so they
+can be applied to the momenta of a PWA frame without any conversions. Leading
+axes broadcast as usual in :mod:`numpy`.
+"""
+
+
+import numpy as np
+
+
+def rho2(momenta: np.ndarray) -> np.ndarray:
+    """Compute the quadratic sum of the 3-momenta of four-momenta."""
+    p_xyz = momenta[..., :3]
+    return np.einsum("...k,...k->...", p_xyz, p_xyz)
+
+
+def mass2(momenta: np.ndarray) -> np.ndarray:
+    """Compute the squared invariant mass of four-momenta."""
+    energy = momenta[..., 3]
+    return energy * energy - rho2(momenta)
+
+
+def mass(momenta: np.ndarray) -> np.ndarray:
+    """Compute the invariant mass of four-momenta."""
+    return np.sqrt(mass2(momenta))
+
+
+def pair_masses2(momenta: np.ndarray) -> np.ndarray:
+    r"""Compute the squared invariant masses of all pairs of particles.
+
+    Args:
+        momenta: Four-momenta of shape ``(n_events, n_particles, 4)``.
+
+    Returns:
+        Array of shape ``(n_events, n_particles, n_particles)`` with
+        :math:`(p_i + p_j)^2` at index ``[:, i, j]``. This is computed from the
+        Minkowski products of all pairs at once.
+    """
+    metric = np.array([-1.0, -1.0, -1.0, 1.0])
+    products = np.einsum("nik,njk->nij", momenta * metric, momenta)
+    diagonal = np.einsum("nii->ni", products)
+    return diagonal[:, :, None] + diagonal[:, None, :] + 2.0 * products
+
+
+def polar_angles(momenta: np.ndarray) -> tuple:
+    """Compute the polar and azimuthal angle of the 3-momenta."""
+    p_x, p_y, p_z = np.moveaxis(momenta[..., :3], -1, 0)
+    theta = np.arctan2(np.hypot(p_x, p_y), p_z)
+    phi = np.arctan2(p_y, p_x)
+    return theta, phi
+
+
+def boost(momenta: np.ndarray, rest_frame: np.ndarray) -> np.ndarray:
+    """Boost four-momenta into the rest frame of another four-momentum.
+
+    Args:
+        momenta: Four-momenta that should be boosted.
+        rest_frame: Four-momentum of the system into whose rest frame the
+            ``momenta`` are boosted. Has to broadcast against ``momenta``.
+    """
+    beta = rest_frame[..., :3] / rest_frame[..., 3:]
+    beta2 = np.einsum("...k,...k->...", beta, beta)[..., None]
+    gamma = 1.0 / np.sqrt(1.0 - beta2)
+    p_xyz = momenta[..., :3]
+    energy = momenta[..., 3:]
+    beta_p = np.einsum("...k,...k->...", beta, p_xyz)[..., None]
+    # (gamma - 1) / beta^2, written such that it is finite for beta = 0
+    gamma_factor = gamma * gamma / (gamma + 1.0)
+    boosted = np.empty(np.broadcast(momenta, rest_frame).shape)
+    boosted[..., :3] = p_xyz + (gamma_factor * beta_p - gamma * energy) * beta
+    boosted[..., 3:] = gamma * (energy - beta_p)
+    return boosted
+
+
+def rotate_to_z(momenta: np.ndarray, direction: np.ndarray) -> np.ndarray:
+    r"""Rotate four-momenta such that ``direction`` points along the z-axis.
+
+    The rotation is :math:`R_y(-\theta)R_z(-\phi)`, with :math:`\theta` and
+    :math:`\phi` the polar angles of ``direction``, as is the convention for
+    the helicity formalism.
+    """
+    theta, phi = polar_angles(direction)
+    cos_theta = np.cos(theta)[..., None]
+    sin_theta = np.sin(theta)[..., None]
+    cos_phi = np.cos(phi)[..., None]
+    sin_phi = np.sin(phi)[..., None]
+    p_x, p_y, p_z = (momenta[..., i : i + 1] for i in range(3))
+    p_x_rotated = cos_phi * p_x + sin_phi * p_y
+    rotated = np.empty(np.broadcast(momenta, direction[..., :1]).shape)
+    rotated[..., 0:1] = cos_theta * p_x_rotated - sin_theta * p_z
+    rotated[..., 1:2] = cos_phi * p_y - sin_phi * p_x
+    rotated[..., 2:3] = sin_theta * p_x_rotated + cos_theta * p_z
+    rotated[..., 3:] = momenta[..., 3:]
+    return rotated
@@ -51,7 +51,7 @@ def events_to_pandas(
             particle_list.name_to_pid(name) for name in id_to_name.values()
         ]
     particles = naming.make_values_unique(pids)
-    frame = create.pwa_frame(events.to_table(), particle_names=particles)
+    frame = create.pwa_frame(events.to_numpy(), particle_names=particles)
     if model:
         particle_list = pwa.read_particles(model)
         naming.pid_to_name(frame, particle_list)
@@ -80,37 +80,33 @@ def pandas_to_events(frame: pd.DataFrame, model: str) -> pwa.EventCollection:
             f'    "{model}"\n'
             "  with e.g. naming.particle_to_id or pandas.DataFrame.rename"
         )
-    numpy_arrays = [
-        frame[particle].to_numpy() for particle in frame.pwa.particles
-    ]
+    columns = [(i, mom) for i in ids for mom in _labels.MOMENTA]
+    momenta = (
+        frame[columns]
+        .to_numpy(dtype="float64")
+        .reshape(len(frame), len(ids), len(_labels.MOMENTA))
+    )
+    weights = None
     if frame.pwa.has_weights:
-        events = [
-            pwa.Event(
-                pwa.FourMomentumList(
-                    [pwa.FourMomentum(momentum) for momentum in event[:-1]]
-                ),
-                event[-1],
-            )
-            for event in zip(*numpy_arrays, frame.pwa.weights)
-        ]
-    else:  # default constructor if no weights
-        events = [
-            pwa.Event(
-                pwa.FourMomentumList(
-                    [pwa.FourMomentum(momentum) for momentum in event]
-                )
-            )
-            for event in zip(*numpy_arrays)
-        ]
-    return pwa.EventCollection(pids, pwa.EventList(events))
+        weights = frame.pwa.weights.to_numpy(dtype="float64")
+    return pwa.EventCollection.from_numpy(pids, momenta, weights)
 
 
-def data_set_to_pandas(data_set: pwa.DataSet) -> pd.DataFrame:
+def data_set_to_pandas(
+    data_set: pwa.DataSet, copy: bool = False
+) -> pd.DataFrame:
     """Convert :class:`~.DataSet` to a :class:`~pandas.DataFrame`.
 
-    Convert a :class:`~.DataSet` to a :class:`~pandas.DataFrame`.
+    Convert a :class:`~.DataSet` to a :class:`~pandas.DataFrame`. By default,
+    the columns of the resulting :class:`~pandas.DataFrame` are read-only views
+    on the memory of the :class:`~.DataSet`, so no data is copied.
+
+    Parameters:
+        data_set: The :class:`~.DataSet` that you want to convert.
+        copy: Copy the data, so that you can modify the values of the
+            resulting :class:`~pandas.DataFrame` in place.
     """
-    frame = pd.DataFrame(data_set.data, columns=data_set.data.keys())
+    frame = pd.DataFrame(data_set.data, copy=copy)
     if data_set.has_weights():
         frame[_labels.WEIGHT] = data_set.weights
     return frame
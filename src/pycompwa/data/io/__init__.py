@@ -4,11 +4,18 @@ This is a collection of submodules that allow one to import collections of
 4-momentum tuples of other PWA frameworks into a :class:`pandas.DataFrame` that
 has the the format specified by :class:`~.PwaAccessor`. You can then use the
 methods in :mod:`~.data.convert` to import the data into the ComPWA back-end.
+
+PWA frames can be stored in and loaded from binary columnar files with
+:func:`write_columnar` and :func:`read_columnar`.
 """
 
 __all__ = [
+    "columnar",
     "pawian",
+    "read_columnar",
+    "write_columnar",
 ]
 
 
-from . import pawian
+from . import columnar, pawian
+from .columnar import read_columnar, write_columnar
@@ -0,0 +1,192 @@
+"""Read and write PWA frames in binary columnar file formats.
+
+Two formats of `Apache Arrow <https://arrow.apache.org>`_ are supported:
+
+- `Feather <https://arrow.apache.org/docs/python/feather.html>`_ (Arrow
+  IPC), which can be memory-mapped and is therefore the fastest choice for
+  caching samples on disk, for instance phase space samples that are
+  reloaded between fit iterations.
+- `Parquet <https://parquet.apache.org>`_, which is more compact and
+  better suited for archiving.
+
+Both keep the layout of :func:`~.create.multicolumn`, including weights and
+other columns, and allow to read only a selection of the top-level columns.
+They require :mod:`pyarrow`, which is installed with the ``io`` extra
+(:code:`pip install pycompwa[io]`).
+"""
+
+__all__ = [
+    "read_columnar",
+    "write_columnar",
+]
+
+
+import json
+
+import pandas as pd
+
+from .. import exception
+
+_FILE_FORMATS = {
+    ".arrow": "feather",
+    ".feather": "feather",
+    ".parquet": "parquet",
+}
+_METADATA_KEY = b"pycompwa.columns"
+
+
+def write_columnar(
+    frame: pd.DataFrame,
+    filename: str,
+    file_format: str = None,
+    compression: str = None,
+) -> None:
+    """Write a `PWA DataFrame <.PwaAccessor>` to a columnar file.
+
+    The index of the frame is not stored.
+
+    Parameters:
+        frame: The :class:`~pandas.DataFrame` that you want to write.
+        filename: Name of the output file.
+        file_format: Either :code:`"feather"` or :code:`"parquet"`. If not
+            specified, the format is deduced from the file extension
+            (:code:`.feather`, :code:`.arrow` or :code:`.parquet`).
+        compression: Compression codec, see
+            :func:`pyarrow.feather.write_feather` and
+            :func:`pyarrow.parquet.write_table`. By default, Feather files are
+            uncompressed, so that they can be memory-mapped without copying,
+            and Parquet files use the default of :mod:`pyarrow`.
+    """
+    import pyarrow
+
+    file_format = _get_file_format(filename, file_format)
+    columns = [
+        list(column) if isinstance(column, tuple) else [column]
+        for column in frame.columns
+    ]
+    table = pyarrow.table(
+        {
+            _flatten_column_name(column): frame.iloc[:, i].to_numpy()
+            for i, column in enumerate(columns)
+        }
+    )
+    metadata = {
+        "columns": columns,
+        "names": list(frame.columns.names),
+    }
+    table = table.replace_schema_metadata(
+        {_METADATA_KEY: json.dumps(metadata)}
+    )
+    if file_format == "feather":
+        from pyarrow import feather
+
+        if compression is None:
+            compression = "uncompressed"
+        # a single record batch allows zero-copy reads of the columns
+        feather.write_feather(
+            table,
+            filename,
+            compression=compression,
+            chunksize=max(len(frame), 1),
+        )
+    else:
+        from pyarrow import parquet
+
+        if compression is None:
+            parquet.write_table(table, filename)
+        else:
+            parquet.write_table(table, filename, compression=compression)
+
+
+def read_columnar(
+    filename: str,
+    columns: list = None,
+    file_format: str = None,
+    memory_map: bool = True,
+) -> pd.DataFrame:
+    """Read a `PWA DataFrame <.PwaAccessor>` from a columnar file.
+
+    Parameters:
+        filename: Path to a file that was written with :func:`write_columnar`.
+        columns: Top-level columns to read, for instance
+            :code:`["pi+", "pi-", "weight"]`. Only these columns are read from
+            disk. By default, all columns are read.
+        file_format: Either :code:`"feather"` or :code:`"parquet"`. If not
+            specified, the format is deduced from the file extension.
+        memory_map: Memory-map the file instead of reading it into memory.
+            Uncompressed Feather files are then not copied at all, which means
+            that the columns of the resulting frame are **read-only**.
+
+    Raises:
+        DataException: If the file has not been written by
+            :func:`write_columnar` or if some of the requested ``columns`` are
+            not in the file.
+    """
+    file_format = _get_file_format(filename, file_format)
+    if file_format == "feather":
+        import pyarrow
+        from pyarrow import feather
+
+        with pyarrow.memory_map(filename) as source:
+            schema = pyarrow.ipc.open_file(source).schema
+        read_table = feather.read_table
+    else:
+        from pyarrow import parquet
+
+        schema = parquet.read_schema(filename, memory_map=memory_map)
+        read_table = parquet.read_table
+    if schema.metadata is None or _METADATA_KEY not in schema.metadata:
+        raise exception.DataException(
+            f"File {filename} does not contain a PWA frame"
+        )
+    metadata = json.loads(schema.metadata[_METADATA_KEY])
+    stored_columns = metadata["columns"]
+    if columns is not None:
+        top_columns = {column[0] for column in stored_columns}
+        missing = [column for column in columns if column not in top_columns]
+        if missing:
+            raise exception.DataException(
+                f"Columns {missing} are not in file {filename}"
+            )
+        stored_columns = [
+            column for column in stored_columns if column[0] in columns
+        ]
+    table = read_table(
+        filename,
+        columns=[_flatten_column_name(column) for column in stored_columns],
+        memory_map=memory_map,
+    )
+    frame = table.to_pandas(split_blocks=True)
+    if all(len(column) == 1 for column in metadata["columns"]):
+        frame.columns = pd.Index(
+            [column[0] for column in stored_columns],
+            name=metadata["names"][0],
+        )
+    else:
+        frame.columns = pd.MultiIndex.from_tuples(
+            [tuple(column) for column in stored_columns],
+            names=metadata["names"],
+        )
+    return frame
+
+
+def _get_file_format(filename: str, file_format: str = None) -> str:
+    if file_format is None:
+        extension = filename[filename.rfind(".") :].lower()
+        if extension not in _FILE_FORMATS:
+            raise exception.DataException(
+                f"Cannot deduce file format of {filename}. Please specify "
+                f"one of {sorted(set(_FILE_FORMATS.values()))}"
+            )
+        return _FILE_FORMATS[extension]
+    if file_format not in _FILE_FORMATS.values():
+        raise exception.DataException(
+            f"File format {file_format} is not one of "
+            f"{sorted(set(_FILE_FORMATS.values()))}"
+        )
+    return file_format
+
+
+def _flatten_column_name(column: list) -> str:
+    """Create a unique field name for a (multi)column label."""
+    return json.dumps(column)
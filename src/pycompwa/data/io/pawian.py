@@ -9,12 +9,15 @@ compatibility to ASCII files without header.
 
 
 __all__ = [
+    "iterate_hists_file",
     "read_ascii",
+    "read_ascii_chunks",
     "read_hists_file",
     "write_ascii",
 ]
 
 
+import numpy as np
 import pandas as pd
 import uproot3
 
@@ -22,7 +25,13 @@ import pycompwa.ui as pwa
 from pycompwa.data import _labels, convert, create, exception
 
 
-def read_hists_file(filename: str, type_name: str = "data"):
+def read_hists_file(
+    filename: str,
+    type_name: str = "data",
+    particles: list = None,
+    entry_start: int = None,
+    entry_stop: int = None,
+):
     r"""
     Import one of the momentum tuple branches of a ``pawianHists.root`` file.
 
@@ -33,8 +42,67 @@ def read_hists_file(filename: str, type_name: str = "data"):
     Parameters:
         filename (`str`): path to the ROOT file you want to import.
         type_name (`str`, optional): \"data\" or \"fit\".
+        particles (`list`, optional): Names of the particles that you want to
+            import. All particles are imported if left empty.
+        entry_start (`int`, optional): First entry (event) that is imported.
+        entry_stop (`int`, optional): Entry after the last entry that is
+            imported.
+
+    .. seealso:: :func:`iterate_hists_file` for reading large files in chunks.
+    """
+    tree = _get_fourvecs_tree(filename, type_name)
+    particles = _select_particles(tree, particles)
+    entry_start, entry_stop = _get_entry_range(tree, entry_start, entry_stop)
+    weights = _slice(_read_weights(tree), entry_start, entry_stop)
+    return _read_entries(tree, particles, weights, entry_start, entry_stop)
+
+
+def iterate_hists_file(
+    filename: str,
+    type_name: str = "data",
+    particles: list = None,
+    entries_per_chunk: int = 100000,
+    entry_start: int = None,
+    entry_stop: int = None,
+):
+    """Iterate over a ``pawianHists.root`` file in chunks of entries.
+
+    This generator yields :class:`PWA DataFrames <.PwaAccessor>` with at most
+    ``entries_per_chunk`` rows, so that only one chunk has to be kept in
+    memory. The row index continues from one chunk to the next. Arguments are
+    the same as for :func:`read_hists_file`.
+
+    The weights of the whole file are read up front, so all chunks have the
+    same columns.
     """
-    # Determine tree name
+    tree = _get_fourvecs_tree(filename, type_name)
+    particles = _select_particles(tree, particles)
+    entry_start, entry_stop = _get_entry_range(tree, entry_start, entry_stop)
+    weights = _read_weights(tree)
+    if _is_split_tree(tree, particles):  # ROOT <= 5
+        for start in range(entry_start, entry_stop, entries_per_chunk):
+            stop = min(start + entries_per_chunk, entry_stop)
+            yield _read_entries(
+                tree, particles, _slice(weights, start, stop), start, stop
+            )
+        return
+    for start, stop, arrays in tree.iterate(
+        particles,
+        entrysteps=entries_per_chunk,
+        entrystart=entry_start,
+        entrystop=entry_stop,
+        namedecode="utf-8",
+        reportentries=True,
+    ):
+        momenta = {
+            particle: _get_momenta_root6(arrays[particle])
+            for particle in particles
+        }
+        yield _create_frame(momenta, _slice(weights, start, stop), start)
+
+
+def _get_fourvecs_tree(filename: str, type_name: str):
+    """Get the momentum tuple tree of a ``pawianHists.root`` file."""
     if "dat" in type_name.lower():
         type_name = "data"
     elif "fit" in type_name.lower():
@@ -43,53 +111,141 @@ def read_hists_file(filename: str, type_name: str = "data"):
         raise exception.MissingParameter(
             f'Wrong type_name: should be either "data" or "fit"'
         )
-    tree_name = f"_{type_name}Fourvecs"
+    return uproot3.open(filename)[f"_{type_name}Fourvecs"]
+
 
-    # Get particle names
-    uproot_file = uproot3.open(filename)
-    tree = uproot_file[tree_name]
-    particles = [
+def _select_particles(tree, particles: list = None) -> list:
+    """Get the particle branch names and check the selected particles."""
+    available = [
         particle.decode()
         for particle in tree.keys()
         if particle.decode() != _labels.WEIGHT
     ]
+    if particles is None:
+        return available
+    missing = [particle for particle in particles if particle not in available]
+    if missing:
+        raise exception.DataException(
+            f"Particles {missing} do not exist in the ROOT file, which "
+            f"contains {available}"
+        )
+    return list(particles)
+
+
+def _get_entry_range(tree, entry_start: int = None, entry_stop: int = None):
+    """Clip the entry range to the number of entries in the tree."""
+    number_of_entries = tree.numentries
+    if entry_start is None:
+        entry_start = 0
+    if entry_stop is None:
+        entry_stop = number_of_entries
+    entry_stop = min(entry_stop, number_of_entries)
+    return min(entry_start, entry_stop), entry_stop
+
+
+def _read_weights(tree):
+    """Read the weights of all entries, or `None` if they are not weighted.
+
+    Whether the entries are weighted is decided for the whole file, so that
+    all ranges of entries of a file have the same columns.
+    """
+    weights = tree.array(_labels.WEIGHT)
+    if not len(weights) or weights.max() == 1.0 or weights.min() == 1.0:
+        return None
+    return weights
+
+
+def _slice(weights, entry_start: int, entry_stop: int):
+    if weights is None:
+        return None
+    return weights[entry_start:entry_stop]
+
 
-    # Import tuples as dataframe
-    weights = uproot_file[f"{tree_name}/{_labels.WEIGHT}"].array()
+def _is_split_tree(tree, particles: list) -> bool:
+    """ROOT5 files contain split ``TLorentzVector`` branches."""
+    if not particles:
+        return False
+    return tree[particles[0]].interpretation is None
+
+
+def _read_entries(
+    tree, particles: list, weights, entry_start: int, entry_stop: int
+):
+    """Read a range of entries into a PWA DataFrame in one pass.
+
+    The ``weights`` of the range have already been read with
+    :func:`_read_weights`, or are `None` if the entries are not weighted.
+    """
+    if _is_split_tree(tree, particles):  # ROOT <= 5
+        momenta = {
+            particle: _get_momenta_root5(
+                tree[particle], entry_start, entry_stop
+            )
+            for particle in particles
+        }
+    else:  # ROOT >= 6
+        arrays = tree.arrays(
+            particles,
+            entrystart=entry_start,
+            entrystop=entry_stop,
+            namedecode="utf-8",
+        )
+        momenta = {
+            particle: _get_momenta_root6(arrays[particle])
+            for particle in particles
+        }
+    return _create_frame(momenta, weights, entry_start)
+
+
+_ROOT5_MOMENTUM_BRANCHES = [
+    ("fP", "fP.fX"),
+    ("fP", "fP.fY"),
+    ("fP", "fP.fZ"),
+    ("fE",),
+]
+
+
+def _get_momenta_root5(branch, entry_start: int, entry_stop: int) -> list:
+    """Get the momentum arrays from a split ``TLorentzVector`` branch."""
+    momenta = list()
+    for path in _ROOT5_MOMENTUM_BRANCHES:
+        sub_branch = branch
+        for name in path:
+            sub_branch = sub_branch[name]
+        momenta.append(
+            sub_branch.array(entrystart=entry_start, entrystop=entry_stop)
+        )
+    return momenta
+
+
+def _get_momenta_root6(vectors) -> list:
+    """Get the momentum arrays from a ``TLorentzVector`` array."""
+    return [vectors.x, vectors.y, vectors.z, vectors.E]
+
+
+def _create_frame(momenta: dict, weights, first_entry: int) -> pd.DataFrame:
+    """Create a PWA DataFrame from a dict of momentum arrays per particle."""
+    particles = list(momenta)
     frame = create.pwa_frame(
+        {
+            (particle, label): array
+            for particle, arrays in momenta.items()
+            for label, array in zip(_labels.MOMENTA, arrays)
+        },
         particle_names=particles,
-        number_of_rows=len(weights),
     )
-    if weights.max() != 1.0 and weights.min() != 1.0:
+    frame.index = pd.RangeIndex(first_entry, first_entry + len(frame))
+    if weights is not None:
         frame[_labels.WEIGHT] = weights
-    try:  # ROOT >= 6
-        for particle in particles:
-            vectors = uproot_file[f"{tree_name}/{particle}"].array()
-            frame[particle, _labels.MOMENTA[0]] = vectors.x
-            frame[particle, _labels.MOMENTA[1]] = vectors.y
-            frame[particle, _labels.MOMENTA[2]] = vectors.z
-            frame[particle, _labels.MOMENTA[3]] = vectors.E
-    except ValueError:  # ROOT <= 5
-        for particle in particles:
-            particle_branch = f"{tree_name}/{particle}"
-            frame[particle, _labels.MOMENTA[0]] = uproot_file[
-                f"{particle_branch}/fP/fP.fX"
-            ].array()
-            frame[particle, _labels.MOMENTA[1]] = uproot_file[
-                f"{particle_branch}/fP/fP.fY"
-            ].array()
-            frame[particle, _labels.MOMENTA[2]] = uproot_file[
-                f"{particle_branch}/fP/fP.fZ"
-            ].array()
-            frame[particle, _labels.ENERGY] = uproot_file[
-                f"{particle_branch}/fE"
-            ].array()
     return frame
 
 
 def read_ascii(filename, particles=None, **kwargs):
     """Import from a Pawian-like ASCII file.
 
+    Use :func:`read_ascii_chunks` to import large files without header in
+    chunks of events.
+
     Parameters:
         particles: Interpretation for the tuples. This argument is required if
             there are no weights. Provide either the number of particles or a
@@ -120,9 +276,53 @@ def _read_ascii_with_header(filename, particles=None):
     return frame
 
 
+def read_ascii_chunks(
+    filename, particles=None, events_per_chunk: int = 100000, **kwargs
+):
+    """Import a Pawian-like ASCII file **without header** in chunks.
+
+    This is a generator that yields :class:`PWA DataFrames <.PwaAccessor>` of
+    at most ``events_per_chunk`` events, so that files that are larger than
+    the available memory can be processed event by event. The weight and
+    particle lines of one event always end up in the same chunk and the row
+    index continues from one chunk to the next.
+
+    Parameters:
+        particles: Interpretation for the tuples. This argument is required if
+            there are no weights. Provide either the number of particles or a
+            list of particles.
+        events_per_chunk: Maximal number of events (rows) in each chunk.
+        kwargs: Optional, additional arguments that are passed on to
+            `pandas.read_table`.
+    """
+    particles, has_weights = _inspect_ascii(filename, particles, **kwargs)
+    lines_per_event = len(particles) + int(has_weights)
+    reader = _read_table(
+        filename, chunksize=events_per_chunk * lines_per_event, **kwargs
+    )
+    first_event = 0
+    try:
+        for table in reader:
+            frame = _interleaved_to_frame(
+                table.to_numpy(), particles, has_weights, first_event
+            )
+            first_event += len(frame)
+            yield frame
+    finally:
+        # also if the caller stops iterating early
+        reader.close()
+
+
 def _read_ascii_without_header(filename, particles=None, **kwargs):
     """Import ASCII file **without header** (old Pawian format)."""
-    full_table = pd.read_table(
+    particles, has_weights = _inspect_ascii(filename, particles, **kwargs)
+    full_table = _read_table(filename, **kwargs)
+    return _interleaved_to_frame(full_table.to_numpy(), particles, has_weights)
+
+
+def _read_table(filename, **kwargs):
+    """Read the momentum tuples of an ASCII file **without header**."""
+    return pd.read_table(
         filepath_or_buffer=filename,
         names=_labels.MOMENTA,
         sep=R"\s+",
@@ -131,9 +331,20 @@ def _read_ascii_without_header(filename, particles=None, **kwargs):
         **kwargs,
     )
 
-    # Determine if ascii file contains weights
-    py_values = full_table[_labels.MOMENTA[1]]
-    has_weights = py_values.isnull().any()
+
+_INSPECTED_LINES = 1000
+
+
+def _inspect_ascii(filename, particles=None, **kwargs):
+    """Determine the particles and whether an ASCII file contains weights.
+
+    Only the first lines of the file are read. Weight lines are recognized by
+    the fact that they contain only one value.
+    """
+    kwargs["nrows"] = _INSPECTED_LINES
+    py_values = _read_table(filename, **kwargs)[_labels.MOMENTA[1]]
+    weight_lines = py_values.index[py_values.isnull()]
+    has_weights = len(weight_lines) > 0
     if not has_weights:
         if isinstance(particles, int):
             particles = range(1, particles + 1)
@@ -144,59 +355,125 @@ def _read_ascii_without_header(filename, particles=None, **kwargs):
                 "--> Please provide an array of particles for"
                 "interpretation"
             )
+        return list(particles), has_weights
 
     # Try to determine number of particles from file
-    if has_weights:
-        file_n_partices = py_values.index[py_values.isnull()][1] - 1
-        if particles is None:
-            particles = range(1, file_n_partices + 1)
-        if isinstance(particles, int):
-            particles = range(1, particles + 1)
-        if len(particles) != file_n_partices:
-            raise exception.DataException(
-                f'File "{filename}" contains {file_n_partices}, but you'
-                f"said there were {len(particles)} ({particles})"
-            )
+    if len(weight_lines) > 1:
+        file_n_particles = weight_lines[1] - 1
+    elif len(py_values) < _INSPECTED_LINES:  # file contains only one event
+        file_n_particles = len(py_values) - 1
+    else:
+        raise exception.DataException(
+            f'Cannot determine number of particles in file "{filename}"'
+        )
+    if particles is None:
+        particles = range(1, file_n_particles + 1)
+    if isinstance(particles, int):
+        particles = range(1, particles + 1)
+    if len(particles) != file_n_particles:
+        raise exception.DataException(
+            f'File "{filename}" contains {file_n_particles}, but you'
+            f"said there were {len(particles)} ({particles})"
+        )
+    return list(particles), has_weights
 
-    # Prepare splitting into particle columns
-    first_momentum_row = 0
-    n_rows = len(particles)
-    if has_weights:
-        first_momentum_row = 1
-        n_rows += 1
 
-    # Create multi-column pandas.DataFrame
+def _interleaved_to_frame(values, particles, has_weights, first_event=0):
+    """Convert a table of interleaved weight and momentum lines.
+
+    The table is de-interleaved with a single reshape, so that each event
+    becomes one row of the resulting :class:`PWA DataFrame <.PwaAccessor>`.
+    """
+    lines_per_event = len(particles) + int(has_weights)
+    number_of_events = len(values) // lines_per_event
+    events = values[: number_of_events * lines_per_event].reshape(
+        number_of_events, lines_per_event, len(_labels.MOMENTA)
+    )
     frame = create.pwa_frame(
+        events[:, int(has_weights) :, :].reshape(number_of_events, -1),
         particle_names=particles,
-        number_of_rows=len(full_table) // n_rows,
     )
-    particles = frame.pwa.particles
-
-    # Convert imported table to the multi-column one
+    frame.index = pd.RangeIndex(first_event, first_event + number_of_events)
     if has_weights:
-        frame[_labels.WEIGHT] = full_table[_labels.MOMENTA[0]][
-            0::n_rows
-        ].reset_index(drop=True)
-    for start_row, par in enumerate(particles, first_momentum_row):
-        for mom in _labels.MOMENTA:
-            frame[par, mom] = full_table[mom][start_row::n_rows].reset_index(
-                drop=True
-            )
+        frame[_labels.WEIGHT] = events[:, 0, 0]
     return frame
 
 
-def write_ascii(frame: pd.DataFrame, filename: str, **kwargs):
+def write_ascii(
+    frame: pd.DataFrame,
+    filename: str,
+    precision: int = None,
+    events_per_chunk: int = 100000,
+    **kwargs,
+):
     """Write :class:`pandas.DataFrame` to a Pawian-like ASCII file.
 
+    Missing values (`~numpy.nan`) are not written, so each line contains only
+    the values that are available.
+
     Parameters:
         frame (:class:`pandas.DataFrame`): The frame that you want to export.
             Should be formatted according to the standards set by the
             :class:`~.PwaAccessor`.
         filename (`str`): Path of the output file. Usually has the extension
             ``dat``.
+        precision (`int`, optional): Number of significant digits of the
+            exported values. By default, values are written with the shortest
+            representation that preserves full precision.
+        events_per_chunk (`int`, optional): Number of events that are
+            formatted and written to the file at once.
         kwargs: Optional, additional arguments that are passed on to
-            :meth:`pandas.DataFrame.to_csv`.
+            :meth:`pandas.DataFrame.to_csv`. The file is then written through
+            pandas, which is much slower, and ``precision`` and
+            ``events_per_chunk`` have no effect.
     """
+    if kwargs:
+        _write_ascii_with_pandas(frame, filename, **kwargs)
+        return
+    value_format = "%r" if precision is None else f"%.{precision}g"
+    particles = frame.pwa.particles
+    line_sizes = [len(_labels.MOMENTA)] * len(particles)
+    values = frame[
+        [(par, mom) for par in particles for mom in _labels.MOMENTA]
+    ].to_numpy(dtype="float64")
+    if frame.pwa.has_weights:
+        line_sizes.insert(0, 1)
+        weights = frame.pwa.weights.to_numpy(dtype="float64")
+        values = np.column_stack((weights, values))
+    event_format = "".join(
+        " ".join([value_format] * size) + "\n" for size in line_sizes
+    )
+    with open(filename, "w") as stream:
+        for start in range(0, len(values), events_per_chunk):
+            block = values[start : start + events_per_chunk]
+            if np.isnan(block).any():
+                stream.write(
+                    _format_lines_without_nan(block, line_sizes, value_format)
+                )
+            else:
+                stream.write(
+                    (event_format * len(block)) % tuple(block.ravel().tolist())
+                )
+
+
+def _format_lines_without_nan(values, line_sizes, value_format):
+    """Format events line by line, skipping the missing values."""
+    lines = list()
+    for event in values.tolist():
+        start = 0
+        for size in line_sizes:
+            lines.append(
+                " ".join(
+                    value_format % value
+                    for value in event[start : start + size]
+                    if not np.isnan(value)
+                )
+            )
+            start += size
+    return "".join(line + "\n" for line in lines)
+
+
+def _write_ascii_with_pandas(frame, filename, **kwargs):
     new_dict = list()
     if frame.pwa.weights is not None:
         new_dict.append(frame.pwa.weights)
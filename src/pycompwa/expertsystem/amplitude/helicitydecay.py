@@ -8,6 +8,7 @@ import xmltodict
 
 from ..state.particle import (
     InteractionQuantumNumberNames,
+    QuantumNumber,
     StateQuantumNumberNames,
     XMLLabelConstants,
     get_interaction_property,
@@ -239,9 +240,12 @@ def remove_spin_projection(edge_props):
 
     new_edge_props = deepcopy(edge_props)
 
-    for qn_entry in new_edge_props[qns_label]:
+    qn_list = new_edge_props[qns_label]
+    for index, qn_entry in enumerate(qn_list):
         if StateQuantumNumberNames[qn_entry[type_label]] is spin_label:
-            del qn_entry[proj_label]
+            qn_list[index] = QuantumNumber(
+                {k: v for k, v in qn_entry.items() if k != proj_label}
+            )
             break
     return new_edge_props
 
@@ -431,7 +435,7 @@ class HelicityAmplitudeGeneratorXML(AbstractAmplitudeGenerator):
                     raise ValueError(
                         "Only a single initial state particle allowed"
                     )
-                eprops = g.edge_props[init_edges[0]]
+                eprops = g.get_writable_edge_props(init_edges[0])
                 eprops[decay_info_label] = decay_info
 
         self.particle_list = generate_particle_list(graphs)
@@ -2,17 +2,22 @@
 # cspell:ignore curr projs
 """This module defines a particle as a collection of quantum numbers and things
 related to this."""
+import hashlib
 import logging
+import os
+import pickle
+import tempfile
 from abc import ABC, abstractmethod
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from copy import deepcopy
 from enum import Enum
 from itertools import permutations
-from json import dumps, loads
 
 import xmltodict
 from numpy import arange
 
+import pycompwa
+
 from ..topology.graph import (
     get_final_state_edges,
     get_initial_state_edges,
@@ -248,6 +253,108 @@ QNClassConverterMapping = {
 }
 
 
+class QuantumNumber(dict):
+    """Immutable quantum number entry of a particle or an interaction.
+
+    It is the dictionary that ``xmltodict`` creates for a ``QuantumNumber``
+    XML tag, so it is read and written like one, but it cannot be modified.
+    Instead, create a new entry, for instance
+    :code:`QuantumNumber({**qn_entry, "@Projection": 1.0})`.
+
+    The type, class, and value of the entry are parsed once on creation, so
+    that `.get_particle_property` does not have to parse them on each
+    access. Because the entry is immutable, a `~copy.deepcopy` of the
+    properties of a graph shares it instead of copying it.
+
+    Attributes:
+        qn_type: the quantum number name, e.g. `.StateQuantumNumberNames`,
+            or `None` if the type is unknown.
+        qn_class: the `.QuantumNumberClasses` of the entry, or `None`.
+        value: the value as returned by the converter of ``qn_type``, or
+            `None` if it cannot be parsed.
+    """
+
+    __slots__ = ("qn_type", "qn_class", "value")
+
+    def __init__(self, qn_dict):
+        super().__init__(qn_dict)
+        type_label = get_xml_label(XMLLabelConstants.Type)
+        class_label = get_xml_label(XMLLabelConstants.Class)
+        qn_type = _find_qn_name(self.get(type_label))
+        value = None
+        if qn_type in QNNameClassMapping:
+            converter = QNClassConverterMapping[QNNameClassMapping[qn_type]]
+            try:
+                value = converter.parse_from_dict(self)
+            except (KeyError, TypeError, ValueError):
+                pass  # parsed again, and fails, when the value is requested
+        qn_class = QuantumNumberClasses.__members__.get(self.get(class_label))
+        object.__setattr__(self, "qn_type", qn_type)
+        object.__setattr__(self, "qn_class", qn_class)
+        object.__setattr__(self, "value", value)
+
+    def __immutable(self, *args, **kwargs):
+        raise TypeError(
+            type(self).__name__ + " is immutable, create a new one instead"
+        )
+
+    __setattr__ = __immutable
+    __delattr__ = __immutable
+    __setitem__ = __immutable
+    __delitem__ = __immutable
+    __ior__ = __immutable
+    clear = __immutable
+    pop = __immutable
+    popitem = __immutable
+    setdefault = __immutable
+    update = __immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # keep the parsed values, so that unpickling does not parse again
+        return (
+            _restore_quantum_number,
+            (dict(self), self.qn_type, self.qn_class, self.value),
+        )
+
+
+def _restore_quantum_number(qn_dict, qn_type, qn_class, value):
+    qn_entry = dict.__new__(QuantumNumber)
+    dict.update(qn_entry, qn_dict)
+    object.__setattr__(qn_entry, "qn_type", qn_type)
+    object.__setattr__(qn_entry, "qn_class", qn_class)
+    object.__setattr__(qn_entry, "value", value)
+    return qn_entry
+
+
+def _find_qn_name(type_name):
+    for qn_names in (
+        StateQuantumNumberNames,
+        InteractionQuantumNumberNames,
+        ParticlePropertyNames,
+        ParticleDecayPropertyNames,
+    ):
+        if type_name in qn_names.__members__:
+            return qn_names[type_name]
+    return None
+
+
+def _freeze_quantum_numbers(particle):
+    """Replace the quantum number dictionaries of a particle by
+    `.QuantumNumber` instances."""
+    qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
+    if isinstance(particle.get(qns_label), list):
+        particle[qns_label] = [
+            x if isinstance(x, QuantumNumber) else QuantumNumber(x)
+            for x in particle[qns_label]
+        ]
+
+
 def is_boson(qn_dict):
     spin_label = StateQuantumNumberNames.Spin
     return abs(qn_dict[spin_label].magnitude() % 1) < 0.01
@@ -256,23 +363,174 @@ def is_boson(qn_dict):
 particle_list = dict()
 
 
-def load_particle_list_from_xml(file_path):
+# the cache is separate for each version of pycompwa, but bump this if the
+# format of the cached particle lists changes in between
+_PARTICLE_LIST_CACHE_VERSION = 1
+
+# set this environment variable to a non-empty value to disable the cache
+_NO_CACHE_VARIABLE = "PYCOMPWA_NO_PARTICLE_LIST_CACHE"
+
+
+def load_particle_list_from_xml(file_path, use_cache=None):
     """By default, the expert system loads the ``particle_list`` from the XML
     file ``particle_list.xml`` located in the ComPWA module. Use
     `.load_particle_list_from_xml` to append to the ``particle_list``.
 
+    The parsed particles are cached in a binary file in
+    `.get_particle_list_cache_dir`, so that loading the same XML file again,
+    for instance in another process, does not parse it again. The cache is
+    used as long as the modification time and size of the XML file are
+    unchanged, or its content has the same hash. The cache can be disabled
+    with ``use_cache`` or by setting the environment variable
+    :envvar:`PYCOMPWA_NO_PARTICLE_LIST_CACHE` to a non-empty value.
+
     .. note::
 
         If a particle name in the loaded XML file already exists in the
         ``particle_list``, the one in the ``particle_list`` will be
         overwritten.
+
+    Args:
+        file_path: path to the XML file.
+        use_cache: set to `False` to always parse the XML file and to not
+            write a cache file. By default, the cache is used unless it is
+            disabled with the environment variable (see
+            `.is_particle_list_cache_enabled`).
+    """
+    use_cache = is_particle_list_cache_enabled(use_cache)
+    cached = None
+    if use_cache:
+        cached = _load_cached_particle_list(file_path)
+    if cached is None:
+        particles = _parse_particle_list(file_path)
+        index = ParticleIndex(particles.values())
+        if use_cache:
+            _store_cached_particle_list(file_path, particles, index)
+    else:
+        particles, index = cached
+    is_new_list = not particle_list
+    particle_list.update(particles)
+    if is_new_list:
+        _register_particle_index(index)
+    # build the index now, so that the first candidate search is fast
+    create_particle_index()
+
+
+def is_particle_list_cache_enabled(use_cache=None):
+    """Check if parsed particle lists should be cached.
+
+    Args:
+        use_cache: an explicit choice, which is returned if it is not `None`.
+            Otherwise, the cache is enabled unless the environment variable
+            :envvar:`PYCOMPWA_NO_PARTICLE_LIST_CACHE` is set to a non-empty
+            value.
+    """
+    if use_cache is not None:
+        return use_cache
+    return not os.environ.get(_NO_CACHE_VARIABLE)
+
+
+def get_particle_list_cache_dir():
+    """Get the directory in which parsed particle lists are cached.
+
+    This is :file:`pycompwa/particle_lists` in the user cache directory
+    (:envvar:`XDG_CACHE_HOME` or :file:`~/.cache`).
     """
+    user_cache = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(user_cache, "pycompwa", "particle_lists")
+
+
+def _parse_particle_list(file_path):
     name_label = get_xml_label(XMLLabelConstants.Name)
+    particles = dict()
     with open(file_path, "rb") as xmlfile:
         full_dict = xmltodict.parse(xmlfile)
         for p in full_dict["ParticleList"]["Particle"]:
             entry = dict(p)
-            particle_list[entry[name_label]] = entry
+            _freeze_quantum_numbers(entry)
+            particles[entry[name_label]] = entry
+    return particles
+
+
+def _get_cache_version():
+    return (_PARTICLE_LIST_CACHE_VERSION, pycompwa.__version__)
+
+
+def _get_particle_list_cache_file(file_path):
+    # other versions of pycompwa can use the same cache directory
+    path_hash = hashlib.sha256(
+        repr((_get_cache_version(), os.path.abspath(file_path))).encode()
+    )
+    return os.path.join(
+        get_particle_list_cache_dir(), path_hash.hexdigest() + ".pickle"
+    )
+
+
+def _hash_file(file_path):
+    with open(file_path, "rb") as stream:
+        return hashlib.sha256(stream.read()).hexdigest()
+
+
+def _load_cached_particle_list(file_path):
+    cache_file = _get_particle_list_cache_file(file_path)
+    try:
+        with open(cache_file, "rb") as stream:
+            cached = pickle.load(stream)
+        if (
+            not isinstance(cached, dict)
+            or cached.get("version") != _get_cache_version()
+        ):
+            return None
+        status = os.stat(file_path)
+        if (status.st_mtime_ns, status.st_size) != cached["file_status"]:
+            # the file has been touched, but its content may be the same
+            if _hash_file(file_path) != cached["file_hash"]:
+                return None
+            cached["file_status"] = (status.st_mtime_ns, status.st_size)
+            _write_cache_file(cache_file, cached)
+    except (
+        AttributeError,
+        EOFError,
+        ImportError,
+        OSError,
+        TypeError,
+        ValueError,
+        pickle.UnpicklingError,
+    ):
+        # missing or broken caches, or caches with classes of other versions,
+        # are simply created again
+        return None
+    return cached["particles"], cached["index"]
+
+
+def _store_cached_particle_list(file_path, particles, index):
+    try:
+        status = os.stat(file_path)
+        cached = {
+            "version": _get_cache_version(),
+            "file_status": (status.st_mtime_ns, status.st_size),
+            "file_hash": _hash_file(file_path),
+            "particles": particles,
+            "index": index,
+        }
+        _write_cache_file(_get_particle_list_cache_file(file_path), cached)
+    except OSError as exception:
+        logging.debug("Could not cache particle list: " + str(exception))
+
+
+def _write_cache_file(cache_file, cached):
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    descriptor, temporary_file = tempfile.mkstemp(dir=cache_dir)
+    try:
+        with os.fdopen(descriptor, "wb") as stream:
+            pickle.dump(cached, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, cache_file)
+    finally:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
 
 
 def write_particle_list_to_xml(file_path: str):
@@ -296,6 +554,7 @@ def add_to_particle_list(particle):
         logging.warning("Can only add dictionary entries to particle_list")
         return
     particle_name = particle[get_xml_label(XMLLabelConstants.Name)]
+    _freeze_quantum_numbers(particle)
     particle_list[particle_name] = particle
 
 
@@ -358,15 +617,21 @@ def get_particle_property(particle_properties, qn_name, converter=None):
     # check for default value
     property_value = None
     if found_prop is not None:
-        if converter is None:
-            converter = QNClassConverterMapping[QNNameClassMapping[qn_name]]
-        property_value = converter.parse_from_dict(found_prop)
+        property_value = _parse_qn_value(found_prop, qn_name, converter)
     else:
         if qn_name in QNDefaultValues:
             property_value = QNDefaultValues[qn_name]
     return property_value
 
 
+def _parse_qn_value(qn_dict, qn_name, converter):
+    if converter is None:
+        if isinstance(qn_dict, QuantumNumber) and qn_dict.value is not None:
+            return qn_dict.value
+        converter = QNClassConverterMapping[QNNameClassMapping[qn_name]]
+    return converter.parse_from_dict(qn_dict)
+
+
 def get_interaction_property(interaction_properties, qn_name, converter=None):
     qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
     type_label = get_xml_label(XMLLabelConstants.Type)
@@ -381,9 +646,7 @@ def get_interaction_property(interaction_properties, qn_name, converter=None):
     # check for default value
     property_value = None
     if found_prop is not None:
-        if converter is None:
-            converter = QNClassConverterMapping[QNNameClassMapping[qn_name]]
-        property_value = converter.parse_from_dict(found_prop)
+        property_value = _parse_qn_value(found_prop, qn_name, converter)
     else:
         if qn_name in QNDefaultValues:
             property_value = QNDefaultValues[qn_name]
@@ -400,6 +663,12 @@ def get_interaction_property(interaction_properties, qn_name, converter=None):
 
 
 class CompareGraphElementPropertiesFunctor:
+    """Compare the node or edge properties of two graphs.
+
+    Quantum numbers of the types in the ``ignored_qn_list`` are not taken
+    into account, and neither is the order of the quantum numbers.
+    """
+
     def __init__(self, ignored_qn_list=[]):
         self.ignored_qn_list = [
             x.name
@@ -410,72 +679,62 @@ class CompareGraphElementPropertiesFunctor:
         ]
 
     def compare_qn_numbers(self, qns1, qns2):
-        new_qns1 = {}
-        new_qns2 = {}
+        return self.__create_qns_key(qns1) == self.__create_qns_key(qns2)
+
+    def create_key(self, props):
+        """Create a hashable key of the properties of the graph elements.
+
+        Two property dictionaries are equal according to this functor if and
+        only if their keys are equal, so the key can be used to look up
+        equal properties in a `dict` or a `set`.
+        """
+        qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
+        return _create_canonical_key(
+            {
+                ele_id: {
+                    k: self.__create_qns_key(v) if k == qns_label else v
+                    for k, v in ele_props.items()
+                }
+                for ele_id, ele_props in props.items()
+            }
+        )
+
+    def __create_qns_key(self, qns):
         type_label = get_xml_label(XMLLabelConstants.Type)
-        for x in qns1:
-            if x[type_label] not in self.ignored_qn_list:
-                temp_qn_dict = dict(x)
-                type_name = temp_qn_dict[type_label]
-                del temp_qn_dict[type_label]
-                new_qns1[type_name] = temp_qn_dict
-        for x in qns2:
+        qns_by_type = {}
+        for x in qns:
             if x[type_label] not in self.ignored_qn_list:
-                temp_qn_dict = dict(x)
-                type_name = temp_qn_dict[type_label]
-                del temp_qn_dict[type_label]
-                new_qns2[type_name] = temp_qn_dict
-        return loads(
-            dumps(new_qns1, sort_keys=True), object_pairs_hook=OrderedDict
-        ) == loads(
-            dumps(new_qns2, sort_keys=True), object_pairs_hook=OrderedDict
-        )
+                qns_by_type[x[type_label]] = {
+                    k: v for k, v in x.items() if k != type_label
+                }
+        return _create_canonical_key(qns_by_type)
 
     def __call__(self, props1, props2):
-        # for more speed first compare the names (if they exist)
+        return self.create_key(props1) == self.create_key(props2)
 
-        name_label = get_xml_label(XMLLabelConstants.Name)
-        names1 = {
-            k: v[name_label] for k, v in props1.items() if name_label in v
-        }
-        names2 = {
-            k: v[name_label] for k, v in props2.items() if name_label in v
-        }
-        if set(names1.keys()) != set(names2.keys()):
-            return False
-        for k in names1.keys():
-            if names1[k] != names2[k]:
-                return False
 
-        # then compare the qn lists (if they exist)
-        qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
-        for ele_id, props in props1.items():
-            qns1 = []
-            qns2 = []
-            if qns_label in props:
-                qns1 = props[qns_label]
-            if ele_id in props2 and qns_label in props2[ele_id]:
-                qns2 = props2[ele_id][qns_label]
-            if not self.compare_qn_numbers(qns1, qns2):
-                return False
-        # if they are equal we have to make a deeper comparison
-        copy_props1 = deepcopy(props1)
-        copy_props2 = deepcopy(props2)
-        # remove the qn dicts
-        qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
-        for ele_id in props1.keys():
-            if qns_label in copy_props1[ele_id]:
-                del copy_props1[ele_id][qns_label]
-            if qns_label in copy_props2[ele_id]:
-                del copy_props2[ele_id][qns_label]
-
-        if loads(
-            dumps(copy_props1, sort_keys=True), object_pairs_hook=OrderedDict
-        ) != loads(
-            dumps(copy_props2, sort_keys=True), object_pairs_hook=OrderedDict
-        ):
-            return False
-        return True
+def _create_canonical_key(value):
+    """Convert nested dicts and lists to nested tuples, with sorted items.
+
+    Like a JSON serialization with sorted keys, the conversion does not
+    distinguish lists from tuples and converts the keys to strings.
+    """
+    if isinstance(value, dict):
+        return (
+            dict,
+            tuple(
+                sorted(
+                    (
+                        (str(k), _create_canonical_key(v))
+                        for k, v in value.items()
+                    ),
+                    key=lambda item: item[0],
+                )
+            ),
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(_create_canonical_key(x) for x in value)
+    return value
 
 
 def initialize_graph(graph, initial_state, final_state, final_state_groupings):
@@ -624,7 +883,7 @@ def initialize_edges(graph, edge_particle_dict):
     for edge, particle in edge_particle_dict.items():
         # lookup the particle in the list
         found_particle = get_particle_with_name(particle[0])
-        graph.edge_props[edge] = deepcopy(found_particle)
+        graph.set_edge_props(edge, deepcopy(found_particle))
 
     # now add more quantum numbers given by user (spin_projection)
     new_graphs = [graph]
@@ -659,11 +918,13 @@ def populate_edge_with_spin_projections(graph, edge_id, spin_projections):
         )
     ]
     if index_list:
+        proj_label = get_xml_label(XMLLabelConstants.Projection)
         for spin_proj in spin_projections:
-            graph_copy = deepcopy(graph)
-            graph_copy.edge_props[edge_id][qns_label][index_list[0]][
-                get_xml_label(XMLLabelConstants.Projection)
-            ] = spin_proj
+            graph_copy = graph.copy()
+            qn_list = graph_copy.get_writable_edge_props(edge_id)[qns_label]
+            qn_list[index_list[0]] = QuantumNumber(
+                {**qn_list[index_list[0]], proj_label: spin_proj}
+            )
             new_graphs.append(graph_copy)
 
     return new_graphs
@@ -671,9 +932,7 @@ def populate_edge_with_spin_projections(graph, edge_id, spin_projections):
 
 def initialize_graphs_with_particles(graphs, allowed_particle_list=[]):
     initialized_graphs = []
-    mod_allowed_particle_list = initialize_allowed_particle_list(
-        allowed_particle_list
-    )
+    particle_index = create_particle_index(allowed_particle_list)
 
     for graph in graphs:
         logging.debug("initializing graph...")
@@ -681,7 +940,7 @@ def initialize_graphs_with_particles(graphs, allowed_particle_list=[]):
         current_new_graphs = [graph]
         for int_edge_id in intermediate_edges:
             particle_edges = get_particle_candidates_for_state(
-                graph.edge_props[int_edge_id], mod_allowed_particle_list
+                graph.edge_props[int_edge_id], particle_index
             )
             if len(particle_edges) == 0:
                 logging.debug("Did not find any particle candidates for")
@@ -691,8 +950,8 @@ def initialize_graphs_with_particles(graphs, allowed_particle_list=[]):
             new_graphs_temp = []
             for curr_new_graph in current_new_graphs:
                 for particle_edge in particle_edges:
-                    temp_graph = deepcopy(curr_new_graph)
-                    temp_graph.edge_props[int_edge_id] = particle_edge
+                    temp_graph = curr_new_graph.copy()
+                    temp_graph.set_edge_props(int_edge_id, particle_edge)
                     new_graphs_temp.append(temp_graph)
             current_new_graphs = new_graphs_temp
 
@@ -715,17 +974,219 @@ def initialize_allowed_particle_list(allowed_particle_list):
     return mod_allowed_particle_list
 
 
+_TYPE_LABEL = get_xml_label(XMLLabelConstants.Type)
+_CLASS_LABEL = get_xml_label(XMLLabelConstants.Class)
+_VALUE_LABEL = get_xml_label(XMLLabelConstants.Value)
+_PROJECTION_LABEL = get_xml_label(XMLLabelConstants.Projection)
+
+
+def _get_qn_key(qn_entry):
+    if isinstance(qn_entry, QuantumNumber):
+        if isinstance(qn_entry.qn_type, StateQuantumNumberNames) and (
+            qn_entry.qn_class is not None
+        ):
+            return (qn_entry.qn_type, qn_entry.qn_class)
+        return None
+    qn_type = qn_entry[_TYPE_LABEL]
+    qn_class = qn_entry[_CLASS_LABEL]
+    if (
+        qn_type not in StateQuantumNumberNames.__members__
+        or qn_class not in QuantumNumberClasses.__members__
+    ):
+        return None
+    return (StateQuantumNumberNames[qn_type], QuantumNumberClasses[qn_class])
+
+
+class ParticleIndex:
+    """Lookup table of particles by their quantum numbers.
+
+    For each quantum number type, the index maps each value to the set of
+    particles with that value. The sets are stored as bit masks over the
+    positions of the particles, so that the candidates for a state are found
+    by intersecting one mask per quantum number of the state, instead of
+    comparing the state with every particle. The result is the same as that
+    of `.check_qns_equal` for each particle.
+
+    Args:
+        particles: list of particle dictionaries, e.g. the values of
+            ``particle_list``. The particles must not be modified after the
+            index has been created.
+    """
+
+    def __init__(self, particles):
+        self.particles = list(particles)
+        self.__all_particles = (1 << len(self.particles)) - 1
+        self.__lookups = {}
+        qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
+        for position, particle in enumerate(self.particles):
+            bit = 1 << position
+            for qn_entry in particle[qns_label]:
+                key = _get_qn_key(qn_entry)
+                if key is None:
+                    continue
+                if key not in self.__lookups:
+                    self.__lookups[key] = _QuantumNumberLookup(key[1])
+                lookup = self.__lookups[key]
+                if not lookup.present & bit:
+                    # like check_qns_equal, only use the first entry
+                    lookup.add(qn_entry, bit)
+
+    def __len__(self):
+        return len(self.particles)
+
+    def find_candidates(self, qns_state):
+        """Get the particles with quantum numbers that match ``qns_state``.
+
+        Args:
+            qns_state: list of quantum number dictionaries of a state, as in
+                the edge properties of a graph.
+
+        Returns:
+            The matching particle dictionaries (not copies), in the order of
+            the particles of the index.
+        """
+        mask = self.__all_particles
+        for qn_entry in qns_state:
+            mask &= self.__match(qn_entry)
+            if not mask:
+                return []
+        candidates = []
+        while mask:
+            lowest_bit = mask & -mask
+            candidates.append(self.particles[lowest_bit.bit_length() - 1])
+            mask ^= lowest_bit
+        return candidates
+
+    def __match(self, qn_entry):
+        key = _get_qn_key(qn_entry)
+        if key is None:
+            # unknown quantum numbers raise an error in check_qns_equal
+            key = (StateQuantumNumberNames[qn_entry[_TYPE_LABEL]], None)
+        lookup = self.__lookups.get(key)
+        if lookup is None:
+            mask = 0
+            missing = self.__all_particles
+        else:
+            mask = lookup.match(qn_entry)
+            missing = self.__all_particles & ~lookup.present
+        default_value = QNDefaultValues.get(key[0])
+        if missing and default_value is not None:
+            # default spins can only be compared if the projection is known
+            if not isinstance(default_value, Spin) or (
+                _PROJECTION_LABEL in qn_entry
+            ):
+                if compare_qns(qn_entry, default_value):
+                    mask |= missing
+        return mask
+
+
+class _QuantumNumberLookup:
+    """Bit masks of the particles for each value of one quantum number."""
+
+    def __init__(self, qn_class):
+        self.qn_class = qn_class
+        self.present = 0
+        # Int and Float: value -> mask
+        # Spin: magnitude -> mask of particles with and without projection
+        self.values = defaultdict(int)
+        # Spin only: magnitude -> mask of particles without projection
+        self.no_projection = defaultdict(int)
+        # Spin only: (magnitude, projection) -> mask
+        self.projections = defaultdict(int)
+
+    def add(self, qn_entry, bit):
+        self.present |= bit
+        value = qn_entry[_VALUE_LABEL]
+        if self.qn_class is QuantumNumberClasses.Int:
+            self.values[int(value)] |= bit
+        elif self.qn_class is QuantumNumberClasses.Float:
+            self.values[float(value)] |= bit
+        else:
+            magnitude = float(value)
+            self.values[magnitude] |= bit
+            if _PROJECTION_LABEL in qn_entry:
+                projection = float(qn_entry[_PROJECTION_LABEL])
+                self.projections[(magnitude, projection)] |= bit
+            else:
+                self.no_projection[magnitude] |= bit
+
+    def match(self, qn_entry):
+        value = qn_entry[_VALUE_LABEL]
+        if self.qn_class is QuantumNumberClasses.Int:
+            return self.values.get(int(value), 0)
+        if self.qn_class is QuantumNumberClasses.Float:
+            return self.values.get(float(value), 0)
+        magnitude = float(value)
+        if _PROJECTION_LABEL not in qn_entry:
+            return self.values.get(magnitude, 0)
+        # see compare_qns: the projections are only compared if both exist
+        projection = float(qn_entry[_PROJECTION_LABEL])
+        return self.no_projection.get(magnitude, 0) | self.projections.get(
+            (magnitude, projection), 0
+        )
+
+
+# indices of recently used particle lists, see create_particle_index
+_particle_indices = OrderedDict()
+_MAX_CACHED_INDICES = 8
+
+
+def create_particle_index(allowed_particle_list=[]):
+    """Get a `.ParticleIndex` of the allowed particles.
+
+    The ``allowed_particle_list`` is interpreted as in
+    `.initialize_allowed_particle_list`, so an empty list stands for the
+    complete ``particle_list``. Indices are cached, so the index of the same
+    particles is only built once. The entries of ``particle_list`` are
+    therefore replaced rather than modified in place, see
+    `.add_to_particle_list`.
+    """
+    particles = initialize_allowed_particle_list(allowed_particle_list)
+    key = _get_particle_index_key(particles)
+    if key in _particle_indices:
+        _particle_indices.move_to_end(key)
+        return _particle_indices[key]
+    index = ParticleIndex(particles)
+    _register_particle_index(index)
+    return index
+
+
+def _get_particle_index_key(particles):
+    # the index holds references to the particles, so their ids stay unique
+    return tuple(id(particle) for particle in particles)
+
+
+def _register_particle_index(index):
+    _particle_indices[_get_particle_index_key(index.particles)] = index
+    if len(_particle_indices) > _MAX_CACHED_INDICES:
+        _particle_indices.popitem(last=False)
+
+
 def get_particle_candidates_for_state(state, allowed_particle_list):
+    """Get copies of the particles that match the quantum numbers of a state.
+
+    Args:
+        state: edge properties with the quantum numbers of the state.
+        allowed_particle_list: a `.ParticleIndex` (see
+            `.create_particle_index`) or a list of particle dictionaries.
+    """
     particle_edges = []
     qns_label = get_xml_label(XMLLabelConstants.QuantumNumber)
 
-    for allowed_state in allowed_particle_list:
-        if check_qns_equal(state[qns_label], allowed_state[qns_label]):
-            temp_particle = deepcopy(allowed_state)
-            temp_particle[qns_label] = merge_qn_props(
-                state[qns_label], allowed_state[qns_label]
-            )
-            particle_edges.append(temp_particle)
+    if isinstance(allowed_particle_list, ParticleIndex):
+        candidates = allowed_particle_list.find_candidates(state[qns_label])
+    else:
+        candidates = [
+            allowed_state
+            for allowed_state in allowed_particle_list
+            if check_qns_equal(state[qns_label], allowed_state[qns_label])
+        ]
+    for allowed_state in candidates:
+        temp_particle = deepcopy(allowed_state)
+        temp_particle[qns_label] = merge_qn_props(
+            state[qns_label], allowed_state[qns_label]
+        )
+        particle_edges.append(temp_particle)
     return particle_edges
 
 
@@ -799,10 +1260,10 @@ def compare_qns(qn_dict, qn_dict2):
 def merge_qn_props(qns_state, qns_particle):
     class_label = get_xml_label(XMLLabelConstants.Class)
     type_label = get_xml_label(XMLLabelConstants.Type)
-    qns = deepcopy(qns_particle)
+    qns = list(qns_particle)
     for qn_entry in qns_state:
         qn_found = False
-        for par_qn_entry in qns:
+        for index, par_qn_entry in enumerate(qns):
             if (
                 StateQuantumNumberNames[qn_entry[type_label]]
                 is StateQuantumNumberNames[par_qn_entry[type_label]]
@@ -810,7 +1271,7 @@ def merge_qn_props(qns_state, qns_particle):
                 is QuantumNumberClasses[par_qn_entry[class_label]]
             ):
                 qn_found = True
-                par_qn_entry.update(qn_entry)
+                qns[index] = QuantumNumber({**par_qn_entry, **qn_entry})
                 break
         if not qn_found:
             qns.append(qn_entry)
@@ -8,7 +8,6 @@ conservation rules of :mod:`.conservationrules`.
 import logging
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from copy import deepcopy
 from enum import Enum
 
 from ..solvers.constraint import (
@@ -24,13 +23,14 @@ from ..state.particle import (
     ParticlePropertyNames,
     QNClassConverterMapping,
     QNNameClassMapping,
+    QuantumNumber,
     StateQuantumNumberNames,
     XMLLabelConstants,
+    create_particle_index,
     get_interaction_property,
     get_particle_candidates_for_state,
     get_particle_property,
     get_xml_label,
-    initialize_allowed_particle_list,
     initialize_graphs_with_particles,
 )
 from ..topology.graph import (
@@ -547,7 +547,7 @@ class CSPPropagator(AbstractPropagator):
         initial_edges = get_initial_state_edges(self.graph)
         final_edges = get_final_state_edges(self.graph)
 
-        full_allowed_particle_list = initialize_allowed_particle_list(
+        allowed_particle_index = create_particle_index(
             self.allowed_intermediate_particles
         )
 
@@ -559,7 +559,7 @@ class CSPPropagator(AbstractPropagator):
         found_JPs = set()
 
         for solution in solutions:
-            graph_copy = deepcopy(self.graph)
+            graph_copy = self.graph.copy()
             for var_name, value in solution.items():
                 var_info = decode_variable_name(
                     var_name, self.particle_variable_delimiter
@@ -592,7 +592,7 @@ class CSPPropagator(AbstractPropagator):
                     # now do actual candidate finding
                     candidates = get_particle_candidates_for_state(
                         graph_copy.edge_props[int_edge_id],
-                        full_allowed_particle_list,
+                        allowed_particle_index,
                     )
                     if not candidates:
                         solution_valid = False
@@ -618,17 +618,18 @@ def add_qn_to_graph_element(graph, var_info, value):
 
     element_id = var_info.element_id
     qn_name = var_info.qn_name
-    graph_prop_dict = graph.edge_props
     if var_info.graph_element_type is graph_element_types.node:
-        graph_prop_dict = graph.node_props
+        element_props = graph.get_writable_node_props(element_id)
+    else:
+        element_props = graph.get_writable_edge_props(element_id)
 
     converter = QNClassConverterMapping[QNNameClassMapping[qn_name]]
 
-    if element_id not in graph_prop_dict:
-        graph_prop_dict[element_id] = {qns_label: []}
+    if qns_label not in element_props:
+        element_props[qns_label] = []
 
-    graph_prop_dict[element_id][qns_label].append(
-        converter.convert_to_dict(qn_name, value)
+    element_props[qns_label].append(
+        QuantumNumber(converter.convert_to_dict(qn_name, value))
     )
 
 
@@ -1,6 +1,7 @@
 """graph module - some description here."""
 
 from collections import OrderedDict
+from copy import copy, deepcopy
 
 
 def are_graphs_isomorphic(graph1, graph2):
@@ -131,6 +132,9 @@ class StateTransitionGraph:
         self.node_props = {}
         self.edge_props = {}
         self.graph_element_properties_comparator = None
+        # ids of the properties that are not shared with copies of the graph
+        self.__writable_node_ids = set()
+        self.__writable_edge_ids = set()
 
     def set_graph_element_properties_comparator(self, comparator):
         self.graph_element_properties_comparator = comparator
@@ -190,6 +194,69 @@ class StateTransitionGraph:
         else:
             return NotImplemented
 
+    def copy(self):
+        """Create a copy of the graph that shares the element properties.
+
+        The nodes and edges of the copy are independent of those of this
+        graph, but the property dictionaries of the nodes and edges are
+        shared until they are modified. This makes the copy much faster than
+        a `~copy.deepcopy`.
+
+        Because of the sharing, a property dictionary of this graph or of
+        the copy may only be modified in place if it was obtained with
+        `get_writable_node_props` or `get_writable_edge_props`. To replace
+        it as a whole, use `set_node_props` or `set_edge_props` instead of
+        assigning to :code:`node_props` or :code:`edge_props` directly.
+        """
+        new_graph = copy(self)
+        new_graph.nodes = list(self.nodes)
+        new_graph.edges = {
+            edge_id: copy(edge) for edge_id, edge in self.edges.items()
+        }
+        new_graph.node_props = dict(self.node_props)
+        new_graph.edge_props = dict(self.edge_props)
+        new_graph.__writable_node_ids = set()
+        new_graph.__writable_edge_ids = set()
+        self.__writable_node_ids.clear()
+        self.__writable_edge_ids.clear()
+        return new_graph
+
+    def get_writable_node_props(self, node_id):
+        """Get the properties of a node so that they can be modified in place.
+
+        The properties are copied if they may be shared with another graph
+        (see `copy`). If the node has no properties yet, they are created.
+        """
+        return _get_writable_props(
+            self.node_props, self.__writable_node_ids, node_id
+        )
+
+    def get_writable_edge_props(self, edge_id):
+        """Get the properties of an edge so that they can be modified in place.
+
+        See `get_writable_node_props`.
+        """
+        return _get_writable_props(
+            self.edge_props, self.__writable_edge_ids, edge_id
+        )
+
+    def set_node_props(self, node_id, props):
+        """Replace the properties of a node.
+
+        The new properties may be shared with other graphs, so they are
+        copied by `get_writable_node_props` before they are modified.
+        """
+        self.node_props[node_id] = props
+        self.__writable_node_ids.discard(node_id)
+
+    def set_edge_props(self, edge_id, props):
+        """Replace the properties of an edge.
+
+        See `set_node_props`.
+        """
+        self.edge_props[edge_id] = props
+        self.__writable_edge_ids.discard(edge_id)
+
     def add_node(self, node_id):
         """Adds a node with id node_id.
 
@@ -280,6 +347,16 @@ class StateTransitionGraph:
         self.edges[edge_id2] = val1
         self.edges[edge_id1] = val2
 
+        writable_ids = self.__writable_edge_ids
+        is_writable1 = edge_id1 in writable_ids
+        is_writable2 = edge_id2 in writable_ids
+        writable_ids.discard(edge_id1)
+        writable_ids.discard(edge_id2)
+        if is_writable1:
+            writable_ids.add(edge_id2)
+        if is_writable2:
+            writable_ids.add(edge_id1)
+
         val1 = None
         val2 = None
         if edge_id1 in self.edge_props:
@@ -298,6 +375,15 @@ class StateTransitionGraph:
         return True
 
 
+def _get_writable_props(element_props, writable_ids, element_id):
+    if element_id not in element_props:
+        element_props[element_id] = {}
+    elif element_id not in writable_ids:
+        element_props[element_id] = deepcopy(element_props[element_id])
+    writable_ids.add(element_id)
+    return element_props[element_id]
+
+
 class InteractionNode:
     """struct-like definition of an interaction node."""
 
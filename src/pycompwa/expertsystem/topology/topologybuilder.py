@@ -114,7 +114,7 @@ class SimpleStateTransitionTopologyBuilder:
 
 
 def attach_node_to_edges(graph, interaction_node, ingoing_edge_ids):
-    temp_graph = copy.deepcopy(graph[0])
+    temp_graph = graph[0].copy()
     new_open_end_lines = copy.deepcopy(graph[1])
 
     # add node
@@ -1,12 +1,14 @@
 # cspell:ignore analyse vmubar vebar vtau vtaubar
 import inspect
+import json
 import logging
+import sys
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from copy import deepcopy
 from itertools import permutations, product
 from multiprocessing import Pool
-from os import path
+from os import makedirs, path
 
 from progress.bar import IncrementalBar
 
@@ -17,9 +19,11 @@ from ..state.particle import (
     StateQuantumNumberNames,
     XMLLabelConstants,
     get_interaction_property,
+    get_particle_list_cache_dir,
     get_particle_property,
     get_xml_label,
     initialize_graph,
+    is_particle_list_cache_enabled,
     load_particle_list_from_xml,
     particle_list,
 )
@@ -150,18 +154,16 @@ def remove_duplicate_solutions(
     logging.info("removing these qns from graphs: " + str(remove_qns_list))
     logging.info("ignoring qns in graph comparison: " + str(ignore_qns_list))
     filtered_results = {}
-    solutions = []
+    solution_keys = set()
     remove_counter = 0
     for strength, group_results in results.items():
         for (sol_graphs, rule_violations) in group_results:
             temp_graphs = []
             for sol_graph in sol_graphs:
                 sol_graph = remove_qns_from_graph(sol_graph, remove_qns_list)
-                found_graph = check_equal_ignoring_qns(
-                    sol_graph, solutions, ignore_qns_list
-                )
-                if found_graph is None:
-                    solutions.append(sol_graph)
+                sol_graph_key = create_graph_key(sol_graph, ignore_qns_list)
+                if sol_graph_key not in solution_keys:
+                    solution_keys.add(sol_graph_key)
                     temp_graphs.append(sol_graph)
                 else:
                     # check if found solution also has the prefactors
@@ -185,39 +187,22 @@ def remove_qns_from_graph(graph, qn_list):
     state_qns = [x for x in qn_list if isinstance(x, StateQuantumNumberNames)]
     part_props = [x for x in qn_list if isinstance(x, ParticlePropertyNames)]
 
-    graph_copy = deepcopy(graph)
-
-    for int_qn in int_qns:
-        for props in graph_copy.node_props.values():
-            if qns_label in props:
-                for qn_entry in props[qns_label]:
-                    if (
-                        InteractionQuantumNumberNames[qn_entry[type_label]]
-                        is int_qn
-                    ):
-                        del props[qns_label][props[qns_label].index(qn_entry)]
-                        break
-
-    for state_qn in state_qns:
-        for props in graph_copy.edge_props.values():
-            if qns_label in props:
-                for qn_entry in props[qns_label]:
-                    if (
-                        StateQuantumNumberNames[qn_entry[type_label]]
-                        is state_qn
-                    ):
-                        del props[qns_label][props[qns_label].index(qn_entry)]
-                        break
-
-    for part_prop in part_props:
-        for props in graph_copy.edge_props.values():
-            if qns_label in props:
-                for qn_entry in graph_copy.edge_props[qns_label]:
-                    if (
-                        ParticlePropertyNames[qn_entry[type_label]]
-                        is part_prop
-                    ):
-                        del props[qns_label][props[qns_label].index(qn_entry)]
+    graph_copy = graph.copy()
+
+    node_props = (graph_copy.node_props, graph_copy.get_writable_node_props)
+    edge_props = (graph_copy.edge_props, graph_copy.get_writable_edge_props)
+    for qn_names, (element_props, get_writable_props) in [
+        (int_qns, node_props),
+        (state_qns, edge_props),
+        (part_props, edge_props),
+    ]:
+        for qn_name in qn_names:
+            for element_id in list(element_props):
+                qn_entries = element_props[element_id].get(qns_label, [])
+                for index, qn_entry in enumerate(qn_entries):
+                    if qn_entry[type_label] == qn_name.name:
+                        # only copy the properties that are modified
+                        del get_writable_props(element_id)[qns_label][index]
                         break
     return graph_copy
 
@@ -244,6 +229,26 @@ def check_equal_ignoring_qns(ref_graph, solutions, ignored_qn_list):
     return found_graph
 
 
+def create_graph_key(graph, ignored_qn_list=[]):
+    """Create a hashable key of a graph, ignoring certain quantum numbers.
+
+    Two graphs have the same key if and only if they are equal according to
+    `check_equal_ignoring_qns`. The key does not depend on the order of the
+    nodes, edges and quantum numbers, so duplicate graphs can be found with
+    a `dict` or a `set` instead of comparing all pairs of graphs.
+    """
+    comparator = CompareGraphElementPropertiesFunctor(ignored_qn_list)
+    return (
+        frozenset(graph.nodes),
+        frozenset(
+            (edge_id, edge.ending_node_id, edge.originating_node_id)
+            for edge_id, edge in graph.edges.items()
+        ),
+        comparator.create_key(graph.node_props),
+        comparator.create_key(graph.edge_props),
+    )
+
+
 def filter_graphs(graphs, filters):
     """Implements filtering of a list of :class:`.StateTransitionGraph` 's.
 
@@ -498,7 +503,7 @@ def external_edge_identical_particle_combinatorics(
         temp_new_graphs = []
         for g in new_graphs:
             for c in ext_edge_combinations:
-                g_new = deepcopy(g)
+                g_new = g.copy()
                 swappings = calculate_swappings(c)
                 for edge_id1, edge_id2 in swappings.items():
                     g_new.swap_edges(edge_id1, edge_id2)
@@ -507,6 +512,67 @@ def external_edge_identical_particle_combinatorics(
     return new_graphs
 
 
+def _find_particle_list_file(use_cache=None):
+    """Find the default ``particle_list.xml``.
+
+    The search paths are searched in order, but the entries of
+    :code:`sys.path` can be many and slow to access, for instance on network
+    file systems. If the file is found there, its location is stored next to
+    the cached particle lists (see `.load_particle_list_from_xml`), so that
+    later processes find it without searching :code:`sys.path` again. This
+    is skipped if the cache is disabled (see
+    `.is_particle_list_cache_enabled`).
+    """
+    use_cache = is_particle_list_cache_enabled(use_cache)
+    module_dir = path.dirname(inspect.getfile(StateTransitionManager))
+    fallback_paths = set(sys.path)
+    search_paths = []
+    for search_path in default_particle_list_search_paths:
+        if not search_path.startswith("/"):  # relative path
+            search_path = module_dir + "/" + search_path
+        search_paths.append(search_path + "/particle_list.xml")
+    location_file = path.join(
+        get_particle_list_cache_dir(), "particle_list_location.json"
+    )
+    for search_path, file_path in zip(
+        default_particle_list_search_paths, search_paths
+    ):
+        if search_path in fallback_paths:
+            break
+        if path.exists(file_path):
+            return file_path
+    if use_cache:
+        try:
+            with open(location_file) as stream:
+                location = json.load(stream)
+            if location["search_paths"] == search_paths and path.exists(
+                location["file_path"]
+            ):
+                return location["file_path"]
+        except (OSError, ValueError, KeyError):
+            pass
+    for file_path in search_paths:
+        if path.exists(file_path):
+            if use_cache:
+                _store_particle_list_location(
+                    location_file, search_paths, file_path
+                )
+            return file_path
+    return None
+
+
+def _store_particle_list_location(location_file, search_paths, file_path):
+    try:
+        makedirs(path.dirname(location_file), exist_ok=True)
+        with open(location_file, "w") as stream:
+            json.dump(
+                {"search_paths": search_paths, "file_path": file_path},
+                stream,
+            )
+    except OSError:
+        pass
+
+
 class StateTransitionManager:
     def __init__(
         self,
@@ -518,6 +584,7 @@ class StateTransitionManager:
         topology_building="isobar",
         number_of_threads=4,
         propagation_mode="fast",
+        use_particle_list_cache=None,
     ):
         self.number_of_threads = number_of_threads
         self.propagation_mode = propagation_mode
@@ -567,24 +634,15 @@ class StateTransitionManager:
 
         # load default particles from database/file
         if len(particle_list) == 0:
-            for search_path in default_particle_list_search_paths:
-                if search_path.startswith("/"):  # absolute path
-                    file_path = search_path
-                else:  # relative path
-                    file_path = (
-                        path.dirname(inspect.getfile(StateTransitionManager))
-                        + "/"
-                        + search_path
-                    )
-                file_path += "/particle_list.xml"
-                if path.exists(file_path):
-                    load_particle_list_from_xml(file_path)
-                    logging.info(
-                        "loaded "
-                        + str(len(particle_list))
-                        + " particles from xml file!"
-                    )
-                    break
+            file_path = _find_particle_list_file(use_particle_list_cache)
+            if file_path is not None:
+                load_particle_list_from_xml(
+                    file_path, use_cache=use_particle_list_cache
+                )
+                logging.info(
+                    "loaded " + str(len(particle_list)) + " particles from xml"
+                    " file!"
+                )
         if len(particle_list) == 0:
             raise FileNotFoundError(
                 "\n  Failed to load particle_list.xml from search paths!"
@@ -796,6 +854,9 @@ class StateTransitionManager:
             final_solutions.extend(
                 perform_external_edge_identical_particle_combinatorics(sol)
             )
+        # the solutions share properties internally (see
+        # StateTransitionGraph.copy), but users may modify them in place
+        final_solutions = [deepcopy(x) for x in final_solutions]
 
         return (final_solutions, violated_laws)
 
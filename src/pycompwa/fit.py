@@ -0,0 +1,182 @@
+"""Run fits in the background.
+
+:func:`optimize_async` starts a fit in another thread and immediately returns
+a :class:`FitFuture`. That is a :class:`concurrent.futures.Future`, so it can
+be awaited in :mod:`asyncio` through :func:`asyncio.wrap_future`. It also
+reports the progress of the fit and can stop a running fit early with
+:meth:`FitFuture.stop`.
+
+.. code-block:: python
+
+    future = optimize_async(
+        optimizer, estimator, parameters,
+        callback=lambda progress: print(progress.call_count),
+    )
+    ...
+    if future.progress.elapsed_time > 3600:
+        future.stop()
+"""
+
+__all__ = [
+    "FitCancelled",
+    "FitFuture",
+    "FitProgress",
+    "optimize_async",
+]
+
+
+import threading
+from concurrent.futures import CancelledError, Executor, Future
+from typing import Callable, NamedTuple
+
+from pycompwa import ui
+
+
+class FitCancelled(CancelledError):
+    """Raised by :meth:`FitFuture.result` if a running fit was stopped."""
+
+
+class FitProgress(NamedTuple):
+    """Snapshot of the progress of a running fit."""
+
+    call_count: int
+    """Number of evaluations of the estimator so far."""
+    estimator_value: float
+    """Value of the last evaluation of the estimator."""
+    elapsed_time: float
+    """Seconds since the fit was started."""
+
+
+class FitFuture(Future):
+    """Future of a fit that was started with :func:`optimize_async`.
+
+    The result is the :class:`.FitResult` returned by the optimizer.
+    """
+
+    def __init__(self, estimator: ui.MonitoredEstimator):
+        super().__init__()
+        self.__estimator = estimator
+
+    @property
+    def progress(self) -> FitProgress:
+        """Get the current progress of the fit."""
+        return FitProgress(
+            call_count=self.__estimator.call_count,
+            estimator_value=self.__estimator.last_value,
+            elapsed_time=self.__estimator.elapsed_time,
+        )
+
+    def stop(self) -> bool:
+        """Stop the fit early.
+
+        A fit that has not started yet is cancelled like with :meth:`cancel`.
+        A running fit is stopped cooperatively: the estimator is no longer
+        evaluated, so the optimizer finishes after a few more iterations.
+        :meth:`result` then raises :class:`FitCancelled`, but
+        :meth:`cancelled` stays `False`, because the fit did run.
+
+        Returns:
+            `False` if the fit has already finished, `True` otherwise.
+        """
+        if self.cancel():
+            return True
+        if self.done():
+            return False
+        self.__estimator.cancel()
+        return True
+
+
+def optimize_async(
+    optimizer,
+    estimator: ui.Estimator,
+    parameters,
+    callback: Callable[[FitProgress], None] = None,
+    interval: float = 1.0,
+    executor: Executor = None,
+) -> FitFuture:
+    """Start a fit without waiting for it to finish.
+
+    Parameters:
+        optimizer: An optimizer like :class:`.MinuitIF`.
+        estimator: The :class:`.Estimator` that is minimized.
+        parameters: The fit parameters, as for the :code:`optimize` method of
+            the ``optimizer``.
+        callback: Function that is called every ``interval`` seconds with the
+            :class:`FitProgress` while the fit runs.
+        interval: Seconds between two calls of the ``callback``.
+        executor: Run the fit in this executor instead of in a new thread.
+            The optimizer releases the GIL, so a
+            :class:`~concurrent.futures.ThreadPoolExecutor` runs fits in
+            parallel, provided that each fit has its own optimizer,
+            estimator and intensity.
+
+    Returns:
+        A :class:`FitFuture` that is resolved with the :class:`.FitResult`.
+    """
+    monitored_estimator = ui.MonitoredEstimator(estimator)
+    future = FitFuture(monitored_estimator)
+    arguments = (future, monitored_estimator, optimizer, parameters)
+    if executor is None:
+        threading.Thread(target=_run_fit, args=arguments, daemon=True).start()
+    else:
+        _link_futures(future, executor.submit(_run_fit, *arguments))
+    if callback is not None:
+        _start_progress_reporting(future, callback, interval)
+    return future
+
+
+def _run_fit(
+    future: FitFuture,
+    estimator: ui.MonitoredEstimator,
+    optimizer,
+    parameters,
+) -> None:
+    if not future.set_running_or_notify_cancel():
+        return
+    try:
+        result = optimizer.optimize(estimator, parameters)
+    except BaseException as exception:  # pylint: disable=broad-except
+        future.set_exception(exception)
+        return
+    if estimator.cancelled:
+        future.set_exception(
+            FitCancelled(
+                f"Fit was cancelled after {estimator.call_count} estimator "
+                "calls"
+            )
+        )
+    else:
+        future.set_result(result)
+
+
+def _link_futures(future: FitFuture, job: Future) -> None:
+    """Cancel the job of the executor with the fit and forward its failures."""
+
+    def on_fit_done(_: FitFuture) -> None:
+        if future.cancelled():
+            job.cancel()
+
+    def on_job_done(_: Future) -> None:
+        if future.done():
+            return
+        if job.cancelled():
+            future.cancel()
+        elif job.exception() is not None:
+            future.set_exception(job.exception())
+
+    future.add_done_callback(on_fit_done)
+    job.add_done_callback(on_job_done)
+
+
+def _start_progress_reporting(
+    future: FitFuture, callback: Callable[[FitProgress], None], interval: float
+) -> None:
+    finished = threading.Event()
+    future.add_done_callback(lambda _: finished.set())
+
+    def report():
+        while not finished.wait(interval):
+            if future.running():
+                callback(future.progress)
+
+    threading.Thread(target=report, daemon=True).start()
@@ -0,0 +1,201 @@
+"""Compute fit fractions with correlated errors.
+
+A fit fraction is the ratio of the integrals of two intensity components over
+a phase space sample, typically of a single resonance and of the full model.
+Its errors follow from the covariance matrix of the fit through the
+derivatives of the fractions with respect to the free parameters.
+
+:func:`calculate_fit_fractions` computes these derivatives numerically. For
+each shift of a parameter, all distinct components are integrated once, so
+that a denominator that is shared by all fractions is not integrated again
+for every fraction. The shifts are distributed over a thread pool, in which
+each thread works on its own copy of the components. The result contains the
+full covariance matrix of the fractions.
+
+With an :class:`.IntegralCache`, the components are not integrated for every
+shift. Their interference integrals are computed once and reused for all
+shifts of the coefficients, and for later calculations with the same model
+and phase space sample, for instance for the fits of a toy study.
+"""
+
+__all__ = [
+    "FitFractions",
+    "calculate_fit_fractions",
+]
+
+
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from pycompwa import ui
+from pycompwa.integrals import (
+    IntegralCache,
+    hash_data_set,
+    integrate_intensity,
+)
+
+ComponentPairs = List[Tuple[ui.IntensityComponent, ui.IntensityComponent]]
+
+
+class FitFractions(NamedTuple):
+    """Fit fractions and their covariance matrix."""
+
+    names: List[str]
+    """Names of the numerator components."""
+    values: np.ndarray
+    """Values of the fit fractions."""
+    errors: np.ndarray
+    """Errors of the fit fractions, the square root of the diagonal of the
+    :attr:`covariance`."""
+    covariance: np.ndarray
+    """Covariance matrix of the fit fractions."""
+
+    @property
+    def correlation(self) -> np.ndarray:
+        """Correlation matrix of the fit fractions."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.covariance / np.outer(self.errors, self.errors)
+
+
+def calculate_fit_fractions(
+    create_components: Callable[[], ComponentPairs],
+    phsp_sample: ui.DataSet,
+    fit_result: ui.FitResult,
+    n_threads: int = None,
+    step: float = 0.01,
+    integral_cache: IntegralCache = None,
+    model_key: str = None,
+) -> FitFractions:
+    """Calculate fit fractions and propagate the errors of the fit.
+
+    This is a parallel version of
+    :func:`~.ui.fit_fractions_with_propagated_errors` that also returns the
+    correlations between the fractions.
+
+    Parameters:
+        create_components: Function that creates the pairs of numerator and
+            denominator :class:`.IntensityComponent`, for instance with
+            :meth:`.create_intensity_components` of a new
+            :class:`.IntensityBuilderXML`. It is called once for each thread,
+            so that the threads can change the parameters of their copies of
+            the components independently. Components with the same name are
+            integrated only once.
+        phsp_sample: The phase space :class:`.DataSet` over which the
+            components are integrated.
+        fit_result: The :class:`.FitResult` with the final parameters and
+            their covariance matrix.
+        n_threads: Number of threads. Defaults to the number of CPUs.
+        step: Step of the numerical derivatives, in units of the error of
+            each parameter.
+        integral_cache: Get the integrals of the components from this
+            :class:`.IntegralCache` instead of integrating each component for
+            each shift of the parameters.
+        model_key: A string that identifies the structure of the model in
+            the ``integral_cache``, for instance :func:`.hash_file` of the
+            model file. Required if an ``integral_cache`` is given.
+
+    Returns:
+        The :class:`FitFractions` at the final parameters of the fit.
+    """
+    parameters = {
+        parameter.name: parameter.value
+        for parameter in fit_result.final_parameters
+    }
+    free_parameters = [
+        parameter
+        for parameter in fit_result.final_parameters
+        if not parameter.is_fixed
+    ]
+    covariance = np.array(fit_result.covariance_matrix, dtype=float)
+    if covariance.shape != (len(free_parameters), len(free_parameters)):
+        raise ValueError(
+            f"Covariance matrix of shape {covariance.shape} does not match "
+            f"the {len(free_parameters)} free parameters of the fit result"
+        )
+    shifts = list()
+    for parameter in free_parameters:
+        lower_error, upper_error = parameter.error
+        error = 0.5 * (abs(lower_error) + abs(upper_error))
+        if error <= 0.0:
+            error = max(abs(parameter.value), 1.0) * 1e-3
+        for sign in (+1.0, -1.0):
+            shifted = dict(parameters)
+            shifted[parameter.name] = parameter.value + sign * step * error
+            shifts.append(shifted)
+
+    if integral_cache is None:
+
+        def integrate(components: List[ui.IntensityComponent]) -> Dict:
+            return {
+                component.name: integrate_intensity(
+                    component.intensity, phsp_sample
+                )
+                for component in components
+            }
+
+    else:
+        if model_key is None:
+            raise ValueError("An integral cache requires a model key")
+        phsp_key = hash_data_set(phsp_sample)
+
+        def integrate(components: List[ui.IntensityComponent]) -> Dict:
+            return integral_cache.integrate(
+                components, phsp_sample, model_key, phsp_key
+            )
+
+    if n_threads is None:
+        n_threads = os.cpu_count()
+    n_threads = max(1, min(int(n_threads), len(shifts) + 1))
+    replicas: queue.Queue = queue.Queue()
+    for _ in range(n_threads):
+        replicas.put(create_components())
+
+    def compute(values: Dict[str, float]) -> np.ndarray:
+        pairs = replicas.get()
+        try:
+            return _compute_fractions(pairs, values, integrate)
+        finally:
+            replicas.put(pairs)
+
+    with ThreadPoolExecutor(n_threads) as executor:
+        results = list(executor.map(compute, [parameters] + shifts))
+    fractions = results[0]
+    gradient = np.empty((len(fractions), len(free_parameters)))
+    for i, parameter in enumerate(free_parameters):
+        upper = shifts[2 * i][parameter.name]
+        lower = shifts[2 * i + 1][parameter.name]
+        gradient[:, i] = (results[2 * i + 1] - results[2 * i + 2]) / (
+            upper - lower
+        )
+    fraction_covariance = gradient @ covariance @ gradient.T
+    names = [numerator.name for numerator, _ in replicas.get()]
+    return FitFractions(
+        names=names,
+        values=fractions,
+        errors=np.sqrt(np.diag(fraction_covariance)),
+        covariance=fraction_covariance,
+    )
+
+
+def _compute_fractions(
+    pairs: ComponentPairs,
+    parameters: Dict[str, float],
+    integrate: Callable[[List[ui.IntensityComponent]], Dict[str, float]],
+) -> np.ndarray:
+    components = dict()
+    for pair in pairs:
+        for component in pair:
+            components.setdefault(component.name, component)
+    for component in components.values():
+        component.intensity.update_parameters(parameters)
+    integrals = integrate(list(components.values()))
+    return np.array(
+        [
+            integrals[numerator.name] / integrals[denominator.name]
+            for numerator, denominator in pairs
+        ]
+    )
@@ -0,0 +1,364 @@
+"""Cached and parallel generation of event samples.
+
+Phase space samples for normalization integrals are often generated over and
+over again with the same settings. The functions in this module put an on-disk
+cache in front of :func:`.ui.generate_phsp` and
+:func:`.ui.generate_importance_sampled_phsp`. Samples are identified by a hash
+of everything that determines them: the final state masses, the initial state
+four-momentum, the types of the generators, the seed, and the sample size.
+
+The samples are stored as :mod:`numpy` files. Loading a cached sample is
+much faster than generating it, but each job that loads a sample holds its
+own copy of the events in memory.
+
+Intensity-based samples can be generated on several cores with
+:func:`generate_parallel`.
+"""
+
+__all__ = [
+    "generate_importance_sampled_phsp",
+    "generate_parallel",
+    "generate_phsp",
+    "get_cache_dir",
+    "get_process_context",
+    "spawn_seeds",
+]
+
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from pycompwa import ui
+
+_MOMENTA_FILE = "momenta.npy"
+_WEIGHTS_FILE = "weights.npy"
+_SPECIFICATION_FILE = "specification.json"
+
+# objects that each worker of generate_parallel gets in _initialize_worker
+_WORKER_STATE: dict = dict()
+
+
+def generate_phsp(
+    size: int,
+    kinematics_info: ui.ParticleStateTransitionKinematicsInfo,
+    seed: int,
+    generator_type: type = ui.EvtGenGenerator,
+    random_generator_type: type = ui.StdUniformRealGenerator,
+    cache_dir: str = None,
+) -> ui.EventCollection:
+    """Generate a phase space sample or load it from the cache.
+
+    Parameters:
+        size: Number of events to generate.
+        kinematics_info: Kinematics info of the decay, which you can get
+            from a :class:`.HelicityKinematics` instance through
+            :meth:`~.get_particle_state_transition_kinematics_info`.
+        seed: Seed for the random number generator.
+        generator_type: Class of the :class:`.PhaseSpaceEventGenerator`.
+        random_generator_type: Class of the
+            :class:`.UniformRealNumberGenerator`.
+        cache_dir: Directory of the cache, see :func:`get_cache_dir`.
+    """
+    specification = _create_specification(
+        size, kinematics_info, seed, generator_type, random_generator_type
+    )
+
+    def generate():
+        generator = generator_type(kinematics_info)
+        random_generator = random_generator_type(seed)
+        return ui.generate_phsp(size, generator, random_generator)
+
+    return _load_or_generate(specification, generate, cache_dir)
+
+
+def generate_importance_sampled_phsp(
+    size: int,
+    kinematics: ui.Kinematics,
+    intensity: ui.Intensity,
+    intensity_key: str,
+    seed: int,
+    generator_type: type = ui.EvtGenGenerator,
+    random_generator_type: type = ui.StdUniformRealGenerator,
+    cache_dir: str = None,
+) -> ui.EventCollection:
+    """Generate an importance sampled phase space sample or load it.
+
+    Parameters:
+        size: Number of events to generate.
+        kinematics: A :class:`.HelicityKinematics` instance.
+        intensity: The :class:`.Intensity` with which the sample is weighted.
+        intensity_key: A string that identifies the ``intensity``, for
+            instance a hash of the model file. An intensity cannot be hashed
+            automatically, so the cache relies on this key to distinguish
+            samples of different models and parameters.
+        seed: Seed for the random number generator.
+        generator_type: Class of the :class:`.PhaseSpaceEventGenerator`.
+        random_generator_type: Class of the
+            :class:`.UniformRealNumberGenerator`.
+        cache_dir: Directory of the cache, see :func:`get_cache_dir`.
+    """
+    kinematics_info = (
+        kinematics.get_particle_state_transition_kinematics_info()
+    )
+    specification = _create_specification(
+        size, kinematics_info, seed, generator_type, random_generator_type
+    )
+    specification["intensity"] = intensity_key
+
+    def generate():
+        generator = generator_type(kinematics_info)
+        random_generator = random_generator_type(seed)
+        return ui.generate_importance_sampled_phsp(
+            size, kinematics, generator, intensity, random_generator
+        )
+
+    return _load_or_generate(specification, generate, cache_dir)
+
+
+def generate_parallel(
+    size: int,
+    kinematics: ui.Kinematics,
+    phsp_generator: ui.PhaseSpaceEventGenerator,
+    intensity: ui.Intensity,
+    base_seed: int,
+    n_workers: int = None,
+    random_generator_type: type = ui.StdUniformRealGenerator,
+) -> ui.EventCollection:
+    """Generate a sample from an intensity on several processes.
+
+    The sample is split into ``n_workers`` shards that are generated with
+    :func:`.ui.generate` in a process pool and merged afterwards. The random
+    generator of each shard is seeded with a seed that is derived from
+    ``base_seed`` through :class:`numpy.random.SeedSequence`, so the result is
+    reproducible for a fixed ``base_seed`` and ``n_workers``.
+
+    The ComPWA objects cannot be pickled, so the workers are forked and
+    inherit them. Forking is only safe if the process runs no other threads,
+    such as a fit that was started with :func:`.optimize_async`. It is not
+    available on Windows and unreliable on macOS. In these cases, the shards
+    are generated one after the other in the current process, which gives
+    the same sample.
+
+    Parameters:
+        size: Total number of events to generate.
+        kinematics: The :class:`.Kinematics` of the decay.
+        phsp_generator: The :class:`.PhaseSpaceEventGenerator`.
+        intensity: The :class:`.Intensity` from which the sample is drawn.
+        base_seed: Seed from which the seeds of the shards are derived.
+        n_workers: Number of processes and shards. Defaults to the number of
+            CPUs.
+        random_generator_type: Class of the
+            :class:`.UniformRealNumberGenerator` of each shard.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    n_workers = max(1, min(int(n_workers), int(size)))
+    seeds = spawn_seeds(base_seed, n_workers)
+    shards = [
+        (size // n_workers + (i < size % n_workers), seed)
+        for i, seed in enumerate(seeds)
+    ]
+    initargs = (kinematics, phsp_generator, intensity, random_generator_type)
+    context = get_process_context()
+    if n_workers == 1 or context is None:
+        _initialize_worker(*initargs)
+        try:
+            results = [_generate_shard(shard) for shard in shards]
+        finally:
+            _WORKER_STATE.clear()
+    else:
+        with context.Pool(
+            n_workers, initializer=_initialize_worker, initargs=initargs
+        ) as pool:
+            results = pool.map(_generate_shard, shards, chunksize=1)
+    pids = results[0][0]
+    momenta = np.concatenate([momenta for _, momenta, _ in results])
+    weights = np.concatenate([weights for _, _, weights in results])
+    return ui.EventCollection.from_numpy(pids, momenta, weights)
+
+
+def get_cache_dir(cache_dir: str = None) -> str:
+    """Get the directory in which phase space samples are cached.
+
+    If ``cache_dir`` is not specified, this is :file:`pycompwa/phsp` in the
+    user cache directory (:envvar:`XDG_CACHE_HOME` or :file:`~/.cache`).
+    """
+    if cache_dir is not None:
+        return cache_dir
+    user_cache = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(user_cache, "pycompwa", "phsp")
+
+
+def _create_specification(
+    size: int,
+    kinematics_info: ui.ParticleStateTransitionKinematicsInfo,
+    seed: int,
+    generator_type: type,
+    random_generator_type: type,
+) -> dict:
+    return {
+        "size": int(size),
+        "pids": list(kinematics_info.get_final_state_pids()),
+        "final_state_masses": list(kinematics_info.get_final_state_masses()),
+        "initial_state_four_momentum": list(
+            kinematics_info.get_initial_state_four_momentum()
+        ),
+        "generator": generator_type.__name__,
+        "random_generator": random_generator_type.__name__,
+        "seed": int(seed),
+    }
+
+
+def get_process_context(allow_spawn: bool = False):
+    """Get the :mod:`multiprocessing` context for a pool of workers.
+
+    Workers are forked if that is safe, that is, if the current process runs
+    no other threads, such as a fit that was started with
+    :func:`.optimize_async`. A forked child could otherwise deadlock on a
+    lock that another thread held at the time of the fork. Forking is not
+    available on Windows and unreliable on macOS.
+
+    Parameters:
+        allow_spawn: Start the workers with :code:`"spawn"` if they cannot
+            be forked. This requires that the initialization arguments and
+            tasks of the workers can be pickled, which is not the case for
+            ComPWA objects.
+
+    Returns:
+        The context, or `None` if no workers can be started, so that the work
+        has to be done in the current process.
+    """
+    if _can_fork():
+        return multiprocessing.get_context("fork")
+    if allow_spawn:
+        return multiprocessing.get_context("spawn")
+    return None
+
+
+def spawn_seeds(base_seed: int, number: int) -> List[int]:
+    """Derive independent seeds for a :class:`.StdUniformRealGenerator`.
+
+    The seeds are derived from ``base_seed`` through
+    :class:`numpy.random.SeedSequence`.
+    """
+    return [
+        int(sequence.generate_state(1)[0] >> 1)
+        for sequence in np.random.SeedSequence(base_seed).spawn(number)
+    ]
+
+
+def _can_fork() -> bool:
+    """Check whether worker processes can be forked safely.
+
+    A forked child can deadlock if another thread of the parent held a lock
+    at the time of the fork.
+    """
+    return (
+        "fork" in multiprocessing.get_all_start_methods()
+        and sys.platform != "darwin"
+        and threading.active_count() == 1
+    )
+
+
+def _initialize_worker(
+    kinematics: ui.Kinematics,
+    phsp_generator: ui.PhaseSpaceEventGenerator,
+    intensity: ui.Intensity,
+    random_generator_type: type,
+) -> None:
+    _WORKER_STATE.update(
+        kinematics=kinematics,
+        phsp_generator=phsp_generator,
+        intensity=intensity,
+        random_generator_type=random_generator_type,
+    )
+
+
+def _generate_shard(shard: tuple) -> tuple:
+    size, seed = shard
+    random_generator = _WORKER_STATE["random_generator_type"](seed)
+    events = ui.generate(
+        size,
+        _WORKER_STATE["kinematics"],
+        _WORKER_STATE["phsp_generator"],
+        _WORKER_STATE["intensity"],
+        random_generator,
+    )
+    return list(events.pids), events.to_numpy(), events.weights()
+
+
+def _load_or_generate(
+    specification: dict, generate, cache_dir: str = None
+) -> ui.EventCollection:
+    cache_dir = get_cache_dir(cache_dir)
+    serialized = json.dumps(specification, sort_keys=True)
+    key = hashlib.sha256(serialized.encode()).hexdigest()
+    directory = os.path.join(cache_dir, key)
+    if os.path.exists(directory):
+        events = _load(directory, specification["size"])
+        if events is not None:
+            return events
+        # incomplete or corrupt, for instance after the disk was full
+        shutil.rmtree(directory, ignore_errors=True)
+    events = generate()
+    _store(events, directory, specification)
+    return events
+
+
+def _load(directory: str, size: int) -> Optional[ui.EventCollection]:
+    """Load a cached sample, or return `None` if the files are not valid."""
+    try:
+        with open(os.path.join(directory, _SPECIFICATION_FILE)) as stream:
+            pids = json.load(stream)["pids"]
+        momenta = np.load(os.path.join(directory, _MOMENTA_FILE))
+        weights = np.load(os.path.join(directory, _WEIGHTS_FILE))
+    except (OSError, EOFError, KeyError, ValueError):
+        return None
+    if momenta.shape != (size, len(pids), 4) or weights.shape != (size,):
+        return None
+    return ui.EventCollection.from_numpy(pids, momenta, weights)
+
+
+def _store(
+    events: ui.EventCollection, directory: str, specification: dict
+) -> None:
+    """Write a sample such that concurrent jobs never see partial files."""
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    temporary_directory = tempfile.mkdtemp(dir=os.path.dirname(directory))
+    try:
+        momenta = events.to_numpy()
+        np.save(
+            os.path.join(temporary_directory, _MOMENTA_FILE),
+            momenta.reshape(len(momenta), len(events.pids), 4),
+        )
+        np.save(
+            os.path.join(temporary_directory, _WEIGHTS_FILE),
+            events.weights(),
+        )
+        with open(
+            os.path.join(temporary_directory, _SPECIFICATION_FILE), "w"
+        ) as stream:
+            json.dump(
+                dict(specification, pids=list(events.pids)),
+                stream,
+                indent=2,
+                sort_keys=True,
+            )
+        os.rename(temporary_directory, directory)
+    except OSError:
+        if not os.path.exists(directory):
+            raise
+        # another job stored the same sample in the meantime
+    finally:
+        shutil.rmtree(temporary_directory, ignore_errors=True)
@@ -0,0 +1,520 @@
+"""Cache integrals of intensities over phase space samples.
+
+Fit fractions, component yields and similar quantities require integrals of
+intensity components over a phase space sample. In toy studies and repeated
+fits of the same model, these integrals are computed over and over again with
+the same phase space sample, while only the fitted coefficients change. The
+:class:`IntegralCache` stores the part of the integrals that does not depend
+on these coefficients in memory and on disk, so that it can be shared between
+intensities that are created independently, for instance with separate
+:class:`.IntensityBuilderXML` instances, in separate processes, or for
+different fit results.
+
+The coefficient of an amplitude is the complex number :math:`c_k = m_k
+e^{i\\phi_k}` of a pair of parameters named :code:`Magnitude_<suffix>` and
+:code:`Phase_<suffix>`, as in the models of the expert system. The integral
+of a component :math:`|\\sum_k c_k A_k|^2` is then a quadratic form
+:math:`\\sum_{kl} c_k^* c_l I_{kl}` of the coefficients. The cache stores the
+matrix :math:`I_{kl}` of the interference integrals, which only depends on
+the other parameters. It is measured once by integrating the component with
+unit coefficients and checked against the integral with the current
+parameters. Components that are not such a quadratic form, for instance
+because they contain a normalization, are integrated directly and cached
+under the values of all of their parameters.
+
+The same matrix normalizes the likelihood of a fit:
+:func:`create_normalized_estimator` creates an unbinned estimator of an
+intensity without normalization, which takes the normalization from the
+cached matrix instead of evaluating the intensity over the phase space sample
+whenever the coefficients change.
+
+An entry of the cache is identified by a hash of everything that determines
+it:
+
+- a key of the model structure, which has to be provided by the user, for
+  instance a hash of the model file (see :func:`hash_file`),
+- the name of the component and the values of its parameters other than the
+  coefficients, and
+- a hash of the phase space sample (see :func:`hash_data_set`).
+
+Entries therefore never become stale: as soon as the model, a fixed parameter,
+or the sample changes, the integrals are looked up under a new key. Old
+entries are only removed explicitly, with :meth:`IntegralCache.clear` or
+:meth:`IntegralCache.prune`.
+"""
+
+__all__ = [
+    "IntegralCache",
+    "create_normalized_estimator",
+    "hash_data_set",
+    "hash_file",
+    "integrate_intensity",
+]
+
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from pycompwa import ui
+
+# bump this if the meaning of the stored integrals changes
+_CACHE_VERSION = 2
+_FILE_EXTENSION = ".json"
+
+_MAGNITUDE_PREFIX = "Magnitude_"
+_PHASE_PREFIX = "Phase_"
+
+# relative deviation up to which a measured matrix reproduces an integral
+_TOLERANCE = 1e-8
+
+
+class IntegralCache:
+    """In-memory and on-disk cache of phase space integrals.
+
+    An instance can be shared between threads that integrate their own copies
+    of the components. Each entry is computed only once.
+
+    Parameters:
+        cache_dir: Directory of the on-disk cache. Defaults to
+            :file:`pycompwa/integrals` in the user cache directory
+            (:envvar:`XDG_CACHE_HOME` or :file:`~/.cache`).
+        persistent: If `False`, integrals are only cached in memory.
+    """
+
+    def __init__(self, cache_dir: str = None, persistent: bool = True):
+        if not persistent:
+            cache_dir = None
+        elif cache_dir is None:
+            user_cache = os.environ.get(
+                "XDG_CACHE_HOME",
+                os.path.join(os.path.expanduser("~"), ".cache"),
+            )
+            cache_dir = os.path.join(user_cache, "pycompwa", "integrals")
+        self.__cache_dir = cache_dir
+        self.__entries: Dict[str, dict] = dict()
+        self.__lock = threading.Lock()
+        self.__key_locks: Dict[str, threading.Lock] = dict()
+
+    @property
+    def cache_dir(self) -> str:
+        """Directory of the on-disk cache, or `None` if there is none."""
+        return self.__cache_dir
+
+    def integrate(
+        self,
+        components: Iterable[ui.IntensityComponent],
+        phsp_sample: ui.DataSet,
+        model_key: str,
+        phsp_key: str = None,
+    ) -> Dict[str, float]:
+        """Get the integrals of intensity components over a sample.
+
+        The integral of a component is the weighted mean of its intensity
+        over the phase space sample, that is, the Monte Carlo estimate of
+        its integral up to the phase space volume. It is computed from the
+        cached interference integrals with the current coefficients of the
+        component. Entries that are not in the cache are computed and
+        stored, which temporarily changes the parameters of the component.
+
+        Parameters:
+            components: The :class:`.IntensityComponent` instances, as
+                created by :meth:`.create_intensity_components`.
+            phsp_sample: The phase space :class:`.DataSet` over which the
+                components are integrated.
+            model_key: A string that identifies the structure of the model,
+                for instance :func:`hash_file` of the model file.
+            phsp_key: A string that identifies ``phsp_sample``. Defaults to
+                :func:`hash_data_set` of the sample, which reads the whole
+                sample.
+
+        Returns:
+            A dictionary of the component names and their integrals.
+        """
+        if phsp_key is None:
+            phsp_key = hash_data_set(phsp_sample)
+        integrals = dict()
+        for component in components:
+            parameters = component.intensity.get_parameters()
+            entry = self.__get_interference_entry(
+                component.intensity,
+                phsp_sample,
+                model_key,
+                phsp_key,
+                component.name,
+            )
+            if entry["real"] is not None:
+                integral = _evaluate_interference(entry, parameters)
+            else:
+                key = _create_key(
+                    "integral", model_key, phsp_key, component.name, parameters
+                )
+                entry = self.__get_or_compute(
+                    key,
+                    lambda: {
+                        "integral": integrate_intensity(
+                            component.intensity, phsp_sample
+                        )
+                    },
+                )
+                integral = entry["integral"]
+            integrals[component.name] = integral
+        return integrals
+
+    def get_interference(
+        self,
+        intensity: ui.Intensity,
+        phsp_sample: ui.DataSet,
+        model_key: str,
+        component_name: str = "",
+        phsp_key: str = None,
+    ) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Get the matrix of the interference integrals of an intensity.
+
+        The matrix is taken from the cache or measured and stored like the
+        matrices of :meth:`integrate`.
+
+        Parameters:
+            intensity: The intensity, for instance of an
+                :class:`.IntensityComponent`.
+            phsp_sample: The phase space :class:`.DataSet` over which the
+                intensity is integrated.
+            model_key: A string that identifies the structure of the model,
+                see :meth:`integrate`.
+            component_name: The name under which the matrix is cached, which
+                distinguishes intensities of the same model.
+            phsp_key: A string that identifies ``phsp_sample``, see
+                :meth:`integrate`.
+
+        Returns:
+            The suffixes of the coefficients and the Hermitian matrix of
+            their interference integrals, in the same order. `None` if the
+            integral is not a quadratic form of the coefficients.
+        """
+        if phsp_key is None:
+            phsp_key = hash_data_set(phsp_sample)
+        entry = self.__get_interference_entry(
+            intensity, phsp_sample, model_key, phsp_key, component_name
+        )
+        if entry["real"] is None:
+            return None
+        matrix = np.array(entry["real"]) + 1j * np.array(entry["imag"])
+        return list(entry["coefficients"]), matrix
+
+    def clear(self) -> None:
+        """Remove all integrals from memory and from disk."""
+        self.__entries.clear()
+        for filename in self.__list_files():
+            _remove(filename)
+
+    def prune(self, max_age: float) -> None:
+        """Remove integrals that have not been used for some time.
+
+        Parameters:
+            max_age: Entries on disk that have not been read or written for
+                this number of seconds are removed.
+        """
+        self.__entries.clear()
+        oldest = time.time() - max_age
+        for filename in self.__list_files():
+            try:
+                if os.path.getmtime(filename) < oldest:
+                    os.remove(filename)
+            except OSError:
+                pass  # removed by another process in the meantime
+
+    def __get_interference_entry(
+        self,
+        intensity: ui.Intensity,
+        phsp_sample: ui.DataSet,
+        model_key: str,
+        phsp_key: str,
+        component_name: str,
+    ) -> dict:
+        suffixes, other_parameters = _split_coefficients(
+            intensity.get_parameters()
+        )
+        key = _create_key(
+            "interference",
+            model_key,
+            phsp_key,
+            component_name,
+            other_parameters,
+        )
+        return self.__get_or_compute(
+            key,
+            lambda: _measure_interference(intensity, phsp_sample, suffixes),
+        )
+
+    def __get_or_compute(self, key: str, compute: Callable[[], dict]) -> dict:
+        with self.__lock:
+            key_lock = self.__key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                entry = self.__load(key)
+            if entry is None:
+                entry = compute()
+                self.__store(key, entry)
+            self.__entries[key] = entry
+        return entry
+
+    def __list_files(self) -> list:
+        if self.__cache_dir is None or not os.path.isdir(self.__cache_dir):
+            return []
+        return [
+            os.path.join(self.__cache_dir, filename)
+            for filename in os.listdir(self.__cache_dir)
+            if filename.endswith(_FILE_EXTENSION)
+        ]
+
+    def __load(self, key: str) -> Optional[dict]:
+        if self.__cache_dir is None:
+            return None
+        filename = os.path.join(self.__cache_dir, key + _FILE_EXTENSION)
+        try:
+            with open(filename) as stream:
+                entry = json.load(stream)
+            os.utime(filename)  # mark as recently used for prune()
+        except (OSError, ValueError):
+            return None
+        if not _is_valid(entry):
+            return None
+        return entry
+
+    def __store(self, key: str, entry: dict) -> None:
+        if self.__cache_dir is None:
+            return
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        descriptor, temporary_file = tempfile.mkstemp(dir=self.__cache_dir)
+        try:
+            with os.fdopen(descriptor, "w") as stream:
+                json.dump(entry, stream)
+            os.replace(
+                temporary_file,
+                os.path.join(self.__cache_dir, key + _FILE_EXTENSION),
+            )
+        finally:
+            _remove(temporary_file)
+
+
+def create_normalized_estimator(
+    intensity: ui.FunctionTreeIntensity,
+    data_set: ui.DataSet,
+    phsp_sample: ui.DataSet,
+    integral_cache: IntegralCache,
+    model_key: str,
+    phsp_key: str = None,
+) -> Tuple[ui.NormalizedLogLikelihoodEstimator, ui.FitParameterList]:
+    """Create an unbinned estimator that is normalized with cached integrals.
+
+    The estimator is equivalent to the estimator of
+    :func:`.create_unbinned_log_likelihood_function_tree_estimator` for the
+    normalized intensity. Its normalization is computed from the matrix of
+    :meth:`IntegralCache.get_interference`, so the phase space sample is
+    only integrated if the matrix is not in the cache yet.
+
+    Parameters:
+        intensity: An intensity without normalization, as created by an
+            :class:`.IntensityBuilderXML` with :code:`normalize=False`.
+        data_set: The :class:`.DataSet` that is fitted.
+        phsp_sample: The phase space :class:`.DataSet` with which the
+            intensity is normalized.
+        integral_cache: The cache of the interference integrals.
+        model_key: A string that identifies the structure of the model, see
+            :meth:`IntegralCache.integrate`.
+        phsp_key: A string that identifies ``phsp_sample``, see
+            :meth:`IntegralCache.integrate`.
+
+    Returns:
+        The estimator and its fit parameters.
+
+    Raises:
+        ValueError: If the integral of the intensity is not a quadratic form
+            of its coefficients, or if parameters other than the
+            coefficients are free.
+    """
+    interference = integral_cache.get_interference(
+        intensity, phsp_sample, model_key, phsp_key=phsp_key
+    )
+    if interference is None:
+        raise ValueError(
+            "The integral of the intensity is not a quadratic form of its "
+            "coefficients. Is the intensity normalized?"
+        )
+    suffixes, matrix = interference
+    return ui.create_normalized_log_likelihood_estimator(
+        intensity,
+        data_set,
+        [_MAGNITUDE_PREFIX + suffix for suffix in suffixes],
+        [_PHASE_PREFIX + suffix for suffix in suffixes],
+        matrix.tolist(),
+    )
+
+
+def hash_data_set(data_set: ui.DataSet) -> str:
+    """Compute a hash of the kinematic variables and weights of a sample."""
+    sha = hashlib.sha256()
+    for name, column in sorted(data_set.data.items()):
+        sha.update(name.encode())
+        sha.update(np.ascontiguousarray(column).data)
+    sha.update(np.ascontiguousarray(data_set.weights).data)
+    return sha.hexdigest()
+
+
+def hash_file(filename: str) -> str:
+    """Compute a hash of the content of a file, for instance a model file."""
+    sha = hashlib.sha256()
+    with open(filename, "rb") as stream:
+        for block in iter(lambda: stream.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def integrate_intensity(
+    intensity: ui.Intensity, phsp_sample: ui.DataSet
+) -> float:
+    """Compute the weighted mean of an intensity over a phase space sample.
+
+    This is the Monte Carlo estimate of the integral of the intensity up to
+    the phase space volume, without any caching.
+    """
+    values = intensity.evaluate_numpy(phsp_sample)
+    return float(np.average(values, weights=phsp_sample.weights))
+
+
+def _is_valid(entry: object) -> bool:
+    if not isinstance(entry, dict):
+        return False
+    if "integral" in entry:
+        return isinstance(entry["integral"], float)
+    return all(field in entry for field in ("coefficients", "real", "imag"))
+
+
+def _split_coefficients(
+    parameters: Dict[str, float]
+) -> Tuple[List[str], Dict[str, float]]:
+    """Get the suffixes of the coefficients and the other parameters."""
+    suffixes = sorted(
+        name[len(_MAGNITUDE_PREFIX) :]
+        for name in parameters
+        if name.startswith(_MAGNITUDE_PREFIX)
+        and _PHASE_PREFIX + name[len(_MAGNITUDE_PREFIX) :] in parameters
+    )
+    coefficient_names = {
+        prefix + suffix
+        for suffix in suffixes
+        for prefix in (_MAGNITUDE_PREFIX, _PHASE_PREFIX)
+    }
+    other_parameters = {
+        name: value
+        for name, value in parameters.items()
+        if name not in coefficient_names
+    }
+    return suffixes, other_parameters
+
+
+def _get_coefficients(
+    parameters: Dict[str, float], suffixes: List[str]
+) -> np.ndarray:
+    return np.array(
+        [
+            parameters[_MAGNITUDE_PREFIX + suffix]
+            * np.exp(1j * parameters[_PHASE_PREFIX + suffix])
+            for suffix in suffixes
+        ],
+        dtype=complex,
+    )
+
+
+def _evaluate_interference(entry: dict, parameters: Dict[str, float]) -> float:
+    matrix = np.array(entry["real"]) + 1j * np.array(entry["imag"])
+    coefficients = _get_coefficients(parameters, entry["coefficients"])
+    return float(np.vdot(coefficients, matrix @ coefficients).real)
+
+
+def _measure_interference(
+    intensity: ui.Intensity, phsp_sample: ui.DataSet, suffixes: List[str]
+) -> dict:
+    """Measure the matrix of the interference integrals of the amplitudes.
+
+    The integral with the coefficients :math:`c = e_k + e^{i\\theta} e_l` is
+    :math:`I_{kk} + I_{ll} + 2 \\mathrm{Re}(e^{i\\theta} I_{kl})`, so the
+    real and imaginary parts of :math:`I_{kl}` follow from the integrals with
+    :math:`\\theta = 0` and :math:`\\theta = \\pi/2`. The entry contains no
+    matrix if the integral is not a quadratic form of the coefficients.
+    """
+    original_parameters = intensity.get_parameters()
+    size = len(suffixes)
+
+    def integrate(coefficients: Dict[int, float]) -> float:
+        """Integrate with the given phases of unit coefficients."""
+        values = dict()
+        for i, suffix in enumerate(suffixes):
+            values[_MAGNITUDE_PREFIX + suffix] = float(i in coefficients)
+            values[_PHASE_PREFIX + suffix] = coefficients.get(i, 0.0)
+        intensity.update_parameters(values)
+        return integrate_intensity(intensity, phsp_sample)
+
+    no_matrix = {"coefficients": suffixes, "real": None, "imag": None}
+    try:
+        if integrate(dict()) != 0.0:
+            return no_matrix
+        matrix = np.zeros((size, size), dtype=complex)
+        for i in range(size):
+            matrix[i, i] = integrate({i: 0.0})
+        for i in range(size):
+            for j in range(i + 1, size):
+                diagonal = matrix[i, i].real + matrix[j, j].real
+                real = integrate({i: 0.0, j: 0.0}) - diagonal
+                imaginary = integrate({i: 0.0, j: 0.5 * math.pi}) - diagonal
+                matrix[i, j] = 0.5 * complex(real, -imaginary)
+                matrix[j, i] = matrix[i, j].conjugate()
+    finally:
+        intensity.update_parameters(original_parameters)
+    entry = {
+        "coefficients": suffixes,
+        "real": matrix.real.tolist(),
+        "imag": matrix.imag.tolist(),
+    }
+    # check that the integral is a quadratic form of the coefficients
+    expected = integrate_intensity(intensity, phsp_sample)
+    reconstructed = _evaluate_interference(entry, original_parameters)
+    magnitudes = np.abs(_get_coefficients(original_parameters, suffixes))
+    scale = magnitudes @ np.abs(matrix) @ magnitudes + abs(expected)
+    if not abs(reconstructed - expected) <= _TOLERANCE * scale:
+        return no_matrix
+    return entry
+
+
+def _create_key(
+    kind: str,
+    model_key: str,
+    phsp_key: str,
+    component_name: str,
+    parameters: Dict[str, float],
+) -> str:
+    specification = {
+        "version": _CACHE_VERSION,
+        "kind": kind,
+        "model": model_key,
+        "phsp": phsp_key,
+        "component": component_name,
+        "parameters": parameters,
+    }
+    serialized = json.dumps(specification, sort_keys=True)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+def _remove(filename: str) -> None:
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
@@ -0,0 +1,280 @@
+"""Run toy studies of a model on several processes.
+
+A toy study repeats the same steps for many toy experiments: generate a
+sample from the model, fit the model to that sample, and compare the fitted
+parameters with the values with which the sample was generated. The
+distributions of the resulting pulls reveal biases of the fit and show
+whether its errors cover the true values.
+
+:func:`iterate_toys` and :func:`run_toys` distribute the toy experiments
+over a process pool. Each worker loads the model and the phase space sample
+only once and then generates and fits one toy after the other, so the cost
+of the study is dominated by the fits themselves. The workers are forked if
+that is safe and spawned otherwise, see
+:func:`.generation.get_process_context`.
+
+With an ``integral_cache_dir``, the fits take the normalization of the
+intensity from the interference integrals of an :class:`.IntegralCache`
+instead of evaluating the intensity over the phase space sample whenever the
+coefficients change, see :func:`.integrals.create_normalized_estimator`. The
+integrals are computed once for the whole study and reused by later studies
+with the same model and phase space sample.
+
+.. code-block:: python
+
+    frame = run_toys("model.xml", n_toys=500, n_events=10000, base_seed=42)
+    frame.xs("pull", axis=1, level=1).describe()
+"""
+
+__all__ = [
+    "iterate_toys",
+    "run_toys",
+]
+
+
+import functools
+import os
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from pycompwa import generation, integrals, ui
+
+_FIT_LABEL = "fit"
+
+# objects that each worker process loads once in _initialize_worker
+_WORKER_STATE: dict = dict()
+
+
+def iterate_toys(
+    model_file: str,
+    n_toys: int,
+    n_events: int,
+    base_seed: int,
+    phsp_size: int = 100000,
+    phsp_seed: int = 0,
+    n_workers: int = None,
+    cache_dir: str = None,
+    integral_cache_dir: str = None,
+) -> Iterator[pd.Series]:
+    """Generate and fit toys, yielding the result of each toy once it is done.
+
+    The results arrive in the order in which the fits finish, which is not
+    necessarily the order of the toys. Use :func:`run_toys` to collect them
+    in a :class:`~pandas.DataFrame`.
+
+    Parameters:
+        model_file: XML file with the particle list, the kinematics and the
+            intensity. The sample of each toy is generated with the
+            parameter values of this file and the fit starts from these
+            values as well.
+        n_toys: Number of toy experiments.
+        n_events: Number of events of each toy sample.
+        base_seed: Seed from which the seeds of the toys are derived through
+            :class:`numpy.random.SeedSequence`.
+        phsp_size: Size of the phase space sample with which the intensity
+            is normalized.
+        phsp_seed: Seed of the phase space sample.
+        n_workers: Number of processes. Defaults to the number of CPUs.
+        cache_dir: Cache directory of the phase space sample, see
+            :func:`.generation.get_cache_dir`. The sample is generated once
+            and all workers load it from this cache.
+        integral_cache_dir: Directory of an :class:`.IntegralCache`. If
+            given, the fits are normalized with its interference integrals,
+            which requires that only coefficients are free. By default, the
+            fits use the normalization of the model file.
+
+    Yields:
+        A :class:`~pandas.Series` for each toy, with the same index as the
+        columns of :func:`run_toys` and the number of the toy as name.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count()
+    n_workers = max(1, min(int(n_workers), int(n_toys)))
+    toys = list(enumerate(generation.spawn_seeds(base_seed, n_toys)))
+    initargs = (
+        model_file,
+        n_events,
+        phsp_size,
+        phsp_seed,
+        cache_dir,
+        integral_cache_dir,
+    )
+    if n_workers == 1:
+        _initialize_worker(*initargs)
+        try:
+            for toy in toys:
+                yield _run_toy(toy)
+        finally:
+            _WORKER_STATE.clear()
+        return
+    # fill the caches, so that the workers only load the sample and integrals
+    if integral_cache_dir is None:
+        _load_phsp_sample(model_file, phsp_size, phsp_seed, cache_dir)
+    else:
+        _initialize_worker(*initargs)
+        _WORKER_STATE.clear()
+    context = generation.get_process_context(allow_spawn=True)
+    with context.Pool(
+        n_workers, initializer=_initialize_worker, initargs=initargs
+    ) as pool:
+        yield from pool.imap_unordered(_run_toy, toys, chunksize=1)
+
+
+def run_toys(
+    model_file: str,
+    n_toys: int,
+    n_events: int,
+    base_seed: int,
+    phsp_size: int = 100000,
+    phsp_seed: int = 0,
+    n_workers: int = None,
+    cache_dir: str = None,
+    integral_cache_dir: str = None,
+) -> pd.DataFrame:
+    """Generate and fit toys and collect the results in a table.
+
+    See :func:`iterate_toys` for the parameters.
+
+    Returns:
+        A :class:`~pandas.DataFrame` with one row per toy. Its columns have
+        two levels. For each free parameter of the model, there are the
+        columns :code:`"true"`, :code:`"value"`, :code:`"error"`, and
+        :code:`"pull"`. The :code:`"fit"` columns contain the
+        :code:`"seed"` of the toy, the :code:`"initial_estimator_value"`
+        and :code:`"final_estimator_value"`, and the :code:`"duration"` of
+        the fit in seconds. The frame can be written to disk with
+        :func:`~.data.io.columnar.write_columnar`.
+    """
+    rows = list(
+        iterate_toys(
+            model_file,
+            n_toys,
+            n_events,
+            base_seed,
+            phsp_size=phsp_size,
+            phsp_seed=phsp_seed,
+            n_workers=n_workers,
+            cache_dir=cache_dir,
+            integral_cache_dir=integral_cache_dir,
+        )
+    )
+    frame = pd.DataFrame(rows).sort_index()
+    frame.columns = pd.MultiIndex.from_tuples(
+        frame.columns, names=["parameter", "quantity"]
+    )
+    frame.index.name = "toy"
+    frame[_FIT_LABEL, "seed"] = frame[_FIT_LABEL, "seed"].astype(int)
+    return frame
+
+
+def _initialize_worker(
+    model_file: str,
+    n_events: int,
+    phsp_size: int,
+    phsp_seed: int,
+    cache_dir: str = None,
+    integral_cache_dir: str = None,
+) -> None:
+    particle_list, kinematics, phsp_sample = _load_phsp_sample(
+        model_file, phsp_size, phsp_seed, cache_dir
+    )
+    # the estimator with cached integrals normalizes the intensity itself
+    intensity = ui.IntensityBuilderXML(
+        model_file,
+        particle_list,
+        kinematics,
+        phsp_sample,
+        normalize=integral_cache_dir is None,
+    ).create_intensity()
+    create_estimator = (
+        ui.create_unbinned_log_likelihood_function_tree_estimator
+    )
+    if integral_cache_dir is not None:
+        phsp_data_set = kinematics.convert(phsp_sample)
+        create_estimator = functools.partial(
+            integrals.create_normalized_estimator,
+            phsp_sample=phsp_data_set,
+            integral_cache=integrals.IntegralCache(integral_cache_dir),
+            model_key=integrals.hash_file(model_file),
+            phsp_key=integrals.hash_data_set(phsp_data_set),
+        )
+        # fail early if the model cannot be normalized with the integrals
+        create_estimator(intensity, phsp_data_set)
+    _WORKER_STATE.update(
+        n_events=n_events,
+        kinematics=kinematics,
+        phsp_generator=ui.EvtGenGenerator(
+            kinematics.get_particle_state_transition_kinematics_info()
+        ),
+        phsp_sample=phsp_sample,
+        intensity=intensity,
+        create_estimator=create_estimator,
+    )
+
+
+def _load_phsp_sample(
+    model_file: str, phsp_size: int, phsp_seed: int, cache_dir: str = None
+) -> tuple:
+    particle_list = ui.read_particles(model_file)
+    kinematics = ui.create_helicity_kinematics(model_file, particle_list)
+    phsp_sample = generation.generate_phsp(
+        phsp_size,
+        kinematics.get_particle_state_transition_kinematics_info(),
+        phsp_seed,
+        cache_dir=cache_dir,
+    )
+    return particle_list, kinematics, phsp_sample
+
+
+def _run_toy(toy: tuple) -> pd.Series:
+    number, seed = toy
+    kinematics = _WORKER_STATE["kinematics"]
+    intensity = _WORKER_STATE["intensity"]
+    sample = ui.generate(
+        _WORKER_STATE["n_events"],
+        kinematics,
+        _WORKER_STATE["phsp_generator"],
+        intensity,
+        ui.StdUniformRealGenerator(seed),
+    )
+    data_set = kinematics.convert(sample)
+    estimator, true_parameters = _WORKER_STATE["create_estimator"](
+        intensity, data_set
+    )
+    try:
+        result = ui.MinuitIF().optimize(estimator, true_parameters)
+    finally:
+        # the fit modifies the intensity, which generates the next toy
+        intensity.updateParametersFrom(true_parameters)
+    record = {
+        (_FIT_LABEL, "seed"): seed,
+        (_FIT_LABEL, "initial_estimator_value"): (
+            result.initial_estimator_value
+        ),
+        (_FIT_LABEL, "final_estimator_value"): result.final_estimator_value,
+        (_FIT_LABEL, "duration"): result.fit_duration_in_seconds,
+    }
+    for true, fitted in zip(true_parameters, result.final_parameters):
+        if true.is_fixed:
+            continue
+        record.update(_compute_pull(true, fitted))
+    return pd.Series(record, name=number)
+
+
+def _compute_pull(true: ui.FitParameter, fitted: ui.FitParameter) -> dict:
+    """Compute the pull with the error in the direction of the true value."""
+    lower_error, upper_error = fitted.error
+    # MINOS reports the lower error as a negative number
+    error = abs(lower_error) if fitted.value > true.value else upper_error
+    if error > 0.0:
+        pull = (fitted.value - true.value) / error
+    else:
+        pull = np.nan
+    return {
+        (fitted.name, "true"): true.value,
+        (fitted.name, "value"): fitted.value,
+        (fitted.name, "error"): error,
+        (fitted.name, "pull"): pull,
+    }
@@ -3,6 +3,19 @@
 // This file is part of the ComPWA framework, check
 // https://github.com/ComPWA/ComPWA/license.txt for details.
 
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cmath>
+#include <complex>
+#include <future>
+#include <limits>
+#include <mutex>
+#include <set>
+#include <stdexcept>
+#include <unordered_map>
+
+#include <pybind11/complex.h>
 #include <pybind11/iostream.h>
 #include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
@@ -39,6 +52,651 @@
 
 namespace py = pybind11;
 
+/// Wrap a vector as a read-only NumPy array without copying its content. The
+/// Owner object is kept alive as long as the array exists.
+py::array_t<double> createReadOnlyView(const std::vector<double> &Values,
+                                       py::handle Owner) {
+  py::array_t<double> View(Values.size(), Values.data(), Owner);
+  View.attr("flags").attr("writeable") = false;
+  return View;
+}
+
+/// Move a vector into a NumPy array without copying its content.
+py::array_t<double> createArray(std::vector<double> &&Values) {
+  auto Owner = new std::vector<double>(std::move(Values));
+  py::capsule FreeWhenDone(Owner, [](void *Vector) {
+    delete reinterpret_cast<std::vector<double> *>(Vector);
+  });
+  return py::array_t<double>(Owner->size(), Owner->data(), FreeWhenDone);
+}
+
+/// Switch for the collection of profiling statistics. If it is off, the
+/// instrumented functions only load this flag.
+std::atomic<bool> ProfilingEnabled{false};
+
+/// Calls, processed events, and wall time of an intensity or estimator.
+struct ProfileStatistics {
+  std::size_t Calls = 0;
+  std::size_t Events = 0;
+  double Seconds = 0.0;
+  std::size_t ParameterUpdates = 0;
+  double ParameterUpdateSeconds = 0.0;
+};
+
+/// Profiling statistics of the instrumented objects, by their address. An
+/// object is only profiled while its Python object is alive: `track` creates
+/// its entry and a weak reference to the Python object erases it again. So a
+/// new object at the same address starts with empty statistics and the
+/// entries do not accumulate.
+class Profiles {
+public:
+  /// Start to profile an object if it is not profiled yet. Requires the GIL.
+  void track(py::handle Object, const void *Key) {
+    {
+      std::lock_guard<std::mutex> Lock(Mutex);
+      if (!Entries.emplace(Key, ProfileStatistics()).second)
+        return;
+    }
+    try {
+      py::cpp_function Erase([this, Key](py::handle Reference) {
+        {
+          std::lock_guard<std::mutex> Lock(Mutex);
+          Entries.erase(Key);
+        }
+        Reference.dec_ref();
+      });
+      // the weak reference is released when the object is destroyed
+      py::weakref(Object, Erase).release();
+    } catch (...) {
+      std::lock_guard<std::mutex> Lock(Mutex);
+      Entries.erase(Key);
+      throw;
+    }
+  }
+  void record(const void *Object, std::size_t Events, double Seconds) {
+    std::lock_guard<std::mutex> Lock(Mutex);
+    auto Entry = Entries.find(Object);
+    if (Entry == Entries.end())
+      return;
+    auto &Statistics = Entry->second;
+    ++Statistics.Calls;
+    Statistics.Events += Events;
+    Statistics.Seconds += Seconds;
+  }
+  void recordParameterUpdate(const void *Object, double Seconds) {
+    std::lock_guard<std::mutex> Lock(Mutex);
+    auto Entry = Entries.find(Object);
+    if (Entry == Entries.end())
+      return;
+    auto &Statistics = Entry->second;
+    ++Statistics.ParameterUpdates;
+    Statistics.ParameterUpdateSeconds += Seconds;
+  }
+  ProfileStatistics get(const void *Object) const {
+    std::lock_guard<std::mutex> Lock(Mutex);
+    auto Entry = Entries.find(Object);
+    return Entry != Entries.end() ? Entry->second : ProfileStatistics();
+  }
+  /// Reset the statistics, but keep profiling the tracked objects.
+  void clear() {
+    std::lock_guard<std::mutex> Lock(Mutex);
+    for (auto &Entry : Entries)
+      Entry.second = ProfileStatistics();
+  }
+
+private:
+  mutable std::mutex Mutex;
+  std::unordered_map<const void *, ProfileStatistics> Entries;
+};
+
+Profiles &getProfiles() {
+  static Profiles Instance;
+  return Instance;
+}
+
+/// Measures the wall time since its construction if profiling is enabled.
+class ProfileTimer {
+public:
+  ProfileTimer()
+      : Enabled(ProfilingEnabled.load(std::memory_order_relaxed)),
+        Start(Enabled ? std::chrono::steady_clock::now()
+                      : std::chrono::steady_clock::time_point()) {}
+  bool isEnabled() const { return Enabled; }
+  double getSeconds() const {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() -
+                                         Start)
+        .count();
+  }
+
+private:
+  const bool Enabled;
+  const std::chrono::steady_clock::time_point Start;
+};
+
+/// Profile an intensity that is passed to a binding, if profiling is
+/// enabled. Requires the GIL.
+void trackProfile(const ComPWA::Intensity &Intensity) {
+  if (ProfilingEnabled)
+    getProfiles().track(
+        py::cast(&Intensity, py::return_value_policy::reference), &Intensity);
+}
+
+/// Evaluate an intensity and record the evaluation in its profile.
+std::vector<double> evaluateIntensity(ComPWA::Intensity &Intensity,
+                                      const ComPWA::DataMap &Data) {
+  ProfileTimer Timer;
+  auto Values = Intensity.evaluate(Data);
+  if (Timer.isEnabled())
+    getProfiles().record(&Intensity, Values.size(), Timer.getSeconds());
+  return Values;
+}
+
+py::dict convertToDict(const ProfileStatistics &Statistics) {
+  py::dict Result;
+  Result["calls"] = Statistics.Calls;
+  Result["events"] = Statistics.Events;
+  Result["seconds"] = Statistics.Seconds;
+  Result["parameter_updates"] = Statistics.ParameterUpdates;
+  Result["parameter_update_seconds"] = Statistics.ParameterUpdateSeconds;
+  return Result;
+}
+
+/// Names of kinematic variables and pointers to their contiguous values.
+using ColumnPointers = std::vector<std::pair<std::string, const double *>>;
+
+/// Get pointers to the columns of a `DataSet` or of a dictionary of NumPy
+/// arrays, which are kept alive in Arrays. Returns the number of events.
+std::size_t getColumns(py::object Data, ColumnPointers &Columns,
+                       std::vector<py::array_t<double>> &Arrays) {
+  if (py::isinstance<ComPWA::Data::DataSet>(Data)) {
+    const auto &DataSet = Data.cast<const ComPWA::Data::DataSet &>();
+    for (auto const &Column : DataSet.Data)
+      Columns.emplace_back(Column.first, Column.second.data());
+    if (DataSet.Data.empty())
+      return 0;
+    return DataSet.Data.begin()->second.size();
+  }
+  std::size_t NumberOfEvents = 0;
+  for (auto const &Item : Data.cast<py::dict>()) {
+    auto Array =
+        py::array_t<double, py::array::c_style | py::array::forcecast>::ensure(
+            Item.second);
+    if (!Array || Array.ndim() != 1)
+      throw py::value_error("Columns must be one-dimensional arrays of floats");
+    if (!Columns.empty() && std::size_t(Array.size()) != NumberOfEvents)
+      throw py::value_error("Columns must have equal lengths");
+    NumberOfEvents = Array.size();
+    Columns.emplace_back(Item.first.cast<std::string>(), Array.data());
+    Arrays.push_back(std::move(Array));
+  }
+  return NumberOfEvents;
+}
+
+std::size_t getChunkSize(py::object ChunkSize, std::size_t Default) {
+  if (ChunkSize.is_none())
+    return std::max(Default, std::size_t(1));
+  const auto Value = ChunkSize.cast<long long>();
+  if (Value <= 0)
+    throw py::value_error("Chunk size must be positive");
+  return std::size_t(Value);
+}
+
+/// Evaluate an intensity on the events [Begin, End) chunk by chunk. Only the
+/// current chunk is copied into the buffers that are passed to the intensity,
+/// the results are written to Output. The chunks are recorded as one call in
+/// the profile of the intensity. Does not require the GIL.
+void evaluateInChunks(ComPWA::Intensity &Intensity,
+                      const ColumnPointers &Columns, std::size_t Begin,
+                      std::size_t End, std::size_t ChunkSize, double *Output) {
+  ProfileTimer Timer;
+  ComPWA::DataMap Chunk;
+  std::vector<std::vector<double> *> Buffers;
+  for (auto const &Column : Columns)
+    Buffers.push_back(&Chunk[Column.first]);
+  for (std::size_t Start = Begin; Start < End; Start += ChunkSize) {
+    const auto Size = std::min(ChunkSize, End - Start);
+    for (std::size_t i = 0; i < Columns.size(); ++i) {
+      const double *First = Columns[i].second + Start;
+      Buffers[i]->assign(First, First + Size);
+    }
+    const auto Values = Intensity.evaluate(Chunk);
+    std::copy(Values.begin(), Values.end(), Output + Start);
+  }
+  if (Timer.isEnabled())
+    getProfiles().record(&Intensity, End - Begin, Timer.getSeconds());
+}
+
+/// Split the events into one contiguous range per intensity and evaluate the
+/// ranges concurrently. The intensities have to be independent instances,
+/// because evaluating an intensity modifies its internal state.
+void evaluateConcurrently(
+    const std::vector<std::shared_ptr<ComPWA::Intensity>> &Intensities,
+    const ColumnPointers &Columns, std::size_t NumberOfEvents,
+    std::size_t ChunkSize, double *Output) {
+  const auto NumberOfThreads = Intensities.size();
+  std::vector<std::future<void>> Futures;
+  for (std::size_t i = 0; i < NumberOfThreads; ++i) {
+    const auto Begin = NumberOfEvents * i / NumberOfThreads;
+    const auto End = NumberOfEvents * (i + 1) / NumberOfThreads;
+    Futures.push_back(std::async(std::launch::async, evaluateInChunks,
+                                 std::ref(*Intensities[i]), std::cref(Columns),
+                                 Begin, End, ChunkSize, Output));
+  }
+  for (auto &Future : Futures)
+    Future.get();
+}
+
+void checkIndependent(
+    const std::vector<std::shared_ptr<ComPWA::Intensity>> &Intensities) {
+  if (Intensities.empty())
+    throw py::value_error("At least one intensity is required");
+  std::set<ComPWA::Intensity *> Unique;
+  for (auto const &Intensity : Intensities)
+    if (!Intensity || !Unique.insert(Intensity.get()).second)
+      throw py::value_error(
+          "Intensities must be distinct instances, for instance created "
+          "with separate IntensityBuilderXML objects");
+}
+
+/// Objects that are used by a binding that released the GIL. ComPWA objects
+/// are not thread-safe: evaluating an intensity or an estimator modifies its
+/// internal state, and so does drawing from a random generator. Only accessed
+/// while the GIL is held.
+std::set<const void *> &getObjectsInUse() {
+  static std::set<const void *> Instance;
+  return Instance;
+}
+
+/// Marks objects as used for its lifetime, so that another thread that passes
+/// one of them to a binding gets an exception instead of a data race. Has to
+/// be constructed and destroyed while the GIL is held, that is before the
+/// `py::gil_scoped_release` of the same scope.
+class ExclusiveUse {
+public:
+  explicit ExclusiveUse(const std::vector<const void *> &Objects) {
+    for (auto Object : Objects) {
+      if (!Object ||
+          std::find(Acquired.begin(), Acquired.end(), Object) != Acquired.end())
+        continue;
+      if (!getObjectsInUse().insert(Object).second) {
+        release();
+        throw std::runtime_error(
+            "Object is used by another thread. Intensities, estimators, "
+            "optimizers and random generators are not thread-safe, so create "
+            "one instance per thread.");
+      }
+      Acquired.push_back(Object);
+    }
+  }
+  ExclusiveUse(const ExclusiveUse &) = delete;
+  ExclusiveUse &operator=(const ExclusiveUse &) = delete;
+  ~ExclusiveUse() { release(); }
+
+private:
+  void release() {
+    for (auto Object : Acquired)
+      getObjectsInUse().erase(Object);
+    Acquired.clear();
+  }
+  std::vector<const void *> Acquired;
+};
+
+/// Address that identifies an intensity, independent of the type through
+/// which it is accessed.
+const void *getAddress(const ComPWA::Intensity &Intensity) {
+  return &Intensity;
+}
+
+std::vector<const void *> getAddresses(
+    const std::vector<std::shared_ptr<ComPWA::Intensity>> &Intensities) {
+  std::vector<const void *> Addresses;
+  for (auto const &Intensity : Intensities)
+    Addresses.push_back(Intensity.get());
+  return Addresses;
+}
+
+/// Estimator that forwards to another estimator and records its progress.
+/// The counters are atomic, so they can be read while a fit runs in another
+/// thread. Once cancelled, the last value is returned without evaluating the
+/// wrapped estimator, so that the optimizer sees a flat function and stops.
+class MonitoredEstimator : public ComPWA::Estimator::Estimator<double> {
+public:
+  MonitoredEstimator(ComPWA::Estimator::Estimator<double> &Estimator)
+      : Wrapped(Estimator), Start(std::chrono::steady_clock::now()) {}
+
+  double evaluate() noexcept final {
+    if (Cancelled)
+      return LastValue;
+    const double Value = Wrapped.evaluate();
+    LastValue = Value;
+    ++NumberOfCalls;
+    return Value;
+  }
+
+  void updateParametersFrom(const std::vector<double> &Parameters) final {
+    if (!Cancelled)
+      Wrapped.updateParametersFrom(Parameters);
+  }
+
+  std::vector<ComPWA::Parameter> getParameters() const final {
+    return Wrapped.getParameters();
+  }
+
+  std::size_t getNumberOfCalls() const { return NumberOfCalls; }
+  double getLastValue() const { return LastValue; }
+  double getElapsedSeconds() const {
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() -
+                                         Start)
+        .count();
+  }
+  void cancel() { Cancelled = true; }
+  bool isCancelled() const { return Cancelled; }
+  const ComPWA::Estimator::Estimator<double> &getWrapped() const {
+    return Wrapped;
+  }
+
+private:
+  ComPWA::Estimator::Estimator<double> &Wrapped;
+  const std::chrono::steady_clock::time_point Start;
+  std::atomic<std::size_t> NumberOfCalls{0};
+  std::atomic<double> LastValue{std::numeric_limits<double>::quiet_NaN()};
+  std::atomic<bool> Cancelled{false};
+};
+
+/// Estimator that forwards to another estimator and records its evaluations
+/// and parameter updates in the profile of that estimator. A monitored
+/// estimator is skipped, so that the profile belongs to the estimator that
+/// the user created.
+class ProfiledEstimator : public ComPWA::Estimator::Estimator<double> {
+public:
+  ProfiledEstimator(ComPWA::Estimator::Estimator<double> &Estimator)
+      : Wrapped(Estimator), Key(&Estimator) {
+    if (auto Monitored = dynamic_cast<MonitoredEstimator *>(&Estimator))
+      Key = &Monitored->getWrapped();
+  }
+
+  double evaluate() noexcept final {
+    ProfileTimer Timer;
+    const double Value = Wrapped.evaluate();
+    if (Timer.isEnabled())
+      getProfiles().record(Key, 0, Timer.getSeconds());
+    return Value;
+  }
+
+  void updateParametersFrom(const std::vector<double> &Parameters) final {
+    ProfileTimer Timer;
+    Wrapped.updateParametersFrom(Parameters);
+    if (Timer.isEnabled())
+      getProfiles().recordParameterUpdate(Key, Timer.getSeconds());
+  }
+
+  std::vector<ComPWA::Parameter> getParameters() const final {
+    return Wrapped.getParameters();
+  }
+
+private:
+  ComPWA::Estimator::Estimator<double> &Wrapped;
+  const void *Key;
+};
+
+/// Binned extended log-likelihood, with the total yield at its maximum
+/// likelihood value, the number of observed events. The intensity is
+/// evaluated only at one point per bin and weighted with the phase space
+/// acceptance of that bin, so the cost of an evaluation does not depend on
+/// the number of events. The parameters are handled by an unbinned estimator
+/// of the same intensity, which shares its parameters with the intensity.
+class BinnedLogLikelihoodEstimator
+    : public ComPWA::Estimator::Estimator<double> {
+public:
+  BinnedLogLikelihoodEstimator(
+      std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity> Intensity,
+      ComPWA::DataMap Points, std::vector<double> Acceptances,
+      std::vector<double> Counts)
+      : Intensity(Intensity), BinPoints(std::move(Points)),
+        BinAcceptances(std::move(Acceptances)), BinCounts(std::move(Counts)) {
+    if (!this->Intensity)
+      throw py::value_error("An intensity is required");
+    if (BinCounts.empty() || BinAcceptances.size() != BinCounts.size())
+      throw py::value_error(
+          "Bin acceptances and counts must have the same non-zero size");
+    for (auto const &Column : BinPoints)
+      if (Column.second.size() != BinCounts.size())
+        throw py::value_error("Column " + Column.first + " of the bin points "
+                              "does not have one value per bin");
+    for (auto Acceptance : BinAcceptances)
+      if (!(Acceptance > 0.0))
+        throw py::value_error("All bins must have a positive acceptance");
+    for (auto Count : BinCounts)
+      TotalCount += Count;
+    auto EstimatorAndParameters =
+        ComPWA::Estimator::createMinLogLHFunctionTreeEstimator(
+            *this->Intensity, ComPWA::Data::DataSet{BinPoints, BinCounts});
+    ParameterEstimator =
+        std::make_unique<ComPWA::FunctionTree::FunctionTreeEstimator>(
+            std::move(EstimatorAndParameters.first));
+    FitParameters = std::move(EstimatorAndParameters.second);
+  }
+
+  double evaluate() noexcept final {
+    const auto Values = evaluateIntensity(*Intensity, BinPoints);
+    double Normalization = 0.0;
+    for (std::size_t i = 0; i < Values.size(); ++i)
+      Normalization += BinAcceptances[i] * Values[i];
+    // Poisson likelihood ratio, which is zero if all bins match exactly
+    double Value = 0.0;
+    for (std::size_t i = 0; i < Values.size(); ++i) {
+      const double Expected =
+          TotalCount * BinAcceptances[i] * Values[i] / Normalization;
+      Value += Expected - BinCounts[i];
+      if (BinCounts[i] > 0.0)
+        Value += BinCounts[i] * std::log(BinCounts[i] / Expected);
+    }
+    return Value;
+  }
+
+  void updateParametersFrom(const std::vector<double> &Parameters) final {
+    ParameterEstimator->updateParametersFrom(Parameters);
+  }
+
+  std::vector<ComPWA::Parameter> getParameters() const final {
+    return ParameterEstimator->getParameters();
+  }
+
+  const ComPWA::FitParameterList &getFitParameters() const {
+    return FitParameters;
+  }
+  std::size_t getNumberOfBins() const { return BinCounts.size(); }
+  const ComPWA::Intensity &getIntensity() const { return *Intensity; }
+
+private:
+  std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity> Intensity;
+  ComPWA::DataMap BinPoints;
+  std::vector<double> BinAcceptances;
+  std::vector<double> BinCounts;
+  double TotalCount = 0.0;
+  std::unique_ptr<ComPWA::FunctionTree::FunctionTreeEstimator>
+      ParameterEstimator;
+  ComPWA::FitParameterList FitParameters;
+};
+
+/// Unbinned log-likelihood of an unnormalized intensity, normalized with a
+/// matrix of the interference integrals of its amplitudes. The integral over
+/// the phase space is a quadratic form of the coefficients, so an evaluation
+/// does not touch the phase space sample. This only holds as long as the
+/// other parameters are fixed. The matrix is computed and cached by
+/// :mod:`pycompwa.integrals`. The parameters are handled as in
+/// `BinnedLogLikelihoodEstimator`.
+class NormalizedLogLikelihoodEstimator
+    : public ComPWA::Estimator::Estimator<double> {
+public:
+  NormalizedLogLikelihoodEstimator(
+      std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity> Intensity,
+      ComPWA::Data::DataSet Data,
+      const std::vector<std::string> &MagnitudeNames,
+      const std::vector<std::string> &PhaseNames,
+      std::vector<std::vector<std::complex<double>>> Interference)
+      : Intensity(Intensity), Data(std::move(Data)),
+        Interference(std::move(Interference)) {
+    if (!this->Intensity)
+      throw py::value_error("An intensity is required");
+    if (this->Data.Weights.empty())
+      throw py::value_error("The data set must not be empty");
+    if (MagnitudeNames.size() != PhaseNames.size())
+      throw py::value_error("There must be one phase per magnitude");
+    if (this->Interference.size() != MagnitudeNames.size())
+      throw py::value_error("The interference matrix must have one row per "
+                            "coefficient");
+    for (auto const &Row : this->Interference)
+      if (Row.size() != MagnitudeNames.size())
+        throw py::value_error("The interference matrix must be square");
+    for (auto Weight : this->Data.Weights)
+      TotalWeight += Weight;
+    MagnitudeIndices = findParameters(MagnitudeNames);
+    PhaseIndices = findParameters(PhaseNames);
+    // one event suffices, the function tree of the estimator is never
+    // evaluated
+    ComPWA::DataMap FirstEvent;
+    for (auto const &Column : this->Data.Data)
+      FirstEvent[Column.first] = {Column.second.front()};
+    auto EstimatorAndParameters =
+        ComPWA::Estimator::createMinLogLHFunctionTreeEstimator(
+            *this->Intensity,
+            ComPWA::Data::DataSet{FirstEvent, {this->Data.Weights.front()}});
+    ParameterEstimator =
+        std::make_unique<ComPWA::FunctionTree::FunctionTreeEstimator>(
+            std::move(EstimatorAndParameters.first));
+    FitParameters = std::move(EstimatorAndParameters.second);
+    std::set<std::string> Coefficients(MagnitudeNames.begin(),
+                                       MagnitudeNames.end());
+    Coefficients.insert(PhaseNames.begin(), PhaseNames.end());
+    for (auto const &Parameter : FitParameters)
+      if (!Parameter.IsFixed && !Coefficients.count(Parameter.Name))
+        throw py::value_error("Parameter " + Parameter.Name +
+                              " is free, but the interference matrix only "
+                              "holds for fixed values of the parameters "
+                              "other than the coefficients");
+  }
+
+  double evaluate() noexcept final {
+    const auto Values = evaluateIntensity(*Intensity, Data.Data);
+    const auto Parameters = Intensity->getParameters();
+    std::vector<std::complex<double>> Coefficients;
+    for (std::size_t k = 0; k < MagnitudeIndices.size(); ++k) {
+      const double Phase = Parameters[PhaseIndices[k]].Value;
+      Coefficients.push_back(
+          Parameters[MagnitudeIndices[k]].Value *
+          std::complex<double>(std::cos(Phase), std::sin(Phase)));
+    }
+    double Normalization = 0.0;
+    for (std::size_t k = 0; k < Coefficients.size(); ++k)
+      for (std::size_t l = 0; l < Coefficients.size(); ++l)
+        Normalization += std::real(std::conj(Coefficients[k]) *
+                                   Interference[k][l] * Coefficients[l]);
+    double LogLikelihood = 0.0;
+    for (std::size_t i = 0; i < Values.size(); ++i)
+      LogLikelihood += Data.Weights[i] * std::log(Values[i]);
+    return TotalWeight * std::log(Normalization) - LogLikelihood;
+  }
+
+  void updateParametersFrom(const std::vector<double> &Parameters) final {
+    ParameterEstimator->updateParametersFrom(Parameters);
+  }
+
+  std::vector<ComPWA::Parameter> getParameters() const final {
+    return ParameterEstimator->getParameters();
+  }
+
+  const ComPWA::FitParameterList &getFitParameters() const {
+    return FitParameters;
+  }
+  const ComPWA::Intensity &getIntensity() const { return *Intensity; }
+
+private:
+  /// Get the positions of parameters in the parameters of the intensity.
+  std::vector<std::size_t>
+  findParameters(const std::vector<std::string> &Names) const {
+    const auto Parameters = Intensity->getParameters();
+    std::vector<std::size_t> Indices;
+    for (auto const &Name : Names) {
+      auto Found = std::find_if(
+          Parameters.begin(), Parameters.end(),
+          [&Name](const ComPWA::Parameter &x) { return x.Name == Name; });
+      if (Found == Parameters.end())
+        throw py::value_error("The intensity has no parameter " + Name);
+      Indices.push_back(std::distance(Parameters.begin(), Found));
+    }
+    return Indices;
+  }
+
+  std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity> Intensity;
+  ComPWA::Data::DataSet Data;
+  std::vector<std::vector<std::complex<double>>> Interference;
+  std::vector<std::size_t> MagnitudeIndices;
+  std::vector<std::size_t> PhaseIndices;
+  double TotalWeight = 0.0;
+  std::unique_ptr<ComPWA::FunctionTree::FunctionTreeEstimator>
+      ParameterEstimator;
+  ComPWA::FitParameterList FitParameters;
+};
+
+/// Get the intensity of an estimator that exposes it, or null.
+const ComPWA::Intensity *
+getIntensity(const ComPWA::Estimator::Estimator<double> &Estimator) {
+  if (auto Binned =
+          dynamic_cast<const BinnedLogLikelihoodEstimator *>(&Estimator))
+    return &Binned->getIntensity();
+  if (auto Normalized =
+          dynamic_cast<const NormalizedLogLikelihoodEstimator *>(&Estimator))
+    return &Normalized->getIntensity();
+  return nullptr;
+}
+
+/// Get the addresses of an estimator and of the wrapped estimators and
+/// intensities that are modified when it is evaluated. A function tree
+/// estimator shares its function tree with the intensity from which it was
+/// created, but it does not expose the intensity.
+std::vector<const void *>
+getAddresses(const ComPWA::Estimator::Estimator<double> &Estimator) {
+  std::vector<const void *> Addresses{&Estimator};
+  if (auto Monitored = dynamic_cast<const MonitoredEstimator *>(&Estimator)) {
+    const auto Wrapped = getAddresses(Monitored->getWrapped());
+    Addresses.insert(Addresses.end(), Wrapped.begin(), Wrapped.end());
+  }
+  if (auto Intensity = getIntensity(Estimator))
+    Addresses.push_back(getAddress(*Intensity));
+  return Addresses;
+}
+
+/// Profile an estimator that is passed to `.MinuitIF.optimize`, if profiling
+/// is enabled, together with the intensity of a binned or normalized
+/// estimator. Like
+/// `ProfiledEstimator`, a monitored estimator is skipped. Requires the GIL.
+void trackProfile(const ComPWA::Estimator::Estimator<double> &Estimator) {
+  if (!ProfilingEnabled)
+    return;
+  if (auto Monitored = dynamic_cast<const MonitoredEstimator *>(&Estimator)) {
+    trackProfile(Monitored->getWrapped());
+    return;
+  }
+  getProfiles().track(py::cast(&Estimator, py::return_value_policy::reference),
+                      &Estimator);
+  if (auto Intensity = getIntensity(Estimator))
+    trackProfile(*Intensity);
+}
+
+/// Replace the normalized intensities of an intensity section by the
+/// intensities that they normalize.
+void removeNormalization(boost::property_tree::ptree &Intensity) {
+  while (Intensity.get<std::string>("<xmlattr>.Class", "") ==
+         "NormalizedIntensity") {
+    auto Normalized = Intensity.get_child("Intensity");
+    Intensity = std::move(Normalized);
+  }
+  for (auto &Child : Intensity)
+    if (Child.first == "Intensity")
+      removeNormalization(Child.second);
+}
+
 PYBIND11_MAKE_OPAQUE(ComPWA::ParticleList);
 PYBIND11_MAKE_OPAQUE(std::vector<ComPWA::FourMomentum>);
 PYBIND11_MAKE_OPAQUE(std::vector<ComPWA::Event>);
@@ -83,6 +741,19 @@ PYBIND11_MODULE(ui, m) {
         delete reinterpret_cast<typename decltype(redirectors)::pointer>(p);
       });
 
+  // ------- Profiling
+
+  m.def("enable_profiling",
+        [](bool Enable) { ProfilingEnabled = Enable; },
+        "Switch the collection of profiling statistics on or off. See "
+        "`.Intensity.profile` and `.Estimator.stats`. If profiling is off, "
+        "which is the default, the instrumented functions do not measure "
+        "anything.",
+        py::arg("enable") = true);
+  m.def("is_profiling_enabled", []() { return bool(ProfilingEnabled); });
+  m.def("reset_profiles", []() { getProfiles().clear(); },
+        "Clear the profiling statistics of all intensities and estimators.");
+
   // ------- Parameters
 
   py::class_<ComPWA::FitParameter<double>>(m, "FitParameter")
@@ -173,6 +844,59 @@ PYBIND11_MODULE(ui, m) {
   py::class_<ComPWA::EventCollection>(m, "EventCollection")
       .def(py::init<std::vector<ComPWA::pid>, std::vector<ComPWA::Event>>(),
            py::arg("pids"), py::arg("events"))
+      .def_static(
+          "from_numpy",
+          [](const std::vector<ComPWA::pid> &Pids,
+             py::array_t<double, py::array::c_style | py::array::forcecast>
+                 Momenta,
+             py::object Weights) {
+            const auto NumberOfParticles = Pids.size();
+            if (!(Momenta.ndim() == 3 &&
+                  Momenta.shape(1) == py::ssize_t(NumberOfParticles) &&
+                  Momenta.shape(2) == 4) &&
+                !(Momenta.ndim() == 2 &&
+                  Momenta.shape(1) == py::ssize_t(4 * NumberOfParticles)))
+              throw py::value_error(
+                  "Momenta must be of shape (number of events, number of "
+                  "PIDs, 4) or (number of events, 4 × number of PIDs)");
+            const auto NumberOfEvents = std::size_t(Momenta.shape(0));
+            const double *Weight = nullptr;
+            py::array_t<double, py::array::c_style | py::array::forcecast>
+                WeightArray;
+            if (!Weights.is_none()) {
+              WeightArray = Weights.cast<py::array_t<
+                  double, py::array::c_style | py::array::forcecast>>();
+              if (WeightArray.ndim() != 1 ||
+                  std::size_t(WeightArray.shape(0)) != NumberOfEvents)
+                throw py::value_error(
+                    "Weights must be a 1D array with one entry per event");
+              Weight = WeightArray.data();
+            }
+            const double *Cell = Momenta.data();
+            ComPWA::EventCollection Collection{Pids, {}};
+            {
+              py::gil_scoped_release Release;
+              Collection.Events.reserve(NumberOfEvents);
+              for (std::size_t i = 0; i < NumberOfEvents; ++i) {
+                std::vector<ComPWA::FourMomentum> FourMomenta;
+                FourMomenta.reserve(NumberOfParticles);
+                for (std::size_t j = 0; j < NumberOfParticles; ++j) {
+                  FourMomenta.emplace_back(
+                      std::array<double, 4>{{Cell[0], Cell[1], Cell[2],
+                                             Cell[3]}});
+                  Cell += 4;
+                }
+                Collection.Events.push_back(ComPWA::Event{
+                    std::move(FourMomenta), Weight ? Weight[i] : 1.0});
+              }
+            }
+            return Collection;
+          },
+          "Create an EventCollection from a NumPy array of four-momenta with "
+          "shape (number of events, number of PIDs, 4), ordered as "
+          "(px, py, pz, E). A 2D array as returned by `.to_numpy` is "
+          "accepted as well.",
+          py::arg("pids"), py::arg("momenta"), py::arg("weights") = py::none())
       .def_readonly("pids", &ComPWA::EventCollection::Pids)
       .def_readonly("events", &ComPWA::EventCollection::Events)
       .def("to_table",
@@ -195,12 +919,34 @@ PYBIND11_MODULE(ui, m) {
              }
              return table;
            })
+      .def("to_numpy",
+           [](const ComPWA::EventCollection &self) {
+             if (!self.checkPidMatchesEvents())
+               throw ComPWA::CorruptFile(
+                   "Number of PIDs in EventCollection does not match the "
+                   "number of four momenta in each of its events");
+             py::array_t<double> Table(std::vector<std::size_t>{
+                 self.Events.size(), 4 * self.Pids.size()});
+             auto *Cell = Table.mutable_data();
+             for (const auto &Event : self.Events) {
+               for (const auto &Momentum : Event.FourMomenta) {
+                 *Cell++ = Momentum.px();
+                 *Cell++ = Momentum.py();
+                 *Cell++ = Momentum.pz();
+                 *Cell++ = Momentum.e();
+               }
+             }
+             return Table;
+           },
+           "Export the four-momenta as one contiguous NumPy array of shape "
+           "(number of events, 4 × number of particles), ordered as "
+           "(px, py, pz, E) per particle.")
       .def("weights",
            [](const ComPWA::EventCollection &self) {
-             std::vector<double> Weights;
-             Weights.reserve(self.Events.size());
+             py::array_t<double> Weights(self.Events.size());
+             auto *Weight = Weights.mutable_data();
              for (const auto &Event : self.Events) {
-               Weights.push_back(Event.Weight);
+               *Weight++ = Event.Weight;
              }
              return Weights;
            })
@@ -220,22 +966,43 @@ PYBIND11_MODULE(ui, m) {
   // ------- Data I/O ------- //
   m.def("read_ascii_data", &ComPWA::Data::Ascii::readData,
         "Read ROOT tree from file to an EventList.", py::arg("input_file"),
-        py::arg("number_of_events") = -1);
+        py::arg("number_of_events") = -1,
+        py::call_guard<py::gil_scoped_release>());
   m.def("write_ascii_data", &ComPWA::Data::Ascii::writeData,
         "Save data as ROOT tree to file.", py::arg("event_list"),
-        py::arg("output_file"), py::arg("overwrite") = true);
+        py::arg("output_file"), py::arg("overwrite") = true,
+        py::call_guard<py::gil_scoped_release>());
 
   m.def("read_root_data", &ComPWA::Data::Root::readData,
         "Read ROOT tree from file to an EventList.", py::arg("input_file"),
-        py::arg("tree_name") = "events", py::arg("number_of_events") = -1);
+        py::arg("tree_name") = "events", py::arg("number_of_events") = -1,
+        py::call_guard<py::gil_scoped_release>());
   m.def("write_root_data", &ComPWA::Data::Root::writeData,
         "Save data as ROOT tree to file.", py::arg("event_list"),
         py::arg("output_file"), py::arg("tree_name") = "events",
-        py::arg("overwrite") = true);
+        py::arg("overwrite") = true, py::call_guard<py::gil_scoped_release>());
 
   py::class_<ComPWA::Data::DataSet>(m, "DataSet")
-      .def_readonly("data", &ComPWA::Data::DataSet::Data)
-      .def_readonly("weights", &ComPWA::Data::DataSet::Weights)
+      .def_property_readonly(
+          "data",
+          [](py::object self) {
+            const auto &DataSample = self.cast<const ComPWA::Data::DataSet &>();
+            py::dict Columns;
+            for (const auto &Variable : DataSample.Data)
+              Columns[py::str(Variable.first)] =
+                  createReadOnlyView(Variable.second, self);
+            return Columns;
+          },
+          "Kinematic variables as a dict of read-only NumPy arrays that "
+          "share memory with this DataSet.")
+      .def_property_readonly(
+          "weights",
+          [](py::object self) {
+            const auto &DataSample = self.cast<const ComPWA::Data::DataSet &>();
+            return createReadOnlyView(DataSample.Weights, self);
+          },
+          "Event weights as a read-only NumPy array that shares memory with "
+          "this DataSet.")
       .def("has_weights", [](const ComPWA::Data::DataSet &self) {
         if (!self.Weights.size()) {
           return false;
@@ -249,9 +1016,73 @@ PYBIND11_MODULE(ui, m) {
         return false;
       });
 
-  m.def("add_intensity_weights", &ComPWA::Data::addIntensityWeights,
-        "Add the intensity values as weights to this data sample.",
-        py::arg("intensity"), py::arg("events"), py::arg("kinematics"));
+  m.def(
+      "add_intensity_weights",
+      [](std::shared_ptr<ComPWA::Intensity> Intensity,
+         const ComPWA::EventCollection &Events,
+         const ComPWA::Kinematics &Kinematics) {
+        ExclusiveUse InUse({Intensity.get()});
+        py::gil_scoped_release Release;
+        return ComPWA::Data::addIntensityWeights(Intensity, Events,
+                                                 Kinematics);
+      },
+      "Add the intensity values as weights to this data sample.",
+      py::arg("intensity"), py::arg("events"), py::arg("kinematics"));
+
+  m.def(
+      "add_intensity_weights",
+      [](std::vector<std::shared_ptr<ComPWA::Intensity>> Intensities,
+         const ComPWA::EventCollection &Events,
+         std::shared_ptr<ComPWA::Kinematics> Kinematics) {
+        checkIndependent(Intensities);
+        ExclusiveUse InUse(getAddresses(Intensities));
+        py::gil_scoped_release Release;
+        const auto DataSet = Kinematics->convert(Events);
+        ColumnPointers Columns;
+        for (auto const &Column : DataSet.Data)
+          Columns.emplace_back(Column.first, Column.second.data());
+        std::vector<double> Values(Events.Events.size());
+        evaluateConcurrently(Intensities, Columns, Values.size(),
+                             Values.size(), Values.data());
+        auto WeightedEvents = Events;
+        for (std::size_t i = 0; i < Values.size(); ++i)
+          WeightedEvents.Events[i].Weight *= Values[i];
+        return WeightedEvents;
+      },
+      "Multiply the weights of this data sample with the intensity values. "
+      "The sample is split into one part per intensity and the parts are "
+      "evaluated concurrently. The intensities have to be distinct instances "
+      "of the same model.",
+      py::arg("intensities"), py::arg("events"), py::arg("kinematics"));
+
+  m.def(
+      "evaluate_parallel",
+      [](std::vector<std::shared_ptr<ComPWA::Intensity>> Intensities,
+         py::object Data, py::object ChunkSize) {
+        checkIndependent(Intensities);
+        ExclusiveUse InUse(getAddresses(Intensities));
+        for (auto const &Intensity : Intensities)
+          trackProfile(*Intensity);
+        ColumnPointers Columns;
+        std::vector<py::array_t<double>> Arrays;
+        const auto NumberOfEvents = getColumns(Data, Columns, Arrays);
+        const auto Size = getChunkSize(ChunkSize, NumberOfEvents);
+        py::array_t<double> Result(NumberOfEvents);
+        double *Output = Result.mutable_data();
+        {
+          py::gil_scoped_release Release;
+          evaluateConcurrently(Intensities, Columns, NumberOfEvents, Size,
+                               Output);
+        }
+        return Result;
+      },
+      "Evaluate an intensity on a `.DataSet` or a dictionary of NumPy columns "
+      "with one thread per given intensity. The intensities have to be "
+      "distinct instances of the same model (for instance created with "
+      "separate `.IntensityBuilderXML` objects), because an intensity cannot "
+      "be evaluated concurrently. The GIL is released during the evaluation.",
+      py::arg("intensities"), py::arg("data"),
+      py::arg("chunk_size") = py::none());
 
   // ------- Particles
   py::class_<ComPWA::ParticleList>(m, "ParticleList")
@@ -291,7 +1122,8 @@ PYBIND11_MODULE(ui, m) {
   py::class_<ComPWA::Kinematics, std::shared_ptr<ComPWA::Kinematics>>(
       m, "Kinematics")
       .def("convert", &ComPWA::Kinematics::convert,
-           "Convert an `.EventCollection` to a `.DataSet`.")
+           "Convert an `.EventCollection` to a `.DataSet`.",
+           py::call_guard<py::gil_scoped_release>())
       .def("phsp_volume", &ComPWA::Kinematics::phspVolume,
            "Get phase space volume defined by the kinematics.");
 
@@ -300,7 +1132,24 @@ PYBIND11_MODULE(ui, m) {
       .def("get_final_state_id_to_name_mapping",
            &ComPWA::Physics::ParticleStateTransitionKinematicsInfo::
                getFinalStateIDToNameMapping,
-           "Get a dictionary for converting a final state ID to a name");
+           "Get a dictionary for converting a final state ID to a name")
+      .def("get_final_state_pids",
+           &ComPWA::Physics::ParticleStateTransitionKinematicsInfo::
+               getFinalStatePIDs,
+           "Get the PIDs of the final state particles")
+      .def("get_final_state_masses",
+           &ComPWA::Physics::ParticleStateTransitionKinematicsInfo::
+               getFinalStateMasses,
+           "Get the masses of the final state particles")
+      .def(
+          "get_initial_state_four_momentum",
+          [](const ComPWA::Physics::ParticleStateTransitionKinematicsInfo
+                 &KinematicsInfo) {
+            auto P4 = KinematicsInfo.getInitialStateFourMomentum();
+            return std::array<double, 4>{P4.px(), P4.py(), P4.pz(), P4.e()};
+          },
+          "Get the four-momentum of the initial state as a list of the form "
+          "[px, py, pz, E]");
 
   py::class_<
       ComPWA::Physics::HelicityFormalism::HelicityKinematics,
@@ -320,7 +1169,7 @@ PYBIND11_MODULE(ui, m) {
            py::overload_cast<const ComPWA::EventCollection &>(
                &ComPWA::Physics::HelicityFormalism::HelicityKinematics::convert,
                py::const_),
-           py::arg("Event"))
+           py::arg("Event"), py::call_guard<py::gil_scoped_release>())
       .def("create_all_subsystems", &ComPWA::Physics::HelicityFormalism::
                                         HelicityKinematics::createAllSubsystems)
       .def("get_particle_state_transition_kinematics_info",
@@ -355,7 +1204,8 @@ PYBIND11_MODULE(ui, m) {
       "Directly convert an `.EventCollection` to a `.DataSet` using a model "
       "file. A Kinematics object is created from the XML file, so this is a "
       "façade to the `.HelicityKinematics` class.",
-      py::arg("event_collection"), py::arg("xml_filename"));
+      py::arg("event_collection"), py::arg("xml_filename"),
+      py::call_guard<py::gil_scoped_release>());
 
   m.def(
       "get_final_state_id_to_name_mapping",
@@ -371,34 +1221,123 @@ PYBIND11_MODULE(ui, m) {
   // ------- Intensity
 
   py::class_<ComPWA::Intensity, std::shared_ptr<ComPWA::Intensity>>(
-      m, "Intensity");
+      m, "Intensity")
+      .def(
+          "evaluate_numpy",
+          [](ComPWA::Intensity &Intensity, py::object Data,
+             py::object ChunkSize) {
+            ExclusiveUse InUse({getAddress(Intensity)});
+            trackProfile(Intensity);
+            if (py::isinstance<ComPWA::Data::DataSet>(Data) &&
+                ChunkSize.is_none()) {
+              const auto &DataSet = Data.cast<const ComPWA::Data::DataSet &>();
+              std::vector<double> Values;
+              {
+                py::gil_scoped_release Release;
+                Values = evaluateIntensity(Intensity, DataSet.Data);
+              }
+              return createArray(std::move(Values));
+            }
+            ColumnPointers Columns;
+            std::vector<py::array_t<double>> Arrays;
+            const auto NumberOfEvents = getColumns(Data, Columns, Arrays);
+            const auto Size = getChunkSize(ChunkSize, NumberOfEvents);
+            py::array_t<double> Result(NumberOfEvents);
+            double *Output = Result.mutable_data();
+            {
+              py::gil_scoped_release Release;
+              evaluateInChunks(Intensity, Columns, 0, NumberOfEvents, Size,
+                               Output);
+            }
+            return Result;
+          },
+          "Evaluate the intensity on a `.DataSet` or on a dictionary of NumPy "
+          "columns and get the values as a NumPy array. A `.DataSet` is "
+          "evaluated without copying if no chunk size is given. Otherwise, "
+          "events are copied chunk by chunk into temporary buffers, which "
+          "bounds the additional memory. The GIL is released during the "
+          "evaluation, but other threads cannot use the intensity meanwhile.",
+          py::arg("data"), py::arg("chunk_size") = py::none())
+      .def(
+          "get_parameters",
+          [](const ComPWA::Intensity &Intensity) {
+            py::dict Parameters;
+            for (const auto &Parameter : Intensity.getParameters())
+              Parameters[py::str(Parameter.Name)] = Parameter.Value;
+            return Parameters;
+          },
+          "Get a dictionary of the names and values of all parameters of the "
+          "intensity, in the order of :code:`updateParametersFrom`.")
+      .def(
+          "update_parameters",
+          [](ComPWA::Intensity &Intensity,
+             const std::map<std::string, double> &Values) {
+            std::vector<double> NewValues;
+            for (const auto &Parameter : Intensity.getParameters()) {
+              auto Value = Values.find(Parameter.Name);
+              NewValues.push_back(Value != Values.end() ? Value->second
+                                                        : Parameter.Value);
+            }
+            ExclusiveUse InUse({getAddress(Intensity)});
+            Intensity.updateParametersFrom(NewValues);
+          },
+          "Set parameters of the intensity by name. Parameters that are not "
+          "in the dictionary keep their values.",
+          py::arg("values"))
+      .def(
+          "profile",
+          [](const ComPWA::Intensity &Intensity) {
+            return convertToDict(getProfiles().get(&Intensity));
+          },
+          "Get the number of calls, the number of evaluated events, and the "
+          "wall time in seconds of the evaluations of this intensity through "
+          "pycompwa (for instance `evaluate_numpy`, `evaluate_parallel` or a "
+          "binned estimator) while profiling was enabled. An evaluation in "
+          "chunks counts as one call. ComPWA does not expose statistics of "
+          "the individual nodes of the function tree, so the intensity is "
+          "profiled as a whole. The statistics are discarded with this "
+          "object.");
 
   py::class_<ComPWA::FunctionTree::FunctionTreeIntensity, ComPWA::Intensity,
              std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity>>(
       m, "FunctionTreeIntensity")
-      .def("evaluate", &ComPWA::FunctionTree::FunctionTreeIntensity::evaluate)
+      .def("evaluate",
+           [](ComPWA::FunctionTree::FunctionTreeIntensity &Intensity,
+              const ComPWA::DataMap &Data) {
+             ExclusiveUse InUse({getAddress(Intensity)});
+             trackProfile(Intensity);
+             py::gil_scoped_release Release;
+             return evaluateIntensity(Intensity, Data);
+           })
       .def("updateParametersFrom",
            [](ComPWA::FunctionTree::FunctionTreeIntensity &x,
               ComPWA::FitParameterList pars) {
              std::vector<double> params;
              for (auto x : pars)
                params.push_back(x.Value);
+             ExclusiveUse InUse({getAddress(x)});
              x.updateParametersFrom(params);
            })
       .def("print", &ComPWA::FunctionTree::FunctionTreeIntensity::print,
            "print function tree");
 
-  py::class_<ComPWA::Tools::IntensityComponent>(m, "IntensityComponent");
+  py::class_<ComPWA::Tools::IntensityComponent>(m, "IntensityComponent")
+      .def_readonly("name", &ComPWA::Tools::IntensityComponent::Name)
+      .def_readonly("intensity",
+                    &ComPWA::Tools::IntensityComponent::Intensity);
 
   py::class_<ComPWA::Physics::IntensityBuilderXML>(m, "IntensityBuilderXML")
       .def(
           py::init([](const std::string &filename, ComPWA::ParticleList partL,
                       ComPWA::Kinematics &kin,
-                      const ComPWA::EventCollection &PhspSample) {
+                      const ComPWA::EventCollection &PhspSample,
+                      bool Normalize) {
             boost::property_tree::ptree pt;
             boost::property_tree::xml_parser::read_xml(filename, pt);
             auto it = pt.find("Intensity");
             if (it != pt.not_found()) {
+              if (!Normalize)
+                removeNormalization(it->second);
               ComPWA::Physics::IntensityBuilderXML Builder(
                   partL, kin, it->second, PhspSample);
               return Builder;
@@ -409,9 +1348,11 @@ PYBIND11_MODULE(ui, m) {
           }),
           "Create an intensity and a helicity kinematics from a xml file. The "
           "file should contain a particle list, and a kinematics and intensity "
-          "section.",
+          "section. If normalize is false, the normalization of the intensity "
+          "is left out, see `.create_normalized_log_likelihood_estimator`.",
           py::arg("xml_filename"), py::arg("particle_list"),
-          py::arg("kinematics"), py::arg("phsp_sample"))
+          py::arg("kinematics"), py::arg("phsp_sample"),
+          py::arg("normalize") = true)
       .def("create_intensity",
            &ComPWA::Physics::IntensityBuilderXML::createIntensity)
       .def("create_intensity_components",
@@ -451,6 +1392,8 @@ PYBIND11_MODULE(ui, m) {
            const ComPWA::PhaseSpaceEventGenerator &Generator,
            std::shared_ptr<ComPWA::Intensity> Intensity,
            ComPWA::UniformRealNumberGenerator &RandomGenerator) {
+          ExclusiveUse InUse({Intensity.get(), &RandomGenerator});
+          py::gil_scoped_release Release;
           return ComPWA::Data::generate(NumberOfEvents, *Kinematics, Generator,
                                         *Intensity, RandomGenerator);
         },
@@ -464,6 +1407,8 @@ PYBIND11_MODULE(ui, m) {
            ComPWA::UniformRealNumberGenerator &RandomGenerator,
            std::shared_ptr<ComPWA::Intensity> Intensity,
            const ComPWA::EventCollection &PhspSample) {
+          ExclusiveUse InUse({Intensity.get(), &RandomGenerator});
+          py::gil_scoped_release Release;
           return ComPWA::Data::generate(NumberOfEvents, *Kinematics,
                                         RandomGenerator, *Intensity,
                                         PhspSample);
@@ -479,6 +1424,8 @@ PYBIND11_MODULE(ui, m) {
            std::shared_ptr<ComPWA::Intensity> Intensity,
            const ComPWA::EventCollection &PhspSample,
            const ComPWA::EventCollection &ToyPhspSample) {
+          ExclusiveUse InUse({Intensity.get(), &RandomGenerator});
+          py::gil_scoped_release Release;
           return ComPWA::Data::generate(NumberOfEvents, *Kinematics,
                                         RandomGenerator, *Intensity, PhspSample,
                                         ToyPhspSample);
@@ -490,24 +1437,68 @@ PYBIND11_MODULE(ui, m) {
         py::arg("intensity"), py::arg("phsp_sample"),
         py::arg("toy_phsp_sample") = nullptr);
 
-  m.def("generate_phsp", &ComPWA::Data::generatePhsp,
+  m.def("generate_phsp",
+        [](unsigned int NumberOfEvents,
+           const ComPWA::PhaseSpaceEventGenerator &Generator,
+           ComPWA::UniformRealNumberGenerator &RandomGenerator) {
+          ExclusiveUse InUse({&RandomGenerator});
+          py::gil_scoped_release Release;
+          return ComPWA::Data::generatePhsp(NumberOfEvents, Generator,
+                                            RandomGenerator);
+        },
         "Generate phase space sample");
 
   m.def("generate_importance_sampled_phsp",
-        &ComPWA::Data::generateImportanceSampledPhsp,
+        [](unsigned int NumberOfEvents, const ComPWA::Kinematics &Kinematics,
+           const ComPWA::PhaseSpaceEventGenerator &Generator,
+           ComPWA::Intensity &Intensity,
+           ComPWA::UniformRealNumberGenerator &RandomGenerator) {
+          ExclusiveUse InUse({getAddress(Intensity), &RandomGenerator});
+          py::gil_scoped_release Release;
+          return ComPWA::Data::generateImportanceSampledPhsp(
+              NumberOfEvents, Kinematics, Generator, Intensity,
+              RandomGenerator);
+        },
         "Generate an Intensity importance weighted phase space sample",
         py::arg("size"), py::arg("kinematics"), py::arg("generator"),
         py::arg("intensity"), py::arg("random_generator"));
 
   //------- Estimator + Optimizer
 
-  py::class_<ComPWA::Estimator::Estimator<double>>(m, "Estimator");
+  py::class_<ComPWA::Estimator::Estimator<double>>(m, "Estimator")
+      .def(
+          "stats",
+          [](const ComPWA::Estimator::Estimator<double> &Estimator) {
+            return convertToDict(getProfiles().get(&Estimator));
+          },
+          "Get the number of evaluations and parameter updates of this "
+          "estimator by `.MinuitIF.optimize` and their wall time in seconds "
+          "while profiling was enabled. The statistics are discarded with "
+          "this object.");
 
   py::class_<ComPWA::FunctionTree::FunctionTreeEstimator,
              ComPWA::Estimator::Estimator<double>>(m, "FunctionTreeEstimator")
       .def("print", &ComPWA::FunctionTree::FunctionTreeEstimator::print,
            "print function tree");
 
+  py::class_<MonitoredEstimator, ComPWA::Estimator::Estimator<double>>(
+      m, "MonitoredEstimator")
+      .def(py::init<ComPWA::Estimator::Estimator<double> &>(),
+           "Wrap an `.Estimator` to monitor and cancel a running fit.",
+           py::arg("estimator"), py::keep_alive<1, 2>())
+      .def_property_readonly("call_count",
+                             &MonitoredEstimator::getNumberOfCalls,
+                             "Number of evaluations of the estimator")
+      .def_property_readonly("last_value", &MonitoredEstimator::getLastValue,
+                             "Value of the last evaluation")
+      .def_property_readonly("elapsed_time",
+                             &MonitoredEstimator::getElapsedSeconds,
+                             "Seconds since the monitor was created")
+      .def_property_readonly("cancelled", &MonitoredEstimator::isCancelled)
+      .def("cancel", &MonitoredEstimator::cancel,
+           "Stop evaluating the estimator. The optimizer sees a constant "
+           "function from then on and finishes after a few more calls.");
+
   m.def("create_unbinned_log_likelihood_function_tree_estimator",
         (std::pair<ComPWA::FunctionTree::FunctionTreeEstimator,
                    ComPWA::FitParameterList>(*)(
@@ -516,6 +1507,60 @@ PYBIND11_MODULE(ui, m) {
             ComPWA::Estimator::createMinLogLHFunctionTreeEstimator,
         py::arg("intensity"), py::arg("datapoints"));
 
+  py::class_<BinnedLogLikelihoodEstimator,
+             ComPWA::Estimator::Estimator<double>>(
+      m, "BinnedLogLikelihoodEstimator")
+      .def_property_readonly("number_of_bins",
+                             &BinnedLogLikelihoodEstimator::getNumberOfBins);
+
+  m.def(
+      "create_binned_log_likelihood_estimator",
+      [](std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity>
+             Intensity,
+         ComPWA::DataMap BinPoints, std::vector<double> BinAcceptances,
+         std::vector<double> BinCounts) {
+        BinnedLogLikelihoodEstimator Estimator(
+            Intensity, std::move(BinPoints), std::move(BinAcceptances),
+            std::move(BinCounts));
+        auto Parameters = Estimator.getFitParameters();
+        return std::make_pair(std::move(Estimator), std::move(Parameters));
+      },
+      "Create a binned log-likelihood estimator and its fit parameters from "
+      "the kinematic variables of one representative point per bin, the "
+      "phase space acceptance of each bin, and the observed (weighted) "
+      "number of events in each bin. See :mod:`pycompwa.binning` for how to "
+      "create these from data and phase space samples.",
+      py::arg("intensity"), py::arg("bin_points"), py::arg("bin_acceptances"),
+      py::arg("bin_counts"));
+
+  py::class_<NormalizedLogLikelihoodEstimator,
+             ComPWA::Estimator::Estimator<double>>(
+      m, "NormalizedLogLikelihoodEstimator");
+
+  m.def(
+      "create_normalized_log_likelihood_estimator",
+      [](std::shared_ptr<ComPWA::FunctionTree::FunctionTreeIntensity>
+             Intensity,
+         ComPWA::Data::DataSet DataSet,
+         const std::vector<std::string> &MagnitudeNames,
+         const std::vector<std::string> &PhaseNames,
+         std::vector<std::vector<std::complex<double>>> Interference) {
+        NormalizedLogLikelihoodEstimator Estimator(
+            Intensity, std::move(DataSet), MagnitudeNames, PhaseNames,
+            std::move(Interference));
+        auto Parameters = Estimator.getFitParameters();
+        return std::make_pair(std::move(Estimator), std::move(Parameters));
+      },
+      "Create an unbinned log-likelihood estimator and its fit parameters "
+      "for an intensity without normalization (see `.IntensityBuilderXML`). "
+      "The normalization is computed from the matrix of the interference "
+      "integrals of the amplitudes, whose coefficients are given by the names "
+      "of their magnitude and phase parameters. All other parameters have to "
+      "be fixed. Use :func:`pycompwa.integrals.create_normalized_estimator` "
+      "to get the matrix from a cache.",
+      py::arg("intensity"), py::arg("datapoints"), py::arg("magnitude_names"),
+      py::arg("phase_names"), py::arg("interference"));
+
   py::class_<
       ComPWA::Optimizer::Optimizer<ComPWA::Optimizer::Minuit2::MinuitResult>>(
       m, "Optimizer");
@@ -525,8 +1570,25 @@ PYBIND11_MODULE(ui, m) {
       ComPWA::Optimizer::Optimizer<ComPWA::Optimizer::Minuit2::MinuitResult>>(
       m, "MinuitIF")
       .def(py::init<>())
-      .def("optimize", &ComPWA::Optimizer::Minuit2::MinuitIF::optimize,
-           "Start minimization.");
+      .def(
+          "optimize",
+          [](ComPWA::Optimizer::Minuit2::MinuitIF &Optimizer,
+             ComPWA::Estimator::Estimator<double> &Estimator,
+             ComPWA::FitParameterList Parameters) {
+            auto Addresses = getAddresses(Estimator);
+            Addresses.push_back(&Optimizer);
+            ExclusiveUse InUse(Addresses);
+            trackProfile(Estimator);
+            py::gil_scoped_release Release;
+            if (!ProfilingEnabled)
+              return Optimizer.optimize(Estimator, Parameters);
+            ProfiledEstimator Profiled(Estimator);
+            return Optimizer.optimize(Profiled, Parameters);
+          },
+          "Start minimization. The GIL is released during the fit, but other "
+          "threads cannot use the optimizer or the estimator meanwhile. The "
+          "intensity of the estimator must not be used by other threads "
+          "either.");
 
   //------- FitResult
 
@@ -576,11 +1638,26 @@ PYBIND11_MODULE(ui, m) {
       .def_readonly("error", &ComPWA::Tools::FitFraction::Error);
 
   m.def("fit_fractions_with_propagated_errors",
-        [](const std::vector<std::pair<ComPWA::Tools::IntensityComponent,
-                                       ComPWA::Tools::IntensityComponent>>
-               &Components,
+        [](const std::vector<std::pair<ComPWA::Tools::IntensityComponent *,
+                                       ComPWA::Tools::IntensityComponent *>>
+               &ComponentPointers,
            const ComPWA::Data::DataSet &PhspSample,
            const ComPWA::FitResult &Result) {
+          // the components are copied, but the copies share the function
+          // trees of the components in Python
+          std::vector<std::pair<ComPWA::Tools::IntensityComponent,
+                                ComPWA::Tools::IntensityComponent>>
+              Components;
+          std::vector<const void *> Addresses;
+          for (auto const &Pair : ComponentPointers) {
+            if (!Pair.first || !Pair.second)
+              throw py::value_error("Intensity components must not be None");
+            Components.emplace_back(*Pair.first, *Pair.second);
+            Addresses.push_back(getAddress(Pair.first->Intensity));
+            Addresses.push_back(getAddress(Pair.second->Intensity));
+          }
+          ExclusiveUse InUse(Addresses);
+          py::gil_scoped_release Release;
           ComPWA::Tools::FitFractions FF;
           return FF.calculateFitFractionsWithCovarianceErrorPropagation(
               Components, PhspSample, Result);
@@ -592,36 +1669,43 @@ PYBIND11_MODULE(ui, m) {
   //------- Plotting
 
   m.def("create_data_array",
-        [](ComPWA::Data::DataSet DataSample) {
+        [](py::object DataSample) {
+          const auto &DataSet =
+              DataSample.cast<const ComPWA::Data::DataSet &>();
           std::vector<std::string> KinVarNames;
-          std::vector<std::vector<double>> DataArray;
-          for (auto const &x : DataSample.Data) {
+          py::list DataArray;
+          for (auto const &x : DataSet.Data) {
             KinVarNames.push_back(x.first);
-            DataArray.push_back(x.second);
+            DataArray.append(createReadOnlyView(x.second, DataSample));
           }
           KinVarNames.push_back("weight");
-          DataArray.push_back(DataSample.Weights);
-          return std::make_pair(KinVarNames, DataArray);
+          DataArray.append(createReadOnlyView(DataSet.Weights, DataSample));
+          return py::make_tuple(KinVarNames, DataArray);
         },
-        py::return_value_policy::move);
+        "Get the variable names and read-only NumPy views of the columns of "
+        "a `.DataSet`, with the weights as last column.",
+        py::arg("data_set"));
 
   m.def("create_fitresult_array",
         [](std::shared_ptr<ComPWA::Intensity> Intensity,
-           ComPWA::Data::DataSet DataSample) {
+           py::object DataSample) {
+          const auto &DataSet =
+              DataSample.cast<const ComPWA::Data::DataSet &>();
           std::vector<std::string> KinVarNames;
-          std::vector<std::vector<double>> DataArray;
-          for (auto const &x : DataSample.Data) {
+          py::list DataArray;
+          for (auto const &x : DataSet.Data) {
             KinVarNames.push_back(x.first);
-            DataArray.push_back(x.second);
+            DataArray.append(createReadOnlyView(x.second, DataSample));
           }
           KinVarNames.push_back("intensity");
           KinVarNames.push_back("weight");
-
-          DataArray.push_back(DataSample.Weights);
-          DataArray.push_back(Intensity->evaluate(DataSample.Data));
-          return std::make_pair(KinVarNames, DataArray);
+          DataArray.append(createArray(Intensity->evaluate(DataSet.Data)));
+          DataArray.append(createReadOnlyView(DataSet.Weights, DataSample));
+          return py::make_tuple(KinVarNames, DataArray);
         },
-        py::return_value_policy::move);
+        "Get the variable names and NumPy columns of a `.DataSet`, followed "
+        "by the intensity and the weights.",
+        py::arg("intensity"), py::arg("data_set"));
 
   m.def(
       "create_rootplotdata",
@@ -633,6 +1717,11 @@ PYBIND11_MODULE(ui, m) {
              IntensityComponents,
          const ComPWA::Data::DataSet &HitAndMissSample,
          const std::string &option) {
+        std::vector<const void *> Addresses{Intensity.get()};
+        for (auto const &Component : IntensityComponents)
+          Addresses.push_back(Component.second.get());
+        ExclusiveUse InUse(Addresses);
+        py::gil_scoped_release Release;
         try {
           auto KinematicsInfo =
               (std::dynamic_pointer_cast<
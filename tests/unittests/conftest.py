@@ -0,0 +1,92 @@
+"""Fixtures for the tests of :mod:`pycompwa.ui` and the modules built on it."""
+
+import os
+from os.path import dirname, realpath
+from typing import Callable, Iterator, NamedTuple
+
+import pytest
+
+import pycompwa.ui as pwa
+
+SCRIPT_DIR = dirname(realpath(__file__))
+
+
+MODEL_FILE = (
+    f"{SCRIPT_DIR}/../angular-distribution-tests/D1ToD0PipPim/model.xml"
+)
+
+
+class Model(NamedTuple):
+    """The D1 → D0 π⁺ π⁻ test model with a phase space sample."""
+
+    particle_list: pwa.ParticleList
+    kinematics: pwa.HelicityKinematics
+    phsp_generator: pwa.EvtGenGenerator
+    phsp_sample: pwa.EventCollection
+
+    def create_builder(self) -> pwa.IntensityBuilderXML:
+        """Create a builder for the intensity and its components."""
+        return pwa.IntensityBuilderXML(
+            MODEL_FILE, self.particle_list, self.kinematics, self.phsp_sample
+        )
+
+    def create_intensity(self) -> pwa.FunctionTreeIntensity:
+        """Create an intensity that is independent of other instances."""
+        return self.create_builder().create_intensity()
+
+    def generate(
+        self, size: int, intensity: pwa.Intensity, seed: int = 456
+    ) -> pwa.EventCollection:
+        """Generate a sample of the intensity."""
+        return pwa.generate(
+            size,
+            self.kinematics,
+            self.phsp_generator,
+            intensity,
+            pwa.StdUniformRealGenerator(seed),
+        )
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _log_errors_only() -> None:
+    pwa.Logging("error")
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _user_cache_dir(tmp_path_factory) -> Iterator[None]:
+    """Keep the files that the tests cache out of the user cache directory."""
+    original = os.environ.get("XDG_CACHE_HOME")
+    os.environ["XDG_CACHE_HOME"] = str(tmp_path_factory.mktemp("cache"))
+    try:
+        yield
+    finally:
+        if original is None:
+            del os.environ["XDG_CACHE_HOME"]
+        else:
+            os.environ["XDG_CACHE_HOME"] = original
+
+
+@pytest.fixture(scope="session")
+def model_file() -> str:
+    """Path of the XML file of the test model."""
+    return MODEL_FILE
+
+
+@pytest.fixture(scope="session")
+def create_model() -> Callable[..., Model]:
+    """Get a function that creates the test :class:`Model`."""
+
+    def create(phsp_size: int = 1000, all_subsystems: bool = False) -> Model:
+        particle_list = pwa.read_particles(MODEL_FILE)
+        kinematics = pwa.create_helicity_kinematics(MODEL_FILE, particle_list)
+        if all_subsystems:
+            kinematics.create_all_subsystems()
+        phsp_generator = pwa.EvtGenGenerator(
+            kinematics.get_particle_state_transition_kinematics_info()
+        )
+        phsp_sample = pwa.generate_phsp(
+            phsp_size, phsp_generator, pwa.StdUniformRealGenerator(123)
+        )
+        return Model(particle_list, kinematics, phsp_generator, phsp_sample)
+
+    return create
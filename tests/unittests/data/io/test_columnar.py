@@ -0,0 +1,58 @@
+"""Test :py:mod:`pycompwa.data.io.columnar`."""
+
+
+import os
+from os.path import dirname, realpath
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycompwa.data import exception
+from pycompwa.data.io import pawian, read_columnar, write_columnar
+
+SCRIPT_DIR = dirname(realpath(__file__))
+
+
+@pytest.mark.parametrize("extension", ["feather", "parquet"])
+@pytest.mark.parametrize("has_weights", [False, True])
+def test_write_read_columnar(extension, has_weights):
+    """Test :func:`~.write_columnar` and :func:`~.read_columnar`."""
+    input_file = f"{SCRIPT_DIR}/files/pawian_"
+    if has_weights:
+        input_file += "weights.dat"
+    else:
+        input_file += "noweights.dat"
+    frame_out = pawian.read_ascii(input_file, [22, "pi0-1", "pi0-2"])
+    frame_out["other"] = np.arange(len(frame_out))
+    output_file = f"{SCRIPT_DIR}/test_columnar.{extension}"
+    write_columnar(frame_out, output_file)
+
+    frame_in = read_columnar(output_file)
+    pd.testing.assert_frame_equal(frame_in, frame_out)
+    assert frame_in.pwa.particles == [22, "pi0-1", "pi0-2"]
+    assert frame_in.pwa.has_weights == has_weights
+
+    frame_in = read_columnar(output_file, columns=["pi0-2", 22])
+    pd.testing.assert_frame_equal(frame_in, frame_out[[22, "pi0-2"]])
+
+    with pytest.raises(exception.DataException):
+        read_columnar(output_file, columns=["K+"])
+    os.remove(output_file)
+
+    write_columnar(frame_out[22], output_file)
+    frame_in = read_columnar(output_file, memory_map=False)
+    pd.testing.assert_frame_equal(frame_in, frame_out[22])
+    os.remove(output_file)
+
+
+def test_columnar_exceptions():
+    """Test exceptions of :func:`~.write_columnar`."""
+    frame = pawian.read_ascii(
+        f"{SCRIPT_DIR}/files/pawian_noweights.dat",
+        ["gamma", "pi0-1", "pi0-2"],
+    )
+    with pytest.raises(exception.DataException):
+        write_columnar(frame, f"{SCRIPT_DIR}/test_columnar.csv")
+    with pytest.raises(exception.DataException):
+        write_columnar(frame, f"{SCRIPT_DIR}/test_columnar", "hdf5")
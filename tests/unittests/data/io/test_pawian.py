@@ -2,9 +2,10 @@
 
 
 import os
-from math import isclose
+from math import isclose, nan
 from os.path import dirname, realpath
 
+import pandas as pd
 import pytest
 
 from pycompwa.data import exception
@@ -52,6 +53,33 @@ def test_read_hists_file(root_version):
     assert isclose(pi0_2.pwa.mass.mean(), 0.135, abs_tol=1e-3)
 
 
+@pytest.mark.parametrize("root_version", [5, 6])
+@pytest.mark.parametrize("type_name", ["data", "fit"])
+def test_iterate_hists_file(root_version, type_name):
+    """Test :func:`~.iterate_hists_file` and entry and particle selection."""
+    filename = f"{SCRIPT_DIR}/files/pawianHists_ROOT{root_version}.root"
+    frame = pawian.read_hists_file(filename, type_name)
+    chunks = list(
+        pawian.iterate_hists_file(filename, type_name, entries_per_chunk=10)
+    )
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert all(
+        chunk.pwa.has_weights == frame.pwa.has_weights for chunk in chunks
+    )
+    assert pd.concat(chunks).equals(frame)
+
+    selection = pawian.read_hists_file(
+        filename, type_name, ["pi0_2"], entry_start=3, entry_stop=8
+    )
+    assert selection.pwa.particles == ["pi0_2"]
+    assert selection.pwa.has_weights == frame.pwa.has_weights
+    assert selection["pi0_2"].equals(frame["pi0_2"].iloc[3:8])
+    if frame.pwa.has_weights:
+        assert selection.pwa.weights.equals(frame.pwa.weights.iloc[3:8])
+    with pytest.raises(exception.DataException):
+        pawian.read_hists_file(filename, type_name, ["K+"])
+
+
 @pytest.mark.parametrize("has_weights", [False, True])
 @pytest.mark.parametrize(
     "particle_interpretation, expected",
@@ -80,6 +108,53 @@ def test_read_ascii_no_header(has_weights, particle_interpretation, expected):
     assert (frame.pwa.weights is not None) == has_weights
 
 
+@pytest.mark.parametrize("has_weights", [False, True])
+@pytest.mark.parametrize("events_per_chunk", [1, 2, 100])
+def test_read_ascii_chunks(has_weights, events_per_chunk):
+    """Test :func:`~.pawian.read_ascii_chunks`."""
+    filename = f"{SCRIPT_DIR}/files/"
+    if has_weights:
+        filename += "pawian_weights.dat"
+    else:
+        filename += "pawian_noweights.dat"
+    particles = ["gamma", "pi0_1", "pi0_2"]
+    frame = pawian.read_ascii(filename, particles)
+    chunks = list(
+        pawian.read_ascii_chunks(filename, particles, events_per_chunk)
+    )
+    assert all(len(chunk) <= events_per_chunk for chunk in chunks)
+    assert all(chunk.pwa.particles == particles for chunk in chunks)
+    assert pd.concat(chunks).equals(frame)
+
+
+def test_read_ascii_chunks_closes_file(monkeypatch):
+    """Test that the file is closed if the iteration stops early."""
+    closed_readers = []
+    read_table = pawian._read_table
+
+    def read_table_and_record_close(*args, **kwargs):
+        reader = read_table(*args, **kwargs)
+        if "chunksize" not in kwargs:
+            return reader
+        close = reader.close
+
+        def record_close():
+            closed_readers.append(reader)
+            close()
+
+        monkeypatch.setattr(reader, "close", record_close)
+        return reader
+
+    monkeypatch.setattr(pawian, "_read_table", read_table_and_record_close)
+    chunks = pawian.read_ascii_chunks(
+        f"{SCRIPT_DIR}/files/pawian_weights.dat", events_per_chunk=2
+    )
+    next(chunks)
+    assert not closed_readers
+    chunks.close()
+    assert len(closed_readers) == 1
+
+
 def test_read_ascii_exceptions():
     """Test exceptions in :func:`~.pawian.read_ascii` without header."""
     # Missing particle interpretation
@@ -101,7 +176,8 @@ def test_read_ascii_exceptions():
 
 
 @pytest.mark.parametrize("has_weights", [False, True])
-def test_write_ascii(has_weights):
+@pytest.mark.parametrize("precision", [None, 6])
+def test_write_ascii(has_weights, precision):
     """Test :func:`~.pawian.write_ascii`."""
     # Construct
     input_file = f"{SCRIPT_DIR}/files/pawian_"
@@ -113,9 +189,37 @@ def test_write_ascii(has_weights):
     frame_out = pawian.read_ascii(input_file, particles)
     # Export
     output_file = f"{SCRIPT_DIR}/test_pawian.dat"
-    pawian.write_ascii(frame_out, output_file)
+    pawian.write_ascii(
+        frame_out, output_file, precision=precision, events_per_chunk=2
+    )
     # Import
     frame_in = pawian.read_ascii(output_file, particles)
     frame_difference = frame_in - frame_out
     assert isclose(frame_difference.mean().mean(), 0, abs_tol=1e-10)
     os.remove(output_file)
+
+
+@pytest.mark.parametrize("has_weights", [False, True])
+def test_write_ascii_missing_values(has_weights):
+    """Test that :func:`~.pawian.write_ascii` skips missing values."""
+    input_file = f"{SCRIPT_DIR}/files/pawian_"
+    if has_weights:
+        input_file += "weights.dat"
+    else:
+        input_file += "noweights.dat"
+    frame = pawian.read_ascii(input_file, ["gamma", "pi0-1", "pi0-2"])
+    frame.loc[1, ("pi0-2", "E")] = nan
+    frame.loc[2, ("gamma", "p_x")] = nan
+    output_file = f"{SCRIPT_DIR}/test_pawian_missing.dat"
+    pawian.write_ascii(frame, output_file, events_per_chunk=2)
+    with open(output_file) as stream:
+        lines = stream.read().splitlines()
+    lines_per_event = 3 + int(has_weights)
+    assert len(lines) == len(frame) * lines_per_event
+    assert "nan" not in "".join(lines)
+    assert len(lines[2 * lines_per_event - 1].split()) == 3
+    # the same file is written through pandas.DataFrame.to_csv
+    pawian.write_ascii(frame, output_file, encoding="utf-8")
+    with open(output_file) as stream:
+        assert stream.read().splitlines() == lines
+    os.remove(output_file)
@@ -4,6 +4,7 @@
 from math import isclose
 from os.path import dirname, realpath
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -121,6 +122,65 @@ def test_physics(has_weights):
     assert isclose(pions["pi0-1"].pwa.rho.mean(axis=0), 1.197, abs_tol=1e-3)
 
 
+def test_kinematics_modification():
+    """Test that kinematic properties follow modifications of the frame."""
+    frame = import_test_frame()
+    frame[("gamma", _labels.ENERGY)] *= 2
+    assert isclose(frame.pwa.energy["gamma"].mean(axis=0), 2.750, abs_tol=1e-3)
+
+    frame.loc[:, ("pi0-1", _labels.ENERGY)] = 0.0
+    assert (frame.pwa.energy["pi0-1"] == 0.0).all()
+    frame.iloc[0, 0] = 100.0
+    assert frame.pwa.p_xyz.iloc[0, 0] == 100.0
+    assert frame.pwa.rho["gamma"].iloc[0] > 100.0
+
+
+def test_subsystem_kinematics():
+    """Test kinematics of particle systems."""
+    frame = import_test_frame(weights=True)
+    particles = ["gamma", "pi0-1", "pi0-2"]
+    total_mass = frame.pwa.invariant_mass(particles)
+    assert total_mass.name == "m_(gamma,pi0-1,pi0-2)"
+    assert np.allclose(total_mass, 3.097, atol=1e-3)
+
+    pair_masses = frame.pwa.invariant_masses()
+    assert pair_masses.columns.to_list() == [
+        "m_(gamma,pi0-1)",
+        "m_(gamma,pi0-2)",
+        "m_(pi0-1,pi0-2)",
+    ]
+    assert np.allclose(
+        pair_masses["m_(pi0-1,pi0-2)"],
+        frame.pwa.invariant_mass(["pi0-1", "pi0-2"]),
+    )
+
+    boosted = frame.pwa.boost_to(["pi0-1", "pi0-2"])
+    assert boosted.pwa.has_weights
+    assert np.allclose(boosted.pwa.mass2, frame.pwa.mass2, atol=1e-9)
+    pions_p_xyz = boosted["pi0-1"].pwa.p_xyz + boosted["pi0-2"].pwa.p_xyz
+    assert np.allclose(pions_p_xyz, 0.0)
+
+    angles = frame.pwa.helicity_angles([["pi0-1", "pi0-2"], "gamma"])
+    assert angles.columns.to_list() == [
+        "theta_pi0-1pi0-2_gamma",
+        "phi_pi0-1pi0-2_gamma",
+        "theta_pi0-1_pi0-2_vs_gamma",
+        "phi_pi0-1_pi0-2_vs_gamma",
+    ]
+    gamma = frame.pwa.boost_to(particles)["gamma"]
+    assert np.allclose(
+        np.cos(angles["theta_pi0-1pi0-2_gamma"]),
+        -gamma["p_z"] / gamma.pwa.rho,
+    )
+
+    with pytest.raises(exception.DataException):
+        frame.pwa.invariant_mass(["gamma", "K+"])
+    with pytest.raises(exception.DataException):
+        frame.pwa.helicity_angles(particles)
+    with pytest.raises(exception.InvalidPwaFormat):
+        frame["gamma"].pwa.invariant_mass(["gamma"])
+
+
 @pytest.mark.parametrize("has_weights", [False, True])
 def test_append(has_weights):
     """Test :py:func:`pycompwa.data.append`."""
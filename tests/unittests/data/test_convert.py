@@ -4,6 +4,7 @@
 from math import isclose, sqrt
 from os.path import dirname, realpath
 
+import numpy as np
 import pytest
 
 import pycompwa.ui as pwa
@@ -54,6 +55,37 @@ def test_data_set_to_pandas(has_weights):
         assert len(variable_names) == 16
 
 
+def test_data_set_views():
+    """Test that :class:`~.DataSet` columns are exposed without copies."""
+    events = import_events(weights=True)
+    data_set = pwa.compute_kinematic_variables(
+        events, xml_filename=f"{SCRIPT_DIR}/files/kinematics_three.xml"
+    )
+    column = data_set.data["mSq_(2,3)"]
+    assert not column.flags.writeable
+    assert len(column) == len(data_set.weights) == len(events.events)
+    frame = convert.data_set_to_pandas(data_set)
+    assert np.shares_memory(frame["mSq_(2,3)"].to_numpy(), column)
+    frame = convert.data_set_to_pandas(data_set, copy=True)
+    assert not np.shares_memory(frame["mSq_(2,3)"].to_numpy(), column)
+    names, columns = pwa.create_data_array(data_set)
+    assert names[-1] == _labels.WEIGHT
+    assert len(names) == len(columns)
+
+
+@pytest.mark.parametrize("has_weights", [False, True])
+def test_events_to_numpy(has_weights):
+    """Test :meth:`.EventCollection.to_numpy`."""
+    events = import_events(has_weights)
+    table = events.to_numpy()
+    assert table.dtype == "float64"
+    assert table.shape == (len(events.events), 4 * len(events.pids))
+    assert table.tolist() == events.to_table()
+    assert events.weights().tolist() == [
+        event.weight for event in events.events
+    ]
+
+
 @pytest.mark.parametrize("has_weights", [False, True])
 def test_events_to_pandas(has_weights):
     """Test :func:`~.events_to_pandas`."""
@@ -99,3 +131,7 @@ def test_pandas_to_events(has_weights):
         assert last_event.weight == 0.7
     else:
         assert last_event.weight == 1.0
+    assert (
+        events.to_numpy().tolist()
+        == import_events(has_weights).to_numpy().tolist()
+    )
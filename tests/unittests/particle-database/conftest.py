@@ -0,0 +1,11 @@
+"""Fixtures for the tests of the particle database."""
+
+import pytest
+
+from pycompwa.expertsystem.ui.system_control import StateTransitionManager
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _default_particle_list(_user_cache_dir):
+    """Load the default particle list."""
+    StateTransitionManager([("J/psi", [1])], ["gamma", "pi0", "pi0"])
@@ -0,0 +1,74 @@
+import pytest
+
+from pycompwa.expertsystem.state.particle import (
+    ParticleIndex,
+    XMLLabelConstants,
+    create_particle_index,
+    get_particle_candidates_for_state,
+    get_xml_label,
+    particle_list,
+)
+
+QNS_LABEL = get_xml_label(XMLLabelConstants.QuantumNumber)
+PROJECTION_LABEL = get_xml_label(XMLLabelConstants.Projection)
+
+
+def _create_state(particle_name, spin_projection=None):
+    qn_list = particle_list[particle_name][QNS_LABEL]
+    state = {QNS_LABEL: [dict(x) for x in qn_list]}
+    for qn_entry in state[QNS_LABEL]:
+        if qn_entry["@Type"] == "Spin" and spin_projection is not None:
+            qn_entry[PROJECTION_LABEL] = spin_projection
+    return state
+
+
+@pytest.mark.parametrize(
+    "particle_name,spin_projection",
+    [
+        ("J/psi", 1.0),
+        ("J/psi", None),
+        ("pi0", 0.0),
+        ("pi+", None),
+        ("rho(770)0", 1.0),
+        ("gamma", -1.0),
+        ("D0", 0.0),
+    ],
+)
+def test_candidates_equal_linear_search(particle_name, spin_projection):
+    """Test that the index finds the same particles as a linear search."""
+    state = _create_state(particle_name, spin_projection)
+    allowed_particles = list(particle_list.values())
+    expected = get_particle_candidates_for_state(state, allowed_particles)
+    found = get_particle_candidates_for_state(
+        state, ParticleIndex(allowed_particles)
+    )
+    assert found == expected
+    names = [particle["@Name"] for particle in found]
+    assert particle_name in names
+
+
+def test_missing_quantum_numbers_use_defaults():
+    """Test that particles without a quantum number match its default."""
+    state = {
+        QNS_LABEL: [
+            {"@Type": "Charge", "@Class": "Int", "@Value": "0"},
+            {"@Type": "Charm", "@Class": "Int", "@Value": "0"},
+        ]
+    }
+    allowed_particles = list(particle_list.values())
+    expected = get_particle_candidates_for_state(state, allowed_particles)
+    found = get_particle_candidates_for_state(
+        state, ParticleIndex(allowed_particles)
+    )
+    assert found == expected
+    assert len(found) > 0
+
+
+def test_particle_index_is_cached():
+    """Test that the index of the same particles is only built once."""
+    index = create_particle_index()
+    assert len(index) == len(particle_list)
+    assert create_particle_index() is index
+    allowed_index = create_particle_index(["pi"])
+    assert allowed_index is not index
+    assert create_particle_index(["pi"]) is allowed_index
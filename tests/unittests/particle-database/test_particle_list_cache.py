@@ -0,0 +1,106 @@
+import glob
+import os
+import shutil
+
+import pytest
+
+from pycompwa.expertsystem.state import particle
+from pycompwa.expertsystem.state.particle import (
+    ParticlePropertyNames,
+    get_particle_property,
+    load_particle_list_from_xml,
+    particle_list,
+)
+from pycompwa.expertsystem.ui.system_control import _find_particle_list_file
+
+
+@pytest.fixture
+def particle_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.delenv(particle._NO_CACHE_VARIABLE, raising=False)
+    original_particles = dict(particle_list)
+    file_path = str(tmp_path / "particle_list.xml")
+    shutil.copyfile(_find_particle_list_file(), file_path)
+    yield file_path
+    particle_list.clear()
+    particle_list.update(original_particles)
+
+
+def _count_cache_files():
+    cache_dir = particle.get_particle_list_cache_dir()
+    return len(glob.glob(os.path.join(cache_dir, "*.pickle")))
+
+
+def _forbid_parsing(monkeypatch):
+    def parse(file_path):
+        raise AssertionError(file_path + " should not be parsed")
+
+    monkeypatch.setattr(particle, "_parse_particle_list", parse)
+
+
+def test_cached_particle_list_is_reused(particle_file, monkeypatch):
+    """Test that a particle list is parsed only once."""
+    load_particle_list_from_xml(particle_file)
+    assert _count_cache_files() == 1
+    parsed_particles = dict(particle_list)
+    particle_list.clear()
+    _forbid_parsing(monkeypatch)
+    load_particle_list_from_xml(particle_file)
+    assert particle_list == parsed_particles
+    # the cached index belongs to the loaded particles
+    index = particle.create_particle_index()
+    assert all(x is y for x, y in zip(index.particles, particle_list.values()))
+    # the content is compared if the modification time changes
+    os.utime(particle_file, (0, 0))
+    load_particle_list_from_xml(particle_file)
+    assert particle_list == parsed_particles
+
+
+def test_modified_particle_list_is_parsed(particle_file):
+    """Test that the cache is not used once the XML file changes."""
+    load_particle_list_from_xml(particle_file)
+    mass_label = ParticlePropertyNames.Mass
+    mass = get_particle_property(particle_list["J/psi"], mass_label)
+    with open(particle_file) as stream:
+        content = stream.read()
+    with open(particle_file, "w") as stream:
+        stream.write(content.replace(str(mass), str(mass + 1.0)))
+    os.utime(particle_file, (1, 1))  # in case the clock is too coarse
+    load_particle_list_from_xml(particle_file)
+    new_mass = get_particle_property(particle_list["J/psi"], mass_label)
+    assert new_mass == pytest.approx(mass + 1.0)
+
+
+def test_cache_can_be_disabled(particle_file, monkeypatch):
+    """Test that nothing is cached if the cache is disabled."""
+    cache_dir = particle.get_particle_list_cache_dir()
+    load_particle_list_from_xml(particle_file, use_cache=False)
+    monkeypatch.setenv(particle._NO_CACHE_VARIABLE, "1")
+    load_particle_list_from_xml(particle_file)
+    assert _find_particle_list_file() is not None
+    assert not os.path.exists(cache_dir)
+    # an explicit choice overrides the environment variable
+    load_particle_list_from_xml(particle_file, use_cache=True)
+    assert _count_cache_files() == 1
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"broken",
+        # a class that does not exist in this version of pycompwa
+        b"cpycompwa.expertsystem.state.particle\nRemovedClass\n.",
+    ],
+)
+def test_broken_cache_is_replaced(particle_file, content):
+    """Test that a broken cache file is parsed again."""
+    load_particle_list_from_xml(particle_file)
+    parsed_particles = dict(particle_list)
+    (cache_file,) = glob.glob(
+        os.path.join(particle.get_particle_list_cache_dir(), "*.pickle")
+    )
+    with open(cache_file, "wb") as stream:
+        stream.write(content)
+    particle_list.clear()
+    load_particle_list_from_xml(particle_file)
+    assert particle_list == parsed_particles
@@ -0,0 +1,62 @@
+import pickle
+from copy import deepcopy
+
+import pytest
+
+from pycompwa.expertsystem.state.particle import (
+    QuantumNumber,
+    QuantumNumberClasses,
+    Spin,
+    StateQuantumNumberNames,
+    XMLLabelConstants,
+    get_particle_property,
+    get_xml_label,
+    particle_list,
+)
+
+QNS_LABEL = get_xml_label(XMLLabelConstants.QuantumNumber)
+
+
+def test_quantum_number_is_parsed():
+    """Test that the type, class, and value are parsed on creation."""
+    spin = QuantumNumber(
+        {
+            "@Type": "Spin",
+            "@Class": "Spin",
+            "@Value": "1",
+            "@Projection": "-1",
+        }
+    )
+    assert spin.qn_type is StateQuantumNumberNames.Spin
+    assert spin.qn_class is QuantumNumberClasses.Spin
+    assert spin.value == Spin(1, -1)
+    # no projection for a non-zero spin is only an error if it is requested
+    assert QuantumNumber({"@Type": "Spin", "@Value": "1"}).value is None
+
+
+def test_quantum_number_is_immutable():
+    """Test that a quantum number is shared instead of modified."""
+    charge = QuantumNumber({"@Type": "Charge", "@Class": "Int", "@Value": "1"})
+    with pytest.raises(TypeError):
+        charge["@Value"] = "0"
+    with pytest.raises(TypeError):
+        charge.value = 0
+    assert deepcopy([charge])[0] is charge
+    assert pickle.loads(pickle.dumps(charge)) == charge
+    assert pickle.loads(pickle.dumps(charge)).value == 1
+    assert QuantumNumber({**charge, "@Value": "-1"}).value == -1
+
+
+@pytest.mark.parametrize("particle_name", ["J/psi", "pi+", "D0", "gamma"])
+def test_properties_equal_plain_dictionaries(particle_name):
+    """Test that the parsed values are those of the XML dictionaries."""
+    particle = particle_list[particle_name]
+    plain_particle = dict(particle)
+    plain_particle[QNS_LABEL] = [dict(x) for x in particle[QNS_LABEL]]
+    assert all(isinstance(x, QuantumNumber) for x in particle[QNS_LABEL])
+    for qn_name in StateQuantumNumberNames:
+        if qn_name is StateQuantumNumberNames.Spin:
+            continue  # database entries have no spin projection
+        assert get_particle_property(
+            particle, qn_name
+        ) == get_particle_property(plain_particle, qn_name)
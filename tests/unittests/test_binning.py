@@ -0,0 +1,79 @@
+"""Test the binned likelihood fit of :mod:`pycompwa.binning`."""
+
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import pycompwa.ui as pwa
+from pycompwa.binning import AdaptiveBinning, create_binned_estimator
+
+
+def test_binned_fit(create_model):
+    """Fit a generated sample with the binned likelihood."""
+    model = create_model(phsp_size=20000, all_subsystems=True)
+    intensity = model.create_intensity()
+    data_set = model.kinematics.convert(model.generate(5000, intensity))
+    phsp_data_set = model.kinematics.convert(model.phsp_sample)
+
+    variables = ("mSq_(3,4)", "mSq_(2,4)")
+    binning = AdaptiveBinning(data_set, {variables[0]: 10, variables[1]: 5})
+    assert binning.n_bins == 50
+    assert binning.variables == variables
+    counts = np.bincount(binning.assign(data_set), minlength=50)
+    assert counts.min() >= 0.9 * counts.mean()
+    assert counts.max() <= 1.1 * counts.mean()
+
+    estimator, parameters = create_binned_estimator(
+        intensity, data_set, phsp_data_set, binning
+    )
+    assert estimator.number_of_bins == 50
+    result = pwa.MinuitIF().optimize(estimator, parameters)
+
+    # the binned fit agrees with the unbinned fit within its errors
+    (
+        unbinned_estimator,
+        unbinned_parameters,
+    ) = pwa.create_unbinned_log_likelihood_function_tree_estimator(
+        model.create_intensity(), data_set
+    )
+    unbinned_result = pwa.MinuitIF().optimize(
+        unbinned_estimator, unbinned_parameters
+    )
+    n_free_parameters = 0
+    for binned, unbinned in zip(
+        result.final_parameters, unbinned_result.final_parameters
+    ):
+        assert binned.name == unbinned.name
+        if unbinned.is_fixed:
+            continue
+        n_free_parameters += 1
+        lower_error, upper_error = unbinned.error
+        error = 0.5 * (abs(lower_error) + abs(upper_error))
+        assert error > 0.0
+        assert abs(binned.value - unbinned.value) <= 2.0 * error
+    assert n_free_parameters > 0
+
+    too_fine = AdaptiveBinning(data_set, {variables[0]: 100, variables[1]: 50})
+    with pytest.raises(ValueError):
+        create_binned_estimator(intensity, data_set, phsp_data_set, too_fine)
+
+
+def test_tied_values():
+    """Test that tied values that would leave bins empty are refused."""
+    size = 1200
+    data_set = SimpleNamespace(
+        data={
+            "constant": np.ones(size),
+            "discrete": np.arange(size) % 2,
+            "continuous": np.linspace(0.0, 1.0, size),
+        },
+        weights=np.ones(size),
+    )
+    binning = AdaptiveBinning(data_set, {"continuous": 4, "discrete": 2})
+    assert np.bincount(binning.assign(data_set)).tolist() == [150] * 8
+    with pytest.raises(ValueError, match="discrete"):
+        AdaptiveBinning(data_set, {"continuous": 4, "discrete": 3})
+    with pytest.raises(ValueError, match="constant"):
+        AdaptiveBinning(data_set, {"constant": 3, "continuous": 4})
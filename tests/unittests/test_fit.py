@@ -0,0 +1,89 @@
+"""Test the asynchronous fit interface :mod:`pycompwa.fit`."""
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import pytest
+
+import pycompwa.ui as pwa
+from pycompwa.fit import FitCancelled, FitProgress, optimize_async
+
+
+@pytest.fixture
+def estimator_and_parameters(create_model):
+    """Create an estimator for a fit of the model to a sample of itself."""
+    model = create_model()
+    intensity = model.create_intensity()
+    data_set = model.kinematics.convert(model.generate(500, intensity))
+    return pwa.create_unbinned_log_likelihood_function_tree_estimator(
+        intensity, data_set
+    )
+
+
+def test_optimize_async(estimator_and_parameters):
+    """Test the result and progress of :func:`.optimize_async`."""
+    estimator, parameters = estimator_and_parameters
+    progress = []
+    future = optimize_async(
+        pwa.MinuitIF(),
+        estimator,
+        parameters,
+        callback=progress.append,
+        interval=0.01,
+    )
+    result = future.result()
+    assert isinstance(result, pwa.FitResult)
+    assert future.progress.call_count > 0
+    assert future.progress.estimator_value == pytest.approx(
+        result.final_estimator_value
+    )
+    assert all(isinstance(item, FitProgress) for item in progress)
+    assert not future.cancel()
+
+    async def optimize():
+        return await asyncio.wrap_future(
+            optimize_async(pwa.MinuitIF(), estimator, parameters)
+        )
+
+    result = asyncio.get_event_loop().run_until_complete(optimize())
+    assert isinstance(result, pwa.FitResult)
+
+
+def test_stop(estimator_and_parameters):
+    """Test that a stopped fit no longer evaluates the estimator."""
+    estimator, parameters = estimator_and_parameters
+    started = threading.Event()
+    future = optimize_async(
+        pwa.MinuitIF(),
+        estimator,
+        parameters,
+        callback=lambda _: started.set(),
+        interval=0.001,
+    )
+    assert started.wait(timeout=60)
+    assert not future.cancel()
+    assert future.stop()
+    call_count = future.progress.call_count
+    with pytest.raises(FitCancelled):
+        future.result()
+    # at most one evaluation was in progress when the fit was stopped
+    assert future.progress.call_count <= call_count + 1
+    assert not future.cancelled()
+    assert not future.stop()
+
+
+def test_cancel_pending(estimator_and_parameters):
+    """Test that a fit can be cancelled while it waits for an executor."""
+    estimator, parameters = estimator_and_parameters
+    blocked = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        executor.submit(blocked.wait)
+        future = optimize_async(
+            pwa.MinuitIF(), estimator, parameters, executor=executor
+        )
+        assert future.cancel()
+        blocked.set()
+    assert future.cancelled()
+    with pytest.raises(CancelledError):
+        future.result()
@@ -0,0 +1,60 @@
+"""Test :func:`pycompwa.fit_fractions.calculate_fit_fractions`."""
+
+
+import numpy as np
+
+import pycompwa.ui as pwa
+from pycompwa.fit_fractions import calculate_fit_fractions
+from pycompwa.integrals import IntegralCache, hash_file
+
+
+def test_calculate_fit_fractions(create_model, model_file, tmp_path):
+    """Compare with the serial implementation of ComPWA."""
+    model = create_model(phsp_size=2000)
+    intensity = model.create_intensity()
+    (
+        estimator,
+        parameters,
+    ) = pwa.create_unbinned_log_likelihood_function_tree_estimator(
+        intensity, model.kinematics.convert(model.generate(500, intensity))
+    )
+    fit_result = pwa.MinuitIF().optimize(estimator, parameters)
+    phsp_data_set = model.kinematics.convert(model.phsp_sample)
+
+    def create_components():
+        builder = model.create_builder()
+        names = builder.get_all_component_names()
+        components = builder.create_intensity_components(
+            [[name] for name in names] + [names]
+        )
+        return [(component, components[-1]) for component in components[:-1]]
+
+    fit_fractions = calculate_fit_fractions(
+        create_components, phsp_data_set, fit_result, n_threads=3
+    )
+    reference = pwa.fit_fractions_with_propagated_errors(
+        create_components(), phsp_data_set, fit_result
+    )
+    assert fit_fractions.names == [item.name for item in reference]
+    assert np.allclose(
+        fit_fractions.values, [item.value for item in reference]
+    )
+    assert np.allclose(
+        fit_fractions.errors, [item.error for item in reference], rtol=0.05
+    )
+    n_fractions = len(reference)
+    assert fit_fractions.covariance.shape == (n_fractions, n_fractions)
+    assert np.allclose(fit_fractions.covariance, fit_fractions.covariance.T)
+    assert np.allclose(np.diag(fit_fractions.correlation), 1.0)
+
+    # the cached integrals give the same fit fractions
+    cached_fit_fractions = calculate_fit_fractions(
+        create_components,
+        phsp_data_set,
+        fit_result,
+        n_threads=3,
+        integral_cache=IntegralCache(str(tmp_path)),
+        model_key=hash_file(model_file),
+    )
+    assert np.allclose(cached_fit_fractions.values, fit_fractions.values)
+    assert np.allclose(cached_fit_fractions.errors, fit_fractions.errors)
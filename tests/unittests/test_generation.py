@@ -0,0 +1,113 @@
+"""Test :mod:`pycompwa.generation`."""
+
+import os
+import threading
+from os.path import dirname, realpath
+
+import numpy as np
+
+import pycompwa.ui as pwa
+from pycompwa import generation
+
+SCRIPT_DIR = dirname(realpath(__file__))
+
+
+def test_generate_phsp(tmp_path):
+    """Test caching of :func:`~.generation.generate_phsp`."""
+    kinematics = pwa.create_helicity_kinematics(
+        f"{SCRIPT_DIR}/data/files/kinematics_three.xml"
+    )
+    kinematics_info = (
+        kinematics.get_particle_state_transition_kinematics_info()
+    )
+    cache_dir = str(tmp_path)
+
+    sample = generation.generate_phsp(
+        100, kinematics_info, seed=123, cache_dir=cache_dir
+    )
+    assert len(os.listdir(cache_dir)) == 1
+    reference = pwa.generate_phsp(
+        100,
+        pwa.EvtGenGenerator(kinematics_info),
+        pwa.StdUniformRealGenerator(123),
+    )
+    assert np.array_equal(sample.to_numpy(), reference.to_numpy())
+
+    cached_sample = generation.generate_phsp(
+        100, kinematics_info, seed=123, cache_dir=cache_dir
+    )
+    assert len(os.listdir(cache_dir)) == 1
+    assert cached_sample.pids == sample.pids
+    assert np.array_equal(cached_sample.to_numpy(), sample.to_numpy())
+    assert np.array_equal(cached_sample.weights(), sample.weights())
+
+    # incomplete or corrupt samples are generated again
+    (sample_dir,) = os.listdir(cache_dir)
+    weights_file = os.path.join(cache_dir, sample_dir, "weights.npy")
+    with open(weights_file, "r+b") as stream:
+        stream.truncate(100)
+    os.remove(os.path.join(cache_dir, sample_dir, "momenta.npy"))
+    regenerated_sample = generation.generate_phsp(
+        100, kinematics_info, seed=123, cache_dir=cache_dir
+    )
+    assert np.array_equal(regenerated_sample.to_numpy(), sample.to_numpy())
+    cached_sample = generation.generate_phsp(
+        100, kinematics_info, seed=123, cache_dir=cache_dir
+    )
+    assert np.array_equal(cached_sample.weights(), sample.weights())
+
+    generation.generate_phsp(
+        100, kinematics_info, seed=456, cache_dir=cache_dir
+    )
+    generation.generate_phsp(
+        50, kinematics_info, seed=123, cache_dir=cache_dir
+    )
+    assert len(os.listdir(cache_dir)) == 3
+
+
+def test_get_process_context():
+    """Test that workers are only forked without other threads."""
+    context = generation.get_process_context(allow_spawn=True)
+    assert context is not None
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        assert generation.get_process_context() is None
+        context = generation.get_process_context(allow_spawn=True)
+        assert context.get_start_method() == "spawn"
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_generate_parallel(create_model):
+    """Test :func:`~.generation.generate_parallel`."""
+    model = create_model()
+    intensity = model.create_intensity()
+
+    def generate(n_workers):
+        return generation.generate_parallel(
+            101,
+            model.kinematics,
+            model.phsp_generator,
+            intensity,
+            base_seed=123,
+            n_workers=n_workers,
+        )
+
+    sample = generate(n_workers=2)
+    assert len(sample.events) == 101
+    assert sample.pids == model.phsp_sample.pids
+    assert np.array_equal(sample.to_numpy(), generate(2).to_numpy())
+    assert len(generate(n_workers=3).events) == 101
+
+    # with other threads, the shards are generated without forking
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        assert np.array_equal(sample.to_numpy(), generate(2).to_numpy())
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,180 @@
+"""Test the integral cache :mod:`pycompwa.integrals`."""
+
+import os
+
+import numpy as np
+import pytest
+
+import pycompwa.ui as pwa
+from pycompwa.integrals import (
+    IntegralCache,
+    create_normalized_estimator,
+    hash_data_set,
+    hash_file,
+)
+
+
+def create_components(model):
+    """Create the components of a model."""
+    builder = model.create_builder()
+    return builder.create_intensity_components(
+        [[name] for name in builder.get_all_component_names()]
+    )
+
+
+def assert_integrals(integrals, components, phsp_data_set):
+    """Compare the integrals with a direct evaluation of the components."""
+    assert list(integrals) == [component.name for component in components]
+    for component in components:
+        values = component.intensity.evaluate_numpy(phsp_data_set)
+        assert np.isclose(
+            integrals[component.name],
+            np.average(values, weights=phsp_data_set.weights),
+        )
+
+
+def update_parameters(components, is_updated, factor):
+    """Scale the parameters with the selected names."""
+    for component in components:
+        parameters = component.intensity.get_parameters()
+        component.intensity.update_parameters(
+            {
+                name: factor * value
+                for name, value in parameters.items()
+                if is_updated(name)
+            }
+        )
+
+
+def is_coefficient(name):
+    """Check if a parameter is the magnitude or phase of a coefficient."""
+    return name.startswith("Magnitude_") or name.startswith("Phase_")
+
+
+def test_integral_cache(create_model, model_file, tmp_path):
+    """Test that integrals are reused across caches and intensities."""
+    model = create_model()
+    components = create_components(model)
+    phsp_data_set = model.kinematics.convert(model.phsp_sample)
+    model_key = hash_file(model_file)
+    phsp_key = hash_data_set(phsp_data_set)
+    assert phsp_key == hash_data_set(phsp_data_set)
+
+    cache = IntegralCache(str(tmp_path))
+    integrals = cache.integrate(components, phsp_data_set, model_key)
+    assert_integrals(integrals, components, phsp_data_set)
+    assert len(os.listdir(tmp_path)) == len(components)
+
+    # a new cache instance and new components read the stored integrals
+    other_components = create_components(create_model())
+    other_cache = IntegralCache(str(tmp_path))
+    assert np.allclose(
+        list(
+            other_cache.integrate(
+                other_components, phsp_data_set, model_key, phsp_key
+            ).values()
+        ),
+        list(integrals.values()),
+    )
+    assert len(os.listdir(tmp_path)) == len(components)
+
+    # the coefficients do not enter the keys
+    update_parameters(other_components, is_coefficient, 0.5)
+    assert_integrals(
+        other_cache.integrate(
+            other_components, phsp_data_set, model_key, phsp_key
+        ),
+        other_components,
+        phsp_data_set,
+    )
+    assert len(os.listdir(tmp_path)) == len(components)
+
+    # but the other parameters do
+    update_parameters(
+        other_components, lambda name: not is_coefficient(name), 1.01
+    )
+    assert_integrals(
+        other_cache.integrate(
+            other_components, phsp_data_set, model_key, phsp_key
+        ),
+        other_components,
+        phsp_data_set,
+    )
+    assert len(os.listdir(tmp_path)) == 2 * len(components)
+
+    other_cache.integrate(components, phsp_data_set, "other model")
+    assert len(os.listdir(tmp_path)) == 3 * len(components)
+    other_cache.prune(max_age=3600)
+    assert len(os.listdir(tmp_path)) == 3 * len(components)
+    other_cache.clear()
+    assert not os.listdir(tmp_path)
+
+
+def write_normalized_model(model_file, filename):
+    """Wrap the last section, the intensity, in a normalized intensity."""
+    with open(model_file) as stream:
+        content = stream.read()
+    start = content.index("\n\t<Intensity ") + 1
+    with open(filename, "w") as stream:
+        stream.write(content[:start])
+        stream.write('<Intensity Class="NormalizedIntensity">\n')
+        stream.write(content[start:])
+        stream.write("</Intensity>\n")
+
+
+def test_create_normalized_estimator(create_model, model_file, tmp_path):
+    """Compare with a fit of the normalized intensity by ComPWA."""
+    normalized_file = str(tmp_path / "model.xml")
+    write_normalized_model(model_file, normalized_file)
+    model = create_model(phsp_size=2000)
+
+    def create_intensity(normalize):
+        return pwa.IntensityBuilderXML(
+            normalized_file,
+            model.particle_list,
+            model.kinematics,
+            model.phsp_sample,
+            normalize=normalize,
+        ).create_intensity()
+
+    intensity = create_intensity(normalize=True)
+    data_set = model.kinematics.convert(model.generate(500, intensity))
+    (
+        estimator,
+        parameters,
+    ) = pwa.create_unbinned_log_likelihood_function_tree_estimator(
+        intensity, data_set
+    )
+    expected = pwa.MinuitIF().optimize(estimator, parameters)
+
+    phsp_data_set = model.kinematics.convert(model.phsp_sample)
+    cache_dir = tmp_path / "integrals"
+    cache = IntegralCache(str(cache_dir))
+    model_key = hash_file(normalized_file)
+    estimator, parameters = create_normalized_estimator(
+        create_intensity(normalize=False),
+        data_set,
+        phsp_data_set,
+        cache,
+        model_key,
+    )
+    result = pwa.MinuitIF().optimize(estimator, parameters)
+    assert len(os.listdir(cache_dir)) == 1
+    for fitted, reference in zip(
+        result.final_parameters, expected.final_parameters
+    ):
+        assert fitted.name == reference.name
+        if reference.is_fixed:
+            continue
+        error = max(abs(error) for error in reference.error)
+        assert abs(fitted.value - reference.value) <= 0.1 * error
+
+    # the integral of a normalized intensity is not a quadratic form
+    with pytest.raises(ValueError, match="quadratic form"):
+        create_normalized_estimator(
+            intensity,
+            data_set,
+            phsp_data_set,
+            IntegralCache(persistent=False),
+            model_key,
+        )
@@ -0,0 +1,93 @@
+"""Test the toy study driver :mod:`pycompwa.toys`."""
+
+
+import os
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pycompwa.toys import _compute_pull, run_toys
+
+
+def test_run_toys(model_file, tmp_path):
+    """Test that toys are reproducible and independent of the pool size."""
+    settings = dict(
+        model_file=model_file,
+        n_toys=4,
+        n_events=200,
+        base_seed=42,
+        phsp_size=2000,
+        cache_dir=str(tmp_path),
+    )
+    frame = run_toys(n_workers=2, **settings)
+    assert list(frame.index) == [0, 1, 2, 3]
+    assert frame["fit", "seed"].nunique() == 4
+    assert (frame["fit", "duration"] >= 0).all()
+    pulls = frame.xs("pull", axis=1, level="quantity")
+    assert len(pulls.columns) > 0
+    assert np.isfinite(pulls.to_numpy()).all()
+
+    sequential = run_toys(n_workers=1, **settings)
+    pd.testing.assert_frame_equal(
+        frame.drop(columns=("fit", "duration")),
+        sequential.drop(columns=("fit", "duration")),
+    )
+
+    # with other threads, the workers are spawned instead of forked
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        spawned = run_toys(n_workers=2, **settings)
+    finally:
+        stop.set()
+        thread.join()
+    pd.testing.assert_frame_equal(
+        frame.drop(columns=("fit", "duration")),
+        spawned.drop(columns=("fit", "duration")),
+    )
+
+
+def test_run_toys_with_integral_cache(model_file, tmp_path):
+    """Test that the fits can be normalized with cached integrals."""
+    integral_cache_dir = str(tmp_path / "integrals")
+    settings = dict(
+        model_file=model_file,
+        n_toys=2,
+        n_events=200,
+        base_seed=42,
+        phsp_size=2000,
+        cache_dir=str(tmp_path / "phsp"),
+        integral_cache_dir=integral_cache_dir,
+    )
+    frame = run_toys(n_workers=2, **settings)
+    pulls = frame.xs("pull", axis=1, level="quantity")
+    assert len(pulls.columns) > 0
+    assert np.isfinite(pulls.to_numpy()).all()
+    # the workers share the integrals that the parent process computed
+    assert len(os.listdir(integral_cache_dir)) == 1
+
+    sequential = run_toys(n_workers=1, **settings)
+    pd.testing.assert_frame_equal(
+        frame.drop(columns=("fit", "duration")),
+        sequential.drop(columns=("fit", "duration")),
+    )
+
+
+@pytest.mark.parametrize(
+    "fitted_value, error, pull",
+    [
+        (1.4, 0.2, 2.0),  # above the true value: lower error
+        (0.4, 0.3, -2.0),  # below the true value: upper error
+    ],
+)
+def test_compute_pull(fitted_value, error, pull):
+    """Test that the pull uses the error towards the true value."""
+    true = SimpleNamespace(name="a", value=1.0)
+    fitted = SimpleNamespace(name="a", value=fitted_value, error=(-0.2, 0.3))
+    record = _compute_pull(true, fitted)
+    assert record["a", "error"] == pytest.approx(error)
+    assert record["a", "pull"] == pytest.approx(pull)
@@ -0,0 +1,163 @@
+"""Test the NumPy interface of :mod:`pycompwa.ui`."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import pycompwa.ui as pwa
+
+
+def test_evaluate_numpy(create_model):
+    """Test :meth:`.Intensity.evaluate_numpy`."""
+    model = create_model(all_subsystems=True)
+    intensity = model.create_intensity()
+    data_set = model.kinematics.convert(model.phsp_sample)
+
+    values = intensity.evaluate_numpy(data_set)
+    assert isinstance(values, np.ndarray)
+    assert values.dtype == np.float64
+    assert np.allclose(values, intensity.evaluate(data_set.data))
+    assert np.array_equal(
+        values, intensity.evaluate_numpy(data_set, chunk_size=77)
+    )
+    columns = {
+        name: np.array(column) for name, column in data_set.data.items()
+    }
+    assert np.array_equal(
+        values, intensity.evaluate_numpy(columns, chunk_size=100)
+    )
+
+    names, arrays = pwa.create_fitresult_array(intensity, data_set)
+    assert names[-2:] == ["intensity", "weight"]
+    assert np.array_equal(arrays[-2], values)
+
+    with pytest.raises(ValueError):
+        intensity.evaluate_numpy(data_set, chunk_size=0)
+    columns[names[0]] = columns[names[0]][:-1]
+    with pytest.raises(ValueError):
+        intensity.evaluate_numpy(columns)
+
+
+def test_evaluate_parallel(create_model):
+    """Test :func:`.evaluate_parallel` and parallel intensity weights."""
+    model = create_model(all_subsystems=True)
+    intensities = [model.create_intensity() for _ in range(3)]
+    data_set = model.kinematics.convert(model.phsp_sample)
+    values = intensities[0].evaluate_numpy(data_set)
+    assert np.array_equal(values, pwa.evaluate_parallel(intensities, data_set))
+    assert np.array_equal(
+        values, pwa.evaluate_parallel(intensities, data_set, chunk_size=50)
+    )
+
+    weighted_sample = pwa.add_intensity_weights(
+        intensities, model.phsp_sample, model.kinematics
+    )
+    assert np.allclose(
+        weighted_sample.weights(), model.phsp_sample.weights() * values
+    )
+
+    with pytest.raises(ValueError):
+        pwa.evaluate_parallel([intensities[0], intensities[0]], data_set)
+
+
+def test_generate_phsp_in_threads(create_model):
+    """Test that bindings that release the GIL can run in threads."""
+    model = create_model(all_subsystems=True)
+    kinematics = model.kinematics
+    kinematics_info = (
+        kinematics.get_particle_state_transition_kinematics_info()
+    )
+
+    def generate(seed):
+        sample = pwa.generate_phsp(
+            1000,
+            pwa.EvtGenGenerator(kinematics_info),
+            pwa.StdUniformRealGenerator(seed),
+        )
+        return kinematics.convert(sample)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        data_sets = list(executor.map(generate, [123, 123, 456]))
+    reference = kinematics.convert(model.phsp_sample)
+    for name, column in reference.data.items():
+        assert np.array_equal(data_sets[0].data[name], column)
+        assert np.array_equal(data_sets[1].data[name], column)
+        assert not np.array_equal(data_sets[2].data[name], column)
+
+
+def test_exclusive_use(create_model):
+    """Test that objects that are used by another thread are refused."""
+    model = create_model(all_subsystems=True)
+    intensity = model.create_intensity()
+    data_set = model.kinematics.convert(model.phsp_sample)
+    (
+        estimator,
+        parameters,
+    ) = pwa.create_unbinned_log_likelihood_function_tree_estimator(
+        intensity, data_set
+    )
+    monitored_estimator = pwa.MonitoredEstimator(estimator)
+    optimizer = pwa.MinuitIF()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(
+            optimizer.optimize, monitored_estimator, parameters
+        )
+        while monitored_estimator.call_count == 0 and not future.done():
+            time.sleep(0.001)
+        with pytest.raises(RuntimeError):
+            pwa.MinuitIF().optimize(estimator, parameters)
+        monitored_estimator.cancel()
+        future.result()
+    assert isinstance(optimizer.optimize(estimator, parameters), pwa.FitResult)
+
+
+def test_profiling(create_model):
+    """Test the profiles of intensities and estimators."""
+    model = create_model(all_subsystems=True)
+    intensity = model.create_intensity()
+    data_set = model.kinematics.convert(model.phsp_sample)
+    n_events = len(data_set.weights)
+
+    pwa.reset_profiles()
+    intensity.evaluate_numpy(data_set)
+    assert not pwa.is_profiling_enabled()
+    assert intensity.profile()["calls"] == 0
+
+    pwa.enable_profiling()
+    try:
+        intensity.evaluate_numpy(data_set)
+        intensity.evaluate_numpy(data_set, chunk_size=300)
+        (
+            estimator,
+            parameters,
+        ) = pwa.create_unbinned_log_likelihood_function_tree_estimator(
+            intensity, data_set
+        )
+        pwa.MinuitIF().optimize(estimator, parameters)
+    finally:
+        pwa.enable_profiling(False)
+    profile = intensity.profile()
+    assert profile["calls"] == 2  # the chunks count as one call
+    assert profile["events"] == 2 * n_events
+    assert profile["seconds"] > 0
+    stats = estimator.stats()
+    assert stats["calls"] > 0
+    assert stats["parameter_updates"] > 0
+    assert stats["seconds"] > 0
+
+    pwa.reset_profiles()
+    assert estimator.stats()["calls"] == 0
+
+    # new objects, which may reuse the memory of deleted ones, start empty
+    pwa.enable_profiling()
+    try:
+        for _ in range(3):
+            other_intensity = model.create_intensity()
+            assert other_intensity.profile()["calls"] == 0
+            other_intensity.evaluate_numpy(data_set)
+            assert other_intensity.profile()["calls"] == 1
+            del other_intensity
+    finally:
+        pwa.enable_profiling(False)
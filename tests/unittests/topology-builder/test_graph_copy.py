@@ -0,0 +1,85 @@
+from copy import deepcopy
+
+from pycompwa.expertsystem.topology.graph import StateTransitionGraph
+
+
+def create_graph():
+    graph = StateTransitionGraph()
+    graph.add_node(0)
+    for edge_id in range(3):
+        graph.add_edges([edge_id])
+    graph.attach_edges_to_node_ingoing([0], 0)
+    graph.attach_edges_to_node_outgoing([1, 2], 0)
+    graph.node_props[0] = {"QuantumNumber": [{"Type": "L", "Value": "1"}]}
+    for edge_id in range(3):
+        graph.edge_props[edge_id] = {"Name": "pi" + str(edge_id)}
+    return graph
+
+
+def test_copy_shares_properties():
+    """The element properties are shared until they are modified."""
+    graph = create_graph()
+    graph_copy = graph.copy()
+    assert graph_copy.edges == graph.edges
+    assert graph_copy.edge_props[1] is graph.edge_props[1]
+
+    graph_copy.edges[1].originating_node_id = None
+    graph_copy.swap_edges(1, 2)
+    assert graph.edges[1].originating_node_id == 0
+    assert graph.edge_props[1] == {"Name": "pi1"}
+    assert graph_copy.edge_props[1] == {"Name": "pi2"}
+
+
+def test_writable_properties_are_not_shared():
+    """Writable properties can be modified without changing the copies."""
+    graph = create_graph()
+    graph_copy = graph.copy()
+    graph_copy.get_writable_edge_props(1)["Name"] = "K+"
+    graph_copy.get_writable_node_props(0)["QuantumNumber"].append(
+        {"Type": "S", "Value": "0"}
+    )
+    assert graph.edge_props[1] == {"Name": "pi1"}
+    assert len(graph.node_props[0]["QuantumNumber"]) == 1
+    assert graph_copy.edge_props[1] == {"Name": "K+"}
+    assert len(graph_copy.node_props[0]["QuantumNumber"]) == 2
+
+    # the original graph shares the properties with the copy as well
+    graph.get_writable_edge_props(2)["Name"] = "K-"
+    assert graph_copy.edge_props[2] == {"Name": "pi2"}
+
+    # swapped properties stay writable
+    writable_props = graph_copy.get_writable_edge_props(1)
+    graph_copy.swap_edges(1, 2)
+    assert graph_copy.get_writable_edge_props(2) is writable_props
+
+    # properties of new elements are created
+    graph_copy.get_writable_edge_props(3)["Name"] = "gamma"
+    assert graph_copy.edge_props[3] == {"Name": "gamma"}
+    assert 3 not in graph.edge_props
+
+
+def test_deepcopy():
+    graph = create_graph()
+    graph_deepcopy = deepcopy(graph)
+    assert graph_deepcopy.edges == graph.edges
+    assert graph_deepcopy.edge_props == graph.edge_props
+    assert graph_deepcopy.edge_props[1] is not graph.edge_props[1]
+
+
+def test_replaced_properties_are_not_writable():
+    """Replaced properties are copied before they are modified."""
+    graph = create_graph()
+    graph.get_writable_edge_props(1)["Name"] = "K+"
+    shared_props = {"Name": "pi1"}
+    graph.set_edge_props(1, shared_props)
+    graph.get_writable_edge_props(1)["Name"] = "K-"
+    assert shared_props == {"Name": "pi1"}
+    assert graph.edge_props[1] == {"Name": "K-"}
+
+    graph.get_writable_node_props(0)["QuantumNumber"] = []
+    shared_props = {"QuantumNumber": []}
+    graph.set_node_props(0, shared_props)
+    graph.get_writable_node_props(0)["QuantumNumber"].append(
+        {"Type": "L", "Value": "1"}
+    )
+    assert shared_props == {"QuantumNumber": []}
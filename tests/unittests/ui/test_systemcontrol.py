@@ -15,7 +15,9 @@ from pycompwa.expertsystem.ui.system_control import (
     CompareGraphElementPropertiesFunctor,
     InteractionTypes,
     StateTransitionManager,
+    check_equal_ignoring_qns,
     create_edge_id_particle_mapping,
+    create_graph_key,
     filter_graphs,
     match_external_edges,
     perform_external_edge_identical_particle_combinatorics,
@@ -178,6 +180,27 @@ class TestSolutionFilter(object):
         num_solutions = [len(x[0]) for x in results["test"]]
         assert sum(num_solutions) == result
 
+    @pytest.mark.parametrize(
+        "LS_pair1,LS_pair2,ignored_qn_list,is_equal",
+        [
+            ((1, 0), (1, 0), [], True),
+            ((1, 0), (1, 1), [], False),
+            ((1, 0), (1, 1), [InteractionQuantumNumberNames.S], True),
+            ((1, 0), (2, 1), [InteractionQuantumNumberNames.S], False),
+        ],
+    )
+    def test_graph_key(self, LS_pair1, LS_pair2, ignored_qn_list, is_equal):
+        graph1 = make_ls_test_graph(*LS_pair1)
+        graph2 = make_ls_test_graph_scrambled(*LS_pair2)
+        is_equal_key = create_graph_key(
+            graph1, ignored_qn_list
+        ) == create_graph_key(graph2, ignored_qn_list)
+        assert is_equal_key == is_equal
+        found_graph = check_equal_ignoring_qns(
+            graph1, [graph2], ignored_qn_list
+        )
+        assert (found_graph is not None) == is_equal
+
     @pytest.mark.parametrize(
         "input_values,filter_parameters,result",
         [